@@ -9,6 +9,8 @@ from django.conf import settings
 from django.middleware.csrf import CsrfViewMiddleware
 import os
 
+from core.db import REPLICA_DATABASE, allow_replica_reads, reset_replica_reads
+
 
 class DynamicAllowedHostsMiddleware(MiddlewareMixin):
     """
@@ -122,3 +124,44 @@ class DynamicCsrfMiddleware(CsrfViewMiddleware):
             # If parent method doesn't exist, fall back to default Django behavior
             return False
 
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Enables read-replica routing (core.db.PrimaryReplicaRouter) for safe public requests.
+    Admin, unsafe methods and requests shortly after a write (sticky cookie) read from
+    the primary database, so a visitor always sees the lead or change they just made.
+    """
+    
+    STICKY_COOKIE = 'db_primary'
+    NON_STICKY_PATHS = ('/analytics/',)
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def replica_allowed(self, request):
+        return (
+            request.method in ('GET', 'HEAD', 'OPTIONS')
+            and not request.path.startswith('/admin/')
+            and self.STICKY_COOKIE not in request.COOKIES
+        )
+    
+    def __call__(self, request):
+        if REPLICA_DATABASE not in settings.DATABASES:
+            return self.get_response(request)
+        
+        token = allow_replica_reads(self.replica_allowed(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_replica_reads(token)
+        
+        # Read-your-writes: next requests (e.g. thank-you page) go to the primary.
+        # Analytics beacons are buffered, not written, so they don't make the visitor sticky
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and not request.path.startswith(self.NON_STICKY_PATHS):
+            response.set_cookie(
+                self.STICKY_COOKIE, '1',
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -12,14 +12,14 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (.env є лише локально; на Render змінні задані в оточенні)
+if (BASE_DIR / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR / '.env')
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('SECRET_KEY', 'django-insecure-k#*+d9^*ah_bt)rm3&83v%-^273c_20pc*(#gu+2yh(yy=_u4f')
@@ -56,17 +56,20 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
     
     # Local apps
     'core.apps.CoreConfig',
     'pages.apps.PagesConfig',
     'leads.apps.LeadsConfig',
+    'reports.apps.ReportsConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'adiabatic.middleware.DynamicAllowedHostsMiddleware',  # Custom host validation for Render
+    'adiabatic.middleware.ReplicaRoutingMiddleware',  # Читання з репліки для публічних GET
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # Для i18n
     'django.middleware.common.CommonMiddleware',
@@ -82,8 +85,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
+        # Завантажувачі задані явно: cached loader прогрівається в core.warmup
+        'APP_DIRS': False,
         'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -103,6 +113,8 @@ WSGI_APPLICATION = 'adiabatic.wsgi.application'
 # PostgreSQL for production, SQLite for development
 if os.getenv('DATABASE_URL'):
     # Production database (PostgreSQL on Render)
+    import dj_database_url
+
     DATABASES = {
         'default': dj_database_url.config(
             default=os.getenv('DATABASE_URL'),
@@ -110,6 +122,33 @@ if os.getenv('DATABASE_URL'):
             conn_health_checks=True,
         )
     }
+
+    # Пул з'єднань psycopg 3 (Django 5.1+): один пул на процес gunicorn,
+    # потоки gthread беруть з'єднання з нього, тож загальна кількість
+    # з'єднань = воркери * DATABASE_POOL_MAX_SIZE (а не воркери * потоки)
+    if os.getenv('DATABASE_POOL', 'False').lower() == 'true':
+        # Постійні з'єднання Django несумісні з пулом; CONN_HEALTH_CHECKS
+        # лишається увімкненим - Django передає пулу перевірку з'єднання
+        # перед видачею (ConnectionPool.check_connection)
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '1')),
+            'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '4')),
+            # Скільки секунд запит чекає на вільне з'єднання
+            'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', '10')),
+            'max_idle': float(os.getenv('DATABASE_POOL_MAX_IDLE', '300')),
+            'max_lifetime': float(os.getenv('DATABASE_POOL_MAX_LIFETIME', '1800')),
+        }
+
+    # Репліка для читання публічних сторінок (core.db.PrimaryReplicaRouter)
+    if os.getenv('DATABASE_REPLICA_URL'):
+        DATABASES['replica'] = {
+            **dj_database_url.parse(os.getenv('DATABASE_REPLICA_URL')),
+            'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+            'TEST': {'MIRROR': 'default'},
+        }
 else:
     # Development database (SQLite)
     DATABASES = {
@@ -120,6 +159,12 @@ else:
     }
 
 
+DATABASE_ROUTERS = ['core.db.PrimaryReplicaRouter']
+
+# Скільки секунд після POST запити відвідувача читають з основної бази
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv('DATABASE_REPLICA_STICKY_SECONDS', '15'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -203,15 +248,83 @@ else:
     CELERY_BROKER_URL = 'redis://localhost:6379/0'
     CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 
+# Cache (Redis якщо доступний, інакше локальна пам'ять процесу)
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Аналітика (core.analytics): буфер подій до пакетного запису в БД.
+# redis - спільний для воркерів і переживає рестарт, memory - у пам'яті воркера
+ANALYTICS_BUFFER = os.getenv('ANALYTICS_BUFFER', 'redis' if REDIS_URL else 'memory')
+ANALYTICS_FLUSH_SIZE = int(os.getenv('ANALYTICS_FLUSH_SIZE', '500'))
+ANALYTICS_FLUSH_INTERVAL = float(os.getenv('ANALYTICS_FLUSH_INTERVAL', '2'))
+ANALYTICS_MAX_BUFFERED = int(os.getenv('ANALYTICS_MAX_BUFFERED', '50000'))
+# Скільки місяців зберігати події (core.partitions.maintain, manage.py analytics_retention)
+ANALYTICS_RETENTION_MONTHS = int(os.getenv('ANALYTICS_RETENTION_MONTHS', '13'))
+# На скільки місяців вперед створювати партиції подій (PostgreSQL)
+ANALYTICS_PARTITION_MONTHS_AHEAD = int(os.getenv('ANALYTICS_PARTITION_MONTHS_AHEAD', '12'))
+
+# Періодичні задачі без cron (core.maintenance): (шлях до функції, інтервал у секундах).
+# Виконуються фоновим потоком аналітики в кожному воркері gunicorn під advisory блокуванням.
+# MAINTENANCE_ENABLED=False - для запуску команд analytics_retention та update_rollups з cron
+MAINTENANCE_ENABLED = os.getenv('MAINTENANCE_ENABLED', 'True').lower() == 'true'
+MAINTENANCE_TASKS = [
+    ('core.partitions.maintain', 24 * 60 * 60),
+    ('reports.tasks.update_reports', 5 * 60),
+]
+
+# Ліміти заявок (leads.ratelimit): "кількість/секунд" для token bucket.
+# Сховище redis спільне для всіх воркерів, memory - окреме для кожного
+LEAD_RATELIMIT_ENABLED = os.getenv('LEAD_RATELIMIT_ENABLED', 'True').lower() == 'true'
+LEAD_RATELIMIT_BACKEND = os.getenv('LEAD_RATELIMIT_BACKEND', 'redis' if REDIS_URL else 'memory')
+LEAD_RATELIMIT_IP = os.getenv('LEAD_RATELIMIT_IP', '5/300')
+LEAD_RATELIMIT_CONTACT = os.getenv('LEAD_RATELIMIT_CONTACT', '3/3600')
+# Повторна заявка з тими самими даними протягом цього часу (с) не створюється (leads.dedup)
+LEAD_DEDUP_WINDOW = int(os.getenv('LEAD_DEDUP_WINDOW', '600'))
+
+# Максимальний розмір тіла запиту заявки (байт); більші отримують 413
+LEAD_MAX_BODY_SIZE = int(os.getenv('LEAD_MAX_BODY_SIZE', '65536'))
+
+# Оцінка спаму до збереження заявки (leads.spam): перевірки від найдешевших
+LEAD_SPAM_CHECKS = [
+    'leads.spam.check_honeypot',
+    'leads.spam.check_timing',
+    'leads.spam.check_content',
+    'leads.spam.check_ip_velocity',
+]
+# Від скількох балів заявка зберігається зі статусом spam без нотифікацій / не зберігається
+LEAD_SPAM_QUARANTINE_SCORE = int(os.getenv('LEAD_SPAM_QUARANTINE_SCORE', '50'))
+LEAD_SPAM_DROP_SCORE = int(os.getenv('LEAD_SPAM_DROP_SCORE', '100'))
+LEAD_SPAM_MIN_SECONDS = int(os.getenv('LEAD_SPAM_MIN_SECONDS', '3'))
+# Заявок з одного IP за вікно (с), після яких кожна наступна додає бали
+LEAD_SPAM_VELOCITY_LIMIT = int(os.getenv('LEAD_SPAM_VELOCITY_LIMIT', '3'))
+LEAD_SPAM_VELOCITY_WINDOW = int(os.getenv('LEAD_SPAM_VELOCITY_WINDOW', '600'))
+
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Europe/Kiev'
 
+# Кількість проксі перед застосунком, що дописують X-Forwarded-For (Render - 1).
+# IP клієнта береться з цієї позиції з кінця, бо початок заголовка задає клієнт
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', '1'))
+
 # Security Settings
 if not DEBUG:
     # HTTPS налаштування для продакшену
     # SECURE_SSL_REDIRECT = False на Render (Render обробляє HTTPS через проксі)
+    # Проксі Render передає оригінальну схему, щоб request.scheme був https (sitemap, robots.txt)
+    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
     SECURE_HSTS_SECONDS = 31536000  # 1 рік
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
@@ -24,11 +24,20 @@ from django.views.static import serve
 from django.urls import re_path
 from django.http import HttpResponseRedirect
 from django.views.generic.base import RedirectView
+from core.views import collect_events, db_pool_stats, service_worker
+from pages.views import sitemap_index, sitemap_section, robots_txt
 
 urlpatterns = [
+    # До admin.site.urls, інакше шлях перехопить catch-all адмінки
+    path('admin/db-pool/', db_pool_stats, name='db_pool_stats'),
     path('admin/', admin.site.urls),
     path('i18n/', include('django.conf.urls.i18n')),
     path('set-language/', set_language, name='set_language'),
+    path('sw.js', service_worker, name='service_worker'),
+    path('analytics/collect/', collect_events, name='analytics_collect'),
+    path('robots.txt', robots_txt, name='robots_txt'),
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    path('sitemap-<section>.xml', sitemap_section, name='sitemap_section'),
     # Редирект з кореня на українську мову
     path('', RedirectView.as_view(url='/uk/', permanent=False)),
 ]
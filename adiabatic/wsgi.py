@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'adiabatic.settings')
 
 application = get_wsgi_application()
+
+# Шаблони, URL та переклади готуються до першого запиту, а не під час нього
+from core.warmup import warmup  # noqa: E402
+
+warmup()
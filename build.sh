@@ -8,6 +8,9 @@ pip install -r requirements.txt
 # Collect static files
 python manage.py collectstatic --noinput
 
+# Generate service worker from the staticfiles manifest
+python manage.py build_service_worker
+
 # Run migrations
 python manage.py migrate
 
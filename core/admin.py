@@ -1,6 +1,10 @@
+from datetime import timedelta
+
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from .models import SiteSettings, Language, Menu, MenuItem, PaymentSettings, AnalyticsEvent
+from .paginator import EstimatedCountPaginator
 
 
 @admin.register(SiteSettings)
@@ -95,14 +99,50 @@ class PaymentSettingsAdmin(admin.ModelAdmin):
         return False
 
 
+class RecentPeriodFilter(admin.SimpleListFilter):
+    """Період подій; за замовчуванням 30 днів, щоб запити читали лише свіжі партиції"""
+    title = _('Період')
+    parameter_name = 'period'
+    default = '30'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('1', _('Сьогодні')),
+            ('7', _('7 днів')),
+            ('30', _('30 днів')),
+            ('90', _('90 днів')),
+            ('365', _('Рік')),
+            ('all', _('Весь час')),
+        )
+
+    def value(self):
+        return super().value() or self.default
+
+    def choices(self, changelist):
+        for lookup, title in self.lookup_choices:
+            yield {
+                'selected': self.value() == lookup,
+                'query_string': changelist.get_query_string({self.parameter_name: lookup}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        if self.value() == 'all' or not self.value().isdigit():
+            return queryset
+        return queryset.filter(created_at__gte=timezone.now() - timedelta(days=int(self.value())))
+
+
 @admin.register(AnalyticsEvent)
 class AnalyticsEventAdmin(admin.ModelAdmin):
     """Адмінка для подій аналітики"""
     list_display = ['event_name', 'event_type', 'page_url', 'ip_address', 'created_at']
-    list_filter = ['event_type', 'created_at']
+    list_filter = [RecentPeriodFilter, 'event_type']
     search_fields = ['event_name', 'page_url', 'ip_address']
     readonly_fields = ['created_at']
     ordering = ['-created_at']
+    # Таблиця подій велика: без COUNT(*) по всіх партиціях
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         (_('Подія'), {
@@ -0,0 +1,281 @@
+"""Прийом подій аналітики з буферизацією та пакетним записом у БД
+
+Запит /analytics/collect/ лише перевіряє події і кладе їх у буфер (пам'ять
+воркера або список у Redis). Фоновий потік воркера записує їх пакетами
+через bulk_create, коли набирається ANALYTICS_FLUSH_SIZE подій або минає
+ANALYTICS_FLUSH_INTERVAL секунд, тож сторінки не чекають на INSERT. Той
+самий потік виконує періодичні задачі core.maintenance.
+"""
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DatabaseError, InterfaceError, OperationalError, close_old_connections
+
+from .http import get_client_ip, normalize_ip
+from .maintenance import run_due_tasks
+from .models import AnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = {key for key, _label in AnalyticsEvent.EVENT_TYPES}
+MAX_EVENTS_PER_REQUEST = 50
+MAX_BODY_BYTES = 64 * 1024
+MAX_EVENT_DATA_BYTES = 2048
+REDIS_BUFFER_KEY = 'analytics:events'
+# Cookie встановлюються в static/js/analytics.js: відвідувач - рік, сесія - 30 хв бездіяльності
+VISITOR_COOKIE = 'adb_vid'
+SESSION_COOKIE = 'adb_sid'
+TRACKING_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def get_tracking_ids(request):
+    """(visitor_id, session_id) з cookie аналітики; некоректні значення -> ''"""
+    return tuple(
+        value if TRACKING_ID_RE.match(value) else ''
+        for value in (request.COOKIES.get(VISITOR_COOKIE, ''), request.COOKIES.get(SESSION_COOKIE, ''))
+    )
+
+
+def clean_event(raw, defaults):
+    """Подія з beacon -> словник для буфера або None, якщо подія некоректна"""
+    if not isinstance(raw, dict):
+        return None
+    # Список або словник як type не хешується: перевірка типу до пошуку в множині
+    if not isinstance(raw.get('type'), str) or raw['type'] not in EVENT_TYPES:
+        return None
+    name = raw.get('name') or raw['type']
+    url = raw.get('url') or defaults['url']
+    if not isinstance(name, str) or not isinstance(url, str):
+        return None
+    if not url.startswith(('http://', 'https://')):
+        return None
+
+    data = raw.get('data') or {}
+    if not isinstance(data, dict):
+        return None
+    if len(json.dumps(data, ensure_ascii=False).encode()) > MAX_EVENT_DATA_BYTES:
+        return None
+
+    return {
+        'type': raw['type'],
+        'name': name[:100],
+        'url': url[:500],
+        'data': data,
+        # inet у PostgreSQL: одна некоректна адреса зірвала б запис усього пакета
+        'ip': normalize_ip(defaults['ip']),
+        'ua': defaults['ua'],
+        'vid': defaults['vid'],
+        'sid': defaults['sid'],
+        'ts': defaults['ts'],
+    }
+
+
+def parse_events(request):
+    """Події з тіла beacon запиту (масив або {"events": [...]}). Повертає (події, відкинуто)"""
+    if int(request.META.get('CONTENT_LENGTH') or 0) > MAX_BODY_BYTES:
+        raise ValueError('Занадто великий пакет подій')
+    payload = json.loads(request.body)
+    if isinstance(payload, dict):
+        payload = payload.get('events', [payload])
+    if not isinstance(payload, list):
+        raise ValueError('Очікується масив подій')
+
+    visitor_id, session_id = get_tracking_ids(request)
+    defaults = {
+        'url': request.META.get('HTTP_REFERER', ''),
+        'vid': visitor_id,
+        'sid': session_id,
+        'ip': get_client_ip(request),
+        'ua': request.META.get('HTTP_USER_AGENT', '')[:500],
+        'ts': time.time(),
+    }
+    events = []
+    for raw in payload[:MAX_EVENTS_PER_REQUEST]:
+        event = clean_event(raw, defaults)
+        if event is not None:
+            events.append(event)
+    return events, len(payload) - len(events)
+
+
+def build_event(event):
+    return AnalyticsEvent(
+        event_type=event['type'],
+        event_name=event['name'],
+        page_url=event['url'],
+        extra_data=event['data'],
+        ip_address=event['ip'],
+        user_agent=event['ua'],
+        # Події в Redis могли бути покладені до появи ідентифікаторів
+        visitor_id=event.get('vid', ''),
+        session_id=event.get('sid', ''),
+        created_at=datetime.fromtimestamp(event['ts'], tz=dt_timezone.utc),
+    )
+
+
+class MemoryBuffer:
+    """Буфер у пам'яті воркера; при переповненні нові події відкидаються"""
+
+    def __init__(self, max_size):
+        self.events = deque()
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.dropped = 0
+
+    def push(self, events):
+        with self.lock:
+            free = self.max_size - len(self.events)
+            if free < len(events):
+                self.dropped += len(events) - max(free, 0)
+                events = events[:max(free, 0)]
+            self.events.extend(events)
+            return len(self.events)
+
+    def drain(self, limit):
+        with self.lock:
+            return [self.events.popleft() for _ in range(min(limit, len(self.events)))]
+
+    def __len__(self):
+        return len(self.events)
+
+
+class RedisBuffer:
+    """Спільний для всіх воркерів список у Redis: події переживають рестарт воркера"""
+
+    def __init__(self, url, max_size):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def push(self, events):
+        if not events:
+            return len(self)
+        pipeline = self.client.pipeline()
+        pipeline.rpush(REDIS_BUFFER_KEY, *(json.dumps(event) for event in events))
+        # Обмеження розміру, якщо БД тривалий час недоступна
+        pipeline.ltrim(REDIS_BUFFER_KEY, -self.max_size, -1)
+        size, _trimmed = pipeline.execute()
+        if size > self.max_size:
+            self.dropped += size - self.max_size
+        return min(size, self.max_size)
+
+    def drain(self, limit):
+        # LRANGE + LTRIM в MULTI: кілька воркерів не заберуть ті самі події
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.lrange(REDIS_BUFFER_KEY, 0, limit - 1)
+        pipeline.ltrim(REDIS_BUFFER_KEY, limit, -1)
+        items, _trimmed = pipeline.execute()
+        return [json.loads(item) for item in items]
+
+    def __len__(self):
+        return self.client.llen(REDIS_BUFFER_KEY)
+
+
+class EventCollector:
+    """Буфер подій + фоновий потік, який записує їх пакетами"""
+
+    def __init__(self, buffer, flush_size, flush_interval):
+        self.buffer = buffer
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.pid = None
+        self.start_lock = threading.Lock()
+
+    def add(self, events):
+        """Покласти події в буфер; запис у БД виконає фоновий потік"""
+        self.ensure_flusher()
+        if self.buffer.push(events) >= self.flush_size:
+            self.wakeup.set()
+
+    def ensure_flusher(self):
+        # Потоки не переживають fork (preload_app), тому pid перевіряється
+        if self.pid == os.getpid() and self.thread.is_alive():
+            return
+        with self.start_lock:
+            if self.pid == os.getpid() and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self.run, name='analytics-flusher', daemon=True)
+            self.thread.start()
+            self.pid = os.getpid()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            # Партиції створюються до запису подій нового місяця
+            run_due_tasks()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не вдалося записати події аналітики')
+
+    def flush(self):
+        """Записати все, що є в буфері. Повертає кількість записаних подій"""
+        written = 0
+        close_old_connections()
+        try:
+            while batch := self.buffer.drain(self.flush_size):
+                try:
+                    AnalyticsEvent.objects.bulk_create([build_event(event) for event in batch])
+                except (OperationalError, InterfaceError):
+                    # БД недоступна: пакет повертається в буфер до наступного запуску
+                    self.buffer.push(batch)
+                    raise
+                except (DatabaseError, KeyError, TypeError, ValueError):
+                    logger.warning('Пакет подій аналітики не записано, запис по одній', exc_info=True)
+                    written += self.write_each(batch)
+                else:
+                    written += len(batch)
+        finally:
+            close_old_connections()
+        self.written += written
+        return written
+
+    def write_each(self, batch):
+        """Записати події по одній; відкидаються лише некоректні"""
+        written = 0
+        for position, event in enumerate(batch):
+            try:
+                build_event(event).save()
+            except (OperationalError, InterfaceError):
+                self.buffer.push(batch[position:])
+                raise
+            except (DatabaseError, KeyError, TypeError, ValueError):
+                logger.warning('Відкинуто некоректну подію аналітики: %r', event, exc_info=True)
+            else:
+                written += 1
+        return written
+
+
+def create_collector():
+    max_size = settings.ANALYTICS_MAX_BUFFERED
+    if settings.ANALYTICS_BUFFER == 'redis':
+        buffer = RedisBuffer(settings.REDIS_URL, max_size)
+    else:
+        buffer = MemoryBuffer(max_size)
+    return EventCollector(buffer, settings.ANALYTICS_FLUSH_SIZE, settings.ANALYTICS_FLUSH_INTERVAL)
+
+
+collector = create_collector()
+
+
+@atexit.register
+def flush_on_exit():
+    """Дописати буфер у пам'яті при зупинці воркера (graceful shutdown)"""
+    if isinstance(collector.buffer, MemoryBuffer) and len(collector.buffer):
+        try:
+            collector.flush()
+        except Exception:
+            logger.exception('Не вдалося записати події аналітики при зупинці')
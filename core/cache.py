@@ -0,0 +1,46 @@
+"""Версіоновані ключі кешу з інвалідацією через сигнали моделей"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Без спільного кешу скидання версії видно лише в процесі, який зберіг модель,
+# тому в інших воркерах версіоновані ключі живуть не довше за цей строк
+LOCAL_CACHE_MAX_TIMEOUT = 5 * 60
+
+
+def is_local_cache():
+    """Кеш окремий у кожному процесі (LocMem без REDIS_URL)"""
+    return settings.CACHES['default']['BACKEND'].endswith('LocMemCache')
+
+
+def get_timeout(timeout):
+    """Строк кешу для версіонованих ключів з урахуванням кешу в пам'яті воркера"""
+    return min(timeout, LOCAL_CACHE_MAX_TIMEOUT) if is_local_cache() else timeout
+
+
+# Спільні фрагменти base.html (шапка, меню, футер) та налаштування сайту
+LAYOUT_CACHE = 'layout'
+LAYOUT_CACHE_TIMEOUT = get_timeout(60 * 60 * 24)
+
+
+def get_cache_version(name):
+    """Поточна версія групи кешу (створюється при першому зверненні)"""
+    key = f'cache_version:{name}'
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        # add() не перезапише версію, яку паралельно встановив інший процес
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_cache_version(name):
+    """Інвалідувати всю групу кешу (старі ключі просто перестають читатися)"""
+    cache.set(f'cache_version:{name}', time.time_ns(), timeout=None)
+
+
+def versioned_key(name, *parts):
+    """Ключ кешу з урахуванням версії групи"""
+    return ':'.join([name, str(get_cache_version(name)), *map(str, parts)])
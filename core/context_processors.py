@@ -1,37 +1,47 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+from .cache import LAYOUT_CACHE, LAYOUT_CACHE_TIMEOUT, get_cache_version, versioned_key
+from .db import use_primary
 from .models import SiteSettings, Language, Menu
 
 
-def site_settings(request):
-    """Додає глобальні налаштування сайту до контексту"""
-    try:
-        site_settings_obj = SiteSettings.get_settings()
-    except Exception:
-        site_settings_obj = None
-    
-    try:
-        languages = Language.objects.filter(is_active=True)
-    except Exception:
-        languages = []
-    
-    try:
-        header_menu = Menu.objects.filter(menu_type='header', is_active=True).first()
-    except Exception:
-        header_menu = None
-    
-    try:
-        footer_menu = Menu.objects.filter(menu_type='footer', is_active=True).first()
-    except Exception:
-        footer_menu = None
-    
+def get_site_settings():
+    """Налаштування сайту з кешу (версія скидається при збереженні в адмінці)"""
+    key = versioned_key(LAYOUT_CACHE, 'site_settings')
+    site_settings_obj = cache.get(key)
+    if site_settings_obj is None:
+        try:
+            with use_primary():
+                site_settings_obj = SiteSettings.get_settings()
+        except Exception:
+            return None
+        cache.set(key, site_settings_obj, LAYOUT_CACHE_TIMEOUT)
+    return site_settings_obj
+
+
+def get_menu(menu_type):
+    """Активне меню вказаного типу"""
     try:
-        mobile_menu = Menu.objects.filter(menu_type='mobile', is_active=True).first()
+        return Menu.objects.filter(menu_type=menu_type, is_active=True).first()
     except Exception:
-        mobile_menu = None
-    
+        return None
+
+
+def site_settings(request):
+    """Додає глобальні налаштування сайту до контексту
+
+    Значення ліниві: запити до БД виконуються лише якщо шаблон їх використовує,
+    а не при кожному рендерингу (шапка й футер зазвичай беруться з кешу).
+    """
     return {
-        'site_settings': site_settings_obj,
-        'languages': languages,
-        'header_menu': header_menu,
-        'footer_menu': footer_menu,
-        'mobile_menu': mobile_menu,
+        'site_settings': SimpleLazyObject(get_site_settings),
+        'languages': Language.objects.filter(is_active=True),
+        'header_menu': SimpleLazyObject(partial(get_menu, 'header')),
+        'footer_menu': SimpleLazyObject(partial(get_menu, 'footer')),
+        'mobile_menu': SimpleLazyObject(partial(get_menu, 'mobile')),
+        'layout_cache_version': SimpleLazyObject(partial(get_cache_version, LAYOUT_CACHE)),
+        'layout_cache_timeout': LAYOUT_CACHE_TIMEOUT,
     }
@@ -0,0 +1,111 @@
+"""Робота з БД: маршрутизація на репліку, статистика пулу з'єднань, блокування задач"""
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+REPLICA_DATABASE = 'replica'
+
+# Застосунки з публічним контентом, які можна читати з репліки.
+# leads, auth та sessions завжди читаються з основної бази
+REPLICA_APP_LABELS = {'pages', 'core'}
+
+# Чи дозволено поточному запиту читати з репліки (вмикає ReplicaRoutingMiddleware).
+# За замовчуванням False: команди, сигнали та фонові задачі працюють з основною базою
+_replica_allowed = ContextVar('replica_allowed', default=False)
+
+
+def allow_replica_reads(allowed):
+    """Дозволити/заборонити читання з репліки. Повертає токен для reset_replica_reads"""
+    return _replica_allowed.set(allowed)
+
+
+def reset_replica_reads(token):
+    _replica_allowed.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Читати з основної бази (наприклад, при заповненні кешу після інвалідації)"""
+    token = _replica_allowed.set(False)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Публічні читання -> replica, все інше -> default
+
+    Репліка може відставати, тому запис, адмінка та запити одразу після
+    POST (sticky cookie з ReplicaRoutingMiddleware) йдуть в основну базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            REPLICA_DATABASE in connections.databases
+            and _replica_allowed.get()
+            and model._meta.app_label in REPLICA_APP_LABELS
+        ):
+            return REPLICA_DATABASE
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Репліка містить ті самі дані, що й основна база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DATABASE
+
+
+def get_pool(alias):
+    """Пул psycopg 3 для бази або None (пул вимкнено чи не PostgreSQL)"""
+    return getattr(connections[alias], 'pool', None)
+
+
+def get_pool_stats():
+    """Статистика пулів усіх баз: {alias: {...} або None}"""
+    stats = {}
+    for alias in connections:
+        pool = get_pool(alias)
+        stats[alias] = pool.get_stats() if pool is not None else None
+    return stats
+
+
+def close_pools():
+    """Закрити пули (потоки пулу не переживають fork воркера gunicorn)"""
+    for alias in connections:
+        connection = connections[alias]
+        # Властивість pool створює пул при першому зверненні, тому
+        # перевіряємо лише вже створені
+        if alias in getattr(connection, '_connection_pools', {}):
+            connection.close_pool()
+
+
+@contextmanager
+def advisory_lock(name, using='default'):
+    """Сесійне advisory блокування PostgreSQL на час блоку: True, якщо отримано
+
+    Не чекає: якщо задачу вже виконує інший воркер чи процес, блок отримує
+    False і має пропустити роботу. Блокування явно знімається в кінці, бо
+    з'єднання з пулу повертається в пул без завершення сесії. На інших БД
+    блокування немає (завжди True).
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        yield True
+        return
+    key = zlib.crc32(name.encode())
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [key])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
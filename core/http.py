@@ -0,0 +1,29 @@
+"""Допоміжні функції для HTTP запитів"""
+import ipaddress
+
+from django.conf import settings
+
+
+def normalize_ip(value):
+    """Коректна IP адреса або None"""
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except (AttributeError, ValueError):
+        return None
+
+
+def get_client_ip(request):
+    """IP адреса клієнта, яку дописав довірений проксі
+
+    Початок X-Forwarded-For задає сам клієнт, тому береться адреса на
+    позиції TRUSTED_PROXY_COUNT з кінця: проксі Render дописує адресу, з
+    якої прийшло з'єднання, останньою. Без проксі (0) або коли адрес
+    менше, ніж проксі, - REMOTE_ADDR. Некоректна адреса -> None.
+    """
+    depth = settings.TRUSTED_PROXY_COUNT
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if depth and x_forwarded_for:
+        addresses = x_forwarded_for.split(',')
+        if len(addresses) >= depth:
+            return normalize_ip(addresses[-depth])
+    return normalize_ip(request.META.get('REMOTE_ADDR'))
@@ -0,0 +1,118 @@
+"""Мультимовні поля моделей (title_uk, title_ru, title_en, ...)"""
+from django.conf import settings
+from django.db import models
+from django.db.models import F, Value
+from django.db.models.fields.json import KeyTransform
+from django.db.models.functions import Coalesce, NullIf
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+# Анотація з HTML активної мови (вибирається з rendered_html в SQL)
+RENDERED_HTML_ANNOTATION = 'rendered_html_localized'
+
+
+def get_language_codes():
+    """Коди мов сайту з settings.LANGUAGES"""
+    return [code for code, _name in settings.LANGUAGES]
+
+
+def get_active_language():
+    """Активна мова, зведена до однієї з мов сайту"""
+    language = (get_language() or settings.LANGUAGE_CODE).split('-')[0]
+    if language not in get_language_codes():
+        return settings.LANGUAGE_CODE
+    return language
+
+
+class TranslatedField:
+    """Мовно-нейтральний атрибут: obj.title -> obj.title_<активна мова>
+
+    Порожній переклад замінюється значенням основної мови. Дескриптор
+    не має __set__, тому анотація з TranslatedQuerySet.localized()
+    (значення вже вибране в SQL) має пріоритет над ним.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, f'{self.name}_{get_active_language()}')
+        return value or getattr(instance, f'{self.name}_{settings.LANGUAGE_CODE}')
+
+
+class RenderedField:
+    """Готовий HTML поля для активної мови: obj.content_html
+
+    HTML будується при збереженні (core.rendering) і зберігається в
+    колонці rendered_html моделі як {мова: {поле: html}}.
+    """
+
+    def __init__(self, source, renderer):
+        self.source = source
+        self.renderer = renderer
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        rendered = instance.__dict__.get(RENDERED_HTML_ANNOTATION)
+        if rendered is None:
+            rendered = (instance.rendered_html or {}).get(get_active_language(), {})
+        return mark_safe(rendered.get(self.source, ''))
+
+
+def get_translated_fields(model):
+    """Назви мовно-нейтральних полів моделі (оголошених через TranslatedField)"""
+    return [name for name, attr in vars(model).items() if isinstance(attr, TranslatedField)]
+
+
+def get_rendered_fields(model):
+    """Поля з готовим HTML моделі: {назва: RenderedField}"""
+    return {name: attr for name, attr in vars(model).items() if isinstance(attr, RenderedField)}
+
+
+class TranslatedQuerySet(models.QuerySet):
+    """QuerySet, що завантажує лише колонки активної мови"""
+
+    def localized(self, *fields, language=None):
+        """Відкласти колонки всіх мов і додати анотації title, content, ...
+
+        fields обмежує набір анотованих полів (за замовчуванням усі
+        TranslatedField і RenderedField моделі). Fallback на основну мову
+        виконується в SQL, тому колонки основної мови теж не завантажуються.
+        Для RenderedField вибирається лише HTML активної мови з rendered_html.
+        """
+        language = language or get_active_language()
+        default_language = settings.LANGUAGE_CODE
+        translated_fields = get_translated_fields(self.model)
+        rendered_fields = get_rendered_fields(self.model)
+        fields = fields or [*translated_fields, *rendered_fields]
+
+        annotations = {}
+        if any(name in rendered_fields for name in fields):
+            annotations[RENDERED_HTML_ANNOTATION] = KeyTransform(language, 'rendered_html')
+        for name in fields:
+            if name in rendered_fields:
+                continue
+            expression = F(f'{name}_{language}')
+            if language != default_language:
+                output_field = self.model._meta.get_field(f'{name}_{default_language}')
+                expression = Coalesce(
+                    NullIf(expression, Value('', output_field=output_field)),
+                    F(f'{name}_{default_language}'),
+                    output_field=output_field,
+                )
+            annotations[name] = expression
+
+        deferred = [
+            f'{name}_{code}'
+            for name in translated_fields
+            for code in get_language_codes()
+        ]
+        if rendered_fields:
+            deferred.append('rendered_html')
+        return self.defer(*deferred).annotate(**annotations)
@@ -0,0 +1,48 @@
+"""Періодичні задачі без cron (на безкоштовному плані Render його немає)
+
+Фоновий потік запису аналітики (core.analytics) кожного воркера викликає
+run_due_tasks(): задача з MAINTENANCE_TASKS виконується, якщо з її
+останнього запуску минув інтервал. cache.add() не дає воркерам зі спільним
+кешем (Redis) виконувати задачу одночасно; з LocMem кожен воркер запускає
+її сам, тому задачі мають бути ідемпотентними і брати core.db.advisory_lock.
+
+Щоб виконувати задачі одним процесом (cron, окремий worker), вимкніть
+MAINTENANCE_ENABLED і запускайте команди analytics_retention та update_rollups.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'maintenance:'
+# {шлях задачі: time.monotonic() останньої спроби} у цьому процесі
+last_run = {}
+
+
+def run_due_tasks():
+    """Виконати задачі, для яких минув інтервал. Повертає шляхи виконаних"""
+    if not settings.MAINTENANCE_ENABLED:
+        return []
+    now = time.monotonic()
+    done = []
+    for path, interval in settings.MAINTENANCE_TASKS:
+        if path in last_run and now - last_run[path] < interval:
+            continue
+        last_run[path] = now
+        if not cache.add(CACHE_PREFIX + path, 1, timeout=interval):
+            continue
+        close_old_connections()
+        try:
+            import_string(path)()
+        except Exception:
+            logger.exception('Не вдалося виконати періодичну задачу %s', path)
+        else:
+            done.append(path)
+        finally:
+            close_old_connections()
+    return done
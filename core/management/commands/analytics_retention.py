@@ -0,0 +1,59 @@
+"""Management команда для обслуговування партицій подій аналітики та ретеншну"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import partitions
+from core.db import advisory_lock
+
+
+class Command(BaseCommand):
+    help = ('Створити партиції подій аналітики на наступні місяці та видалити (або перенести в архів) '
+            'місяці, старші за строк зберігання. Щодня виконується автоматично (core.maintenance); '
+            'з MAINTENANCE_ENABLED=False запускати з cron')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=settings.ANALYTICS_RETENTION_MONTHS,
+                            help='Скільки місяців зберігати (поточний місяць включно)')
+        parser.add_argument('--months-ahead', type=int, default=settings.ANALYTICS_PARTITION_MONTHS_AHEAD,
+                            help='На скільки місяців вперед створити партиції')
+        parser.add_argument('--archive', action='store_true',
+                            help=f'Перенести старі партиції в схему {partitions.ARCHIVE_SCHEMA} замість видалення')
+        parser.add_argument('--dry-run', action='store_true', help='Лише показати, що буде зроблено')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.run(options)
+            return
+        with advisory_lock(partitions.LOCK_NAME) as acquired:
+            if not acquired:
+                self.stdout.write(self.style.WARNING('Обслуговування вже виконує інший процес, спробуйте пізніше'))
+                return
+            self.run(options)
+
+    def run(self, options):
+        now = timezone.now()
+        cutoff = partitions.retention_cutoff(now, options['months'])
+        self.stdout.write(f'Зберігаються події з {cutoff:%Y-%m-%d}')
+
+        if not partitions.is_partitioned():
+            if options['dry_run']:
+                return
+            deleted = partitions.delete_before(cutoff)
+            self.stdout.write(self.style.SUCCESS(f'Видалено {deleted} подій (звичайна таблиця)'))
+            return
+
+        if options['dry_run']:
+            for name, month in partitions.list_partitions():
+                action = 'видалити' if month < cutoff else 'залишити'
+                self.stdout.write(f'  {name}: {action}')
+            return
+
+        for name in partitions.ensure_partitions(now, options['months_ahead']):
+            self.stdout.write(f'Створено {name}')
+        for name in partitions.drop_partitions(cutoff, archive=options['archive']):
+            action = f'перенесено в {partitions.ARCHIVE_SCHEMA}' if options['archive'] else 'видалено'
+            self.stdout.write(f'{name}: {action}')
+        # Події поза місячними партиціями (DEFAULT), зазвичай їх немає
+        deleted = partitions.delete_before(cutoff)
+        self.stdout.write(self.style.SUCCESS(f'Готово, з DEFAULT партиції видалено {deleted} подій'))
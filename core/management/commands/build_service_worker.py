@@ -0,0 +1,17 @@
+"""Management команда для генерації service worker після collectstatic"""
+from django.core.management.base import BaseCommand
+
+from core.service_worker import build_service_worker, get_service_worker_path
+
+
+class Command(BaseCommand):
+    help = 'Генерація sw.js з маніфесту collectstatic (запускати після collectstatic)'
+
+    def handle(self, *args, **options):
+        version, content = build_service_worker()
+
+        path = get_service_worker_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+        self.stdout.write(self.style.SUCCESS(f'Service worker {version} збережено у {path}'))
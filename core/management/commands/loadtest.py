@@ -0,0 +1,63 @@
+"""Management команда для простого навантажувального тесту запущеного сервера"""
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand
+
+
+def fetch(url, timeout):
+    """Один запит. Повертає (помилка або None, час у мс)"""
+    started = time.perf_counter()
+    try:
+        with urlopen(url, timeout=timeout) as response:
+            response.read()
+            error = None if response.status == 200 else f'HTTP {response.status}'
+    except HTTPError as exc:
+        error = f'HTTP {exc.code}'
+    except URLError as exc:
+        error = f'{type(exc.reason).__name__}: {exc.reason}'
+    except OSError as exc:
+        error = type(exc).__name__
+    return error, (time.perf_counter() - started) * 1000
+
+
+class Command(BaseCommand):
+    help = 'Навантажувальний тест: N запитів з заданою паралельністю, RPS та перцентилі затримки'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='URL сторінок (запити розподіляються по колу)')
+        parser.add_argument('--requests', type=int, default=500, help='Загальна кількість запитів')
+        parser.add_argument('--concurrency', type=int, default=20, help='Кількість паралельних клієнтів')
+        parser.add_argument('--timeout', type=float, default=30, help='Таймаут запиту, с')
+
+    def handle(self, *args, **options):
+        urls = options['urls']
+        targets = [urls[i % len(urls)] for i in range(options['requests'])]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(lambda url: fetch(url, options['timeout']), targets))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(duration for error, duration in results if error is None)
+        errors = Counter(error for error, _duration in results if error is not None)
+        self.stdout.write(
+            f'Запитів: {len(results)}, помилок: {errors.total()}, паралельність: {options["concurrency"]}'
+        )
+        for error, count in errors.most_common():
+            self.stdout.write(self.style.ERROR(f'  {error}: {count}'))
+        # Перцентилі рахуються щонайменше з двох вдалих запитів
+        if len(latencies) < 2:
+            self.stderr.write(self.style.ERROR(f'Вдалих запитів: {len(latencies)}, затримку не виміряно'))
+            return
+
+        percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        self.stdout.write(f'RPS: {len(results) / elapsed:.1f}')
+        self.stdout.write(
+            f'Затримка, мс: p50={percentiles[49]:.1f} p95={percentiles[94]:.1f} '
+            f'p99={percentiles[98]:.1f} max={latencies[-1]:.1f}'
+        )
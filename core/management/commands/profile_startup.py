@@ -0,0 +1,75 @@
+"""Management команда для профілювання холодного старту (django.setup та імпорт WSGI)"""
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Виконується в чистому процесі з -X importtime, щоб кеш модулів не спотворював вимір
+PROBE = '''
+import json, os, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'adiabatic.settings')
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+import adiabatic.wsgi
+wsgi_done = time.perf_counter()
+print(json.dumps({
+    'setup': (setup_done - started) * 1000,
+    'wsgi': (wsgi_done - setup_done) * 1000,
+    'total': (wsgi_done - started) * 1000,
+}))
+'''
+
+
+def parse_importtime(output):
+    """Рядки "import time: self | cumulative | module" -> [(модуль, self мкс, cumulative мкс)]"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+class Command(BaseCommand):
+    help = 'Профілювання старту: час django.setup(), імпорту WSGI та розбивка імпортів по пакетах'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Кількість запусків (береться медіана)')
+        parser.add_argument('--top', type=int, default=15, help='Кількість найповільніших пакетів у звіті')
+
+    def handle(self, *args, **options):
+        timings = defaultdict(list)
+        packages = defaultdict(list)
+
+        for _run in range(options['runs']):
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', PROBE],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            )
+            for stage, duration in json.loads(result.stdout.strip().splitlines()[-1]).items():
+                timings[stage].append(duration)
+
+            run_packages = defaultdict(int)
+            for name, self_us, _cumulative_us in parse_importtime(result.stderr):
+                run_packages[name.split('.')[0]] += self_us
+            for package, self_us in run_packages.items():
+                packages[package].append(self_us)
+
+        self.stdout.write(f'Медіана з {options["runs"]} запусків:')
+        for stage in ('setup', 'wsgi', 'total'):
+            self.stdout.write(f'  {stage:<8} {statistics.median(timings[stage]):>8.1f} ms')
+
+        self.stdout.write(f'\nІмпорти по пакетах (self time, топ {options["top"]}):')
+        ranked = sorted(
+            ((package, statistics.median(values)) for package, values in packages.items()),
+            key=lambda item: item[1], reverse=True,
+        )
+        for package, self_us in ranked[:options['top']]:
+            self.stdout.write(f'  {package:<28} {self_us / 1000:>8.1f} ms')
@@ -0,0 +1,15 @@
+"""Management команда для перевірки прогріву воркера та звіту про час старту"""
+from django.core.management.base import BaseCommand
+
+from core.warmup import warmup
+
+
+class Command(BaseCommand):
+    help = 'Прогрів шаблонів, URL resolver та перекладів зі звітом про час кожного етапу'
+
+    def handle(self, *args, **options):
+        total = 0
+        for stage, count, duration in warmup():
+            total += duration
+            self.stdout.write(f'{stage:<14} {count:>5} {duration:>9.1f} ms')
+        self.stdout.write(self.style.SUCCESS(f'Прогрів завершено за {total:.1f} ms'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_paymentsettings_analyticsevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='analyticsevent',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Створено'),
+        ),
+    ]
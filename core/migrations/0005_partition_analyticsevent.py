@@ -0,0 +1,99 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import migrations
+
+TABLE = 'core_analyticsevent'
+LEGACY_TABLE = 'core_analyticsevent_legacy'
+SEQUENCE = 'core_analyticsevent_pk_seq'
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def next_month(month):
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+
+def partition_table(apps, schema_editor):
+    """Звичайна таблиця -> PARTITION BY RANGE (created_at) з місячними партиціями
+
+    Первинний ключ партиціонованої таблиці має містити ключ партиціонування,
+    тому він стає (id, created_at); id і далі генерується з послідовності.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    model = apps.get_model('core', 'AnalyticsEvent')
+    execute = schema_editor.execute
+
+    execute(f'ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}')
+    # Назва індексу первинного ключа не змінюється разом з таблицею
+    execute(f'ALTER INDEX {TABLE}_pkey RENAME TO {LEGACY_TABLE}_pkey')
+    execute(f'CREATE SEQUENCE {SEQUENCE}')
+    execute(
+        f'CREATE TABLE {TABLE} ('
+        f"id bigint NOT NULL DEFAULT nextval('{SEQUENCE}'), "
+        'event_type varchar(20) NOT NULL, '
+        'event_name varchar(100) NOT NULL, '
+        'page_url varchar(500) NOT NULL, '
+        'user_agent text NOT NULL, '
+        'ip_address inet NULL, '
+        'extra_data jsonb NOT NULL, '
+        'created_at timestamp with time zone NOT NULL, '
+        'PRIMARY KEY (id, created_at)'
+        ') PARTITION BY RANGE (created_at)'
+    )
+    execute(f'ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id')
+    execute(f'CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT')
+
+    # Партиції для місяців з наявними даними та двох наступних
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(created_at) FROM {LEGACY_TABLE}')
+        oldest = cursor.fetchone()[0]
+    now = datetime.now(dt_timezone.utc)
+    month = month_start(min(oldest, now) if oldest else now)
+    last = next_month(next_month(month_start(now)))
+    while month <= last:
+        execute(
+            f'CREATE TABLE {TABLE}_p{month:%Y_%m} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)',
+            [month, next_month(month)],
+        )
+        month = next_month(month)
+
+    execute(f'INSERT INTO {TABLE} SELECT id, event_type, event_name, page_url, user_agent, '
+            f'ip_address, extra_data, created_at FROM {LEGACY_TABLE}')
+    execute(f"SELECT setval('{SEQUENCE}', COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false)")
+    execute(f'DROP TABLE {LEGACY_TABLE}')
+
+    # Індекси моделі створюються на батьківській таблиці і успадковуються партиціями
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+
+
+def unpartition_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    model = apps.get_model('core', 'AnalyticsEvent')
+    execute = schema_editor.execute
+
+    execute(f'ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}')
+    execute(f'ALTER INDEX {TABLE}_pkey RENAME TO {LEGACY_TABLE}_pkey')
+    for index in model._meta.indexes:
+        execute(f'DROP INDEX IF EXISTS {index.name}')
+    schema_editor.create_model(model)
+    execute(f'INSERT INTO {TABLE} SELECT id, event_type, event_name, page_url, user_agent, '
+            f'ip_address, extra_data, created_at FROM {LEGACY_TABLE}')
+    execute(f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+            f'COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false)')
+    execute(f'DROP TABLE {LEGACY_TABLE} CASCADE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_analyticsevent_created_at_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_table, unpartition_table),
+    ]
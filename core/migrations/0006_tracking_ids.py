@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_partition_analyticsevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyticsevent',
+            name='session_id',
+            field=models.CharField(blank=True, max_length=32, verbose_name='ID сесії'),
+        ),
+        migrations.AddField(
+            model_name='analyticsevent',
+            name='visitor_id',
+            field=models.CharField(blank=True, max_length=32, verbose_name='ID відвідувача'),
+        ),
+    ]
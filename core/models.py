@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -159,11 +160,15 @@ class AnalyticsEvent(models.Model):
     page_url = models.URLField(_('URL сторінки'), max_length=500)
     user_agent = models.TextField(_('User Agent'), blank=True)
     ip_address = models.GenericIPAddressField(_('IP адреса'), blank=True, null=True)
+    # Ідентифікатори з cookie (static/js/analytics.js) для воронки конверсій
+    visitor_id = models.CharField(_('ID відвідувача'), max_length=32, blank=True)
+    session_id = models.CharField(_('ID сесії'), max_length=32, blank=True)
     
     # Додаткові дані (JSON)
     extra_data = models.JSONField(_('Додаткові дані'), default=dict, blank=True)
     
-    created_at = models.DateTimeField(_('Створено'), auto_now_add=True)
+    # Час отримання події; задається при прийомі, а не при пакетному записі з буфера
+    created_at = models.DateTimeField(_('Створено'), default=timezone.now, editable=False)
     
     class Meta:
         verbose_name = _('Подія аналітики')
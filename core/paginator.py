@@ -0,0 +1,71 @@
+"""Paginator для великих таблиць адмінки без COUNT(*) по всій таблиці"""
+from math import ceil
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def get_estimated_count(queryset):
+    """Оцінка кількості рядків таблиці з pg_class.reltuples (лише Postgres)
+
+    Для партиціонованої таблиці сумуються оцінки партицій. Повертає None,
+    якщо оцінки немає: інша БД або таблицю ще не аналізували.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT SUM(reltuples) FILTER (WHERE reltuples > 0)::bigint FROM pg_class '
+            'WHERE oid = %s::regclass OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)',
+            [table, table],
+        )
+        row = cursor.fetchone()
+    if not row or row[0] is None:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Оцінка для нефільтрованого списку, обмежений COUNT для фільтрованого
+
+    Сторінки з OFFSET доступні лише в межах count_cap рядків; далі список
+    гортається за курсором (див. LeadChangeList).
+    """
+
+    count_cap = 10000
+    # Малі таблиці рахуються точно: це дешево, а reltuples буває застарілим
+    estimate_threshold = 100000
+
+    is_estimated = False
+    is_capped = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = get_estimated_count(queryset)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                self.is_estimated = True
+                return estimate
+
+        # SELECT COUNT(*) FROM (... LIMIT cap + 1): не більше cap + 1 рядків
+        count = queryset.order_by()[:self.count_cap + 1].count()
+        if count > self.count_cap:
+            self.is_capped = True
+            return self.count_cap
+        return count
+
+    @cached_property
+    def num_pages(self):
+        if self.count == 0 and not self.allow_empty_first_page:
+            return 0
+        hits = max(1, min(self.count, self.count_cap) - self.orphans)
+        return ceil(hits / self.per_page)
+
+    @property
+    def has_more_than_pages(self):
+        """Чи є рядки за межами сторінок з номерами"""
+        return self.is_capped or self.count > self.count_cap
@@ -0,0 +1,180 @@
+"""Місячні партиції таблиці подій аналітики (PostgreSQL)
+
+На PostgreSQL core_analyticsevent - таблиця з PARTITION BY RANGE (created_at)
+(міграція core.0005): одна партиція на календарний місяць (UTC) плюс
+DEFAULT партиція для подій поза створеними місяцями. Видалення старого
+місяця - DETACH + DROP (або перенесення в схему архіву) без DELETE по рядках.
+На SQLite таблиця звичайна, а ретеншн виконується через DELETE.
+
+maintain() щодня викликається з core.maintenance і створює партиції на
+ANALYTICS_PARTITION_MONTHS_AHEAD місяців вперед, тож події не накопичуються
+в DEFAULT партиції. maintain() та команда analytics_retention виконуються
+під advisory блокуванням: DDL партицій робить лише один процес.
+"""
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .db import advisory_lock
+from .models import AnalyticsEvent
+
+ARCHIVE_SCHEMA = 'analytics_archive'
+LOCK_NAME = 'core.partitions.maintain'
+DELETE_BATCH_SIZE = 10000
+
+
+def get_table():
+    return AnalyticsEvent._meta.db_table
+
+
+def is_partitioned():
+    return connection.vendor == 'postgresql'
+
+
+def month_start(value):
+    """Початок місяця (UTC) для дати або datetime"""
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month):
+    return f'{get_table()}_p{month:%Y_%m}'
+
+
+def default_partition_name():
+    return f'{get_table()}_default'
+
+
+def retention_cutoff(now, months):
+    """Початок найстарішого місяця, який зберігається (поточний місяць включно)"""
+    return add_months(month_start(now), 1 - months)
+
+
+def list_partitions():
+    """Місячні партиції: [(назва, початок місяця)], від найстаріших"""
+    partition_re = re.compile(rf'^{re.escape(get_table())}_p(\d{{4}})_(\d{{2}})$')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE parent.relname = %s',
+            [get_table()],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        match = partition_re.match(name)
+        if match:
+            partitions.append((name, datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partition(month):
+    """Створити партицію місяця, якщо її ще немає
+
+    PostgreSQL не створить партицію, якщо DEFAULT вже містить події цього
+    місяця. Тоді в одній транзакції DEFAULT відокремлюється, створюється
+    партиція, події місяця переносяться в неї, і DEFAULT приєднується назад.
+    """
+    quote_name = connection.ops.quote_name
+    table = quote_name(get_table())
+    default = quote_name(default_partition_name())
+    created_at = quote_name(AnalyticsEvent._meta.get_field('created_at').column)
+    columns = ', '.join(quote_name(field.column) for field in AnalyticsEvent._meta.concrete_fields)
+    bounds = [month, add_months(month, 1)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [default_partition_name()])
+        move_rows = cursor.fetchone()[0]
+        if move_rows:
+            cursor.execute(
+                f'SELECT EXISTS (SELECT 1 FROM {default} WHERE {created_at} >= %s AND {created_at} < %s)',
+                bounds,
+            )
+            move_rows = cursor.fetchone()[0]
+        if move_rows:
+            cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {default}')
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {quote_name(partition_name(month))} '
+            f'PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)',
+            bounds,
+        )
+        if move_rows:
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM {default} WHERE {created_at} >= %s AND {created_at} < %s '
+                f'RETURNING {columns}) INSERT INTO {table} ({columns}) SELECT {columns} FROM moved',
+                bounds,
+            )
+            cursor.execute(f'ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT')
+
+
+def ensure_partitions(now, months_ahead=2):
+    """Партиції поточного та наступних місяців. Повертає назви створених"""
+    existing = {name for name, _month in list_partitions()}
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(month_start(now), offset)
+        if partition_name(month) not in existing:
+            create_partition(month)
+            created.append(partition_name(month))
+    return created
+
+
+def drop_partitions(before, archive=False):
+    """Відокремити партиції місяців до before та видалити або перенести в архів
+
+    Обидві операції змінюють лише метадані, тому не залежать від кількості
+    рядків. Повертає назви оброблених партицій.
+    """
+    quote_name = connection.ops.quote_name
+    removed = []
+    for name, month in list_partitions():
+        if month >= month_start(before):
+            break
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {quote_name(get_table())} DETACH PARTITION {quote_name(name)}')
+            if archive:
+                cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {quote_name(ARCHIVE_SCHEMA)}')
+                cursor.execute(f'ALTER TABLE {quote_name(name)} SET SCHEMA {quote_name(ARCHIVE_SCHEMA)}')
+            else:
+                cursor.execute(f'DROP TABLE {quote_name(name)}')
+        removed.append(name)
+    return removed
+
+
+def delete_before(before):
+    """Ретеншн для звичайної таблиці (SQLite): DELETE пакетами. Повертає кількість"""
+    deleted = 0
+    while True:
+        batch = list(
+            AnalyticsEvent.objects.filter(created_at__lt=before)
+            .order_by()
+            .values_list('pk', flat=True)[:DELETE_BATCH_SIZE]
+        )
+        if not batch:
+            return deleted
+        deleted += AnalyticsEvent.objects.filter(pk__in=batch).delete()[0]
+
+
+def maintain():
+    """Щоденне обслуговування: партиції наперед і ретеншн за ANALYTICS_RETENTION_MONTHS
+
+    Повертає False, якщо обслуговування вже виконує інший воркер чи процес.
+    """
+    with advisory_lock(LOCK_NAME) as acquired:
+        if not acquired:
+            return False
+        now = timezone.now()
+        cutoff = retention_cutoff(now, settings.ANALYTICS_RETENTION_MONTHS)
+        if is_partitioned():
+            ensure_partitions(now, settings.ANALYTICS_PARTITION_MONTHS_AHEAD)
+            drop_partitions(cutoff)
+        delete_before(cutoff)
+        return True
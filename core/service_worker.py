@@ -0,0 +1,101 @@
+"""Генерація service worker з маніфесту collectstatic"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import translation
+
+# Статичні файли, які потрібні кожній сторінці (шляхи відносно STATIC_ROOT)
+PRECACHE_STATIC = [
+    'css/critical.css',
+    'css/variables.css',
+    'css/reset.css',
+    'css/layout.css',
+    'css/typography.css',
+    'css/components.css',
+    'css/navigation.css',
+    'css/desktop-menu.css',
+    'css/hero.css',
+    'css/footer.css',
+    'js/base.js',
+    'js/utils.js',
+    'js/desktop-menu.js',
+    'js/form-validation.js',
+    'js/video.js',
+    'js/htmx-integration.js',
+    'images/favicon.ico',
+    'images/logo.png',
+]
+
+# Публічні сторінки (URL name), які кешуються для кожної мови
+PRECACHE_PAGES = [
+    'pages:home',
+    'pages:catalog',
+    'pages:products',
+    'pages:about',
+    'pages:partners',
+    'pages:blog',
+    'pages:contacts',
+]
+
+# Шляхи, які service worker ніколи не кешує
+BYPASS_PREFIXES = ['/admin/', '/leads/', '/i18n/', '/set-language/', '/sw.js']
+
+
+def get_service_worker_path():
+    """Шлях до згенерованого sw.js"""
+    return settings.STATIC_ROOT / 'sw.js'
+
+
+def get_static_urls():
+    """URL статичних файлів (з хешем, якщо є маніфест collectstatic)"""
+    return [staticfiles_storage.url(name) for name in PRECACHE_STATIC]
+
+
+def get_page_urls():
+    """URL сторінок з мовним префіксом для всіх мов сайту"""
+    urls = []
+    for language_code, _name in settings.LANGUAGES:
+        with translation.override(language_code):
+            urls.extend(reverse(name) for name in PRECACHE_PAGES)
+    return urls
+
+
+def build_service_worker():
+    """Зібрати код service worker. Повертає (версія, код)"""
+    static_urls = get_static_urls()
+    page_urls = get_page_urls()
+
+    # Хешовані URL змінюються разом із вмістом файлів, тому версія кешу
+    # оновлюється автоматично після кожного collectstatic зі змінами
+    version = hashlib.sha256('\n'.join(static_urls + page_urls).encode()).hexdigest()[:12]
+
+    content = render_to_string('sw.js', {
+        'cache_version': version,
+        'static_urls': json.dumps(static_urls),
+        'page_urls': json.dumps(page_urls),
+        'bypass_prefixes': json.dumps(BYPASS_PREFIXES),
+        'static_url': json.dumps(settings.STATIC_URL),
+    })
+    return version, content
+
+
+_service_worker_cache = None
+
+
+def get_service_worker():
+    """Код service worker: згенерований при збірці або зібраний на льоту (розробка)"""
+    global _service_worker_cache
+    if settings.DEBUG:
+        return build_service_worker()[1]
+
+    if _service_worker_cache is None:
+        path = get_service_worker_path()
+        if path.exists():
+            _service_worker_cache = path.read_text(encoding='utf-8')
+        else:
+            _service_worker_cache = build_service_worker()[1]
+    return _service_worker_cache
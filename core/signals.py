@@ -0,0 +1,15 @@
+"""Інвалідація кешу спільних фрагментів base.html"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import LAYOUT_CACHE, bump_cache_version
+from .models import Language, Menu, MenuItem, SiteSettings
+
+
+@receiver([post_save, post_delete], sender=SiteSettings)
+@receiver([post_save, post_delete], sender=Language)
+@receiver([post_save, post_delete], sender=Menu)
+@receiver([post_save, post_delete], sender=MenuItem)
+def invalidate_layout(sender, **kwargs):
+    """Шапка, меню та футер перерендеряться з новими налаштуваннями"""
+    bump_cache_version(LAYOUT_CACHE)
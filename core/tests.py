@@ -1,3 +1,74 @@
+import json
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+
+from .analytics import MAX_BODY_BYTES, MAX_EVENT_DATA_BYTES, collector
+
+
+@mock.patch.object(collector, 'add')
+class CollectEventsTests(TestCase):
+    """Прийом подій аналітики: некоректні дані не доходять до буфера і не дають 500"""
+
+    def post(self, payload, **extra):
+        body = payload if isinstance(payload, (str, bytes)) else json.dumps(payload)
+        return self.client.post(
+            reverse('analytics_collect'), body, content_type='text/plain',
+            HTTP_REFERER='https://example.com/uk/', **extra,
+        )
+
+    def buffered(self, add):
+        return [event for call in add.call_args_list for event in call.args[0]]
+
+    def test_valid_batch_is_buffered(self, add):
+        response = self.post([
+            {'type': 'page_view'},
+            {'type': 'download', 'name': 'catalog.pdf', 'url': 'https://example.com/uk/catalog/', 'data': {'a': 1}},
+        ], REMOTE_ADDR='203.0.113.7')
+        self.assertEqual(response.status_code, 204)
+        events = self.buffered(add)
+        self.assertEqual([(event['type'], event['name'], event['url']) for event in events], [
+            ('page_view', 'page_view', 'https://example.com/uk/'),
+            ('download', 'catalog.pdf', 'https://example.com/uk/catalog/'),
+        ])
+        self.assertEqual(events[1]['data'], {'a': 1})
+        self.assertEqual(events[0]['ip'], '203.0.113.7')
+
+    def test_events_object_is_accepted(self, add):
+        response = self.post({'events': [{'type': 'contact'}]})
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(self.buffered(add)), 1)
+
+    def test_malformed_json_is_bad_request(self, add):
+        for body in ('[{"type": ', b'\xff\xfe', ''):
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+        add.assert_not_called()
+
+    def test_non_list_body_is_bad_request(self, add):
+        for payload in ('page_view', 42, {'events': 'page_view'}):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post(payload).status_code, 400)
+        add.assert_not_called()
+
+    def test_too_large_body_is_bad_request(self, add):
+        response = self.post([{'type': 'page_view', 'name': 'x' * MAX_BODY_BYTES}])
+        self.assertEqual(response.status_code, 400)
+        add.assert_not_called()
 
-# Create your tests here.
+    def test_invalid_events_are_dropped(self, add):
+        invalid = [
+            'page_view',
+            {'type': {'a': 1}},
+            {'type': ['page_view']},
+            {'type': 'unknown'},
+            {'type': 'page_view', 'name': ['x']},
+            {'type': 'page_view', 'url': 'javascript:alert(1)'},
+            {'type': 'page_view', 'url': {'href': 'https://example.com/'}},
+            {'type': 'page_view', 'data': ['x']},
+            {'type': 'page_view', 'data': {'text': 'x' * MAX_EVENT_DATA_BYTES}},
+        ]
+        response = self.post(invalid + [{'type': 'page_view'}])
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(self.buffered(add)), 1)
@@ -1,3 +1,40 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 
-# Create your views here.
+from .analytics import collector, parse_events
+
+from .db import get_pool_stats
+from .service_worker import get_service_worker
+
+
+@require_GET
+def service_worker(request):
+    """Service worker з кореня сайту, щоб scope охоплював усі сторінки"""
+    response = HttpResponse(get_service_worker(), content_type='application/javascript')
+    # Браузер має завжди перевіряти нову версію sw.js
+    response['Cache-Control'] = 'no-cache'
+    response['Service-Worker-Allowed'] = '/'
+    return response
+
+
+@require_GET
+@never_cache
+@staff_member_required
+def db_pool_stats(request):
+    """Статистика пулу з'єднань з БД поточного воркера (лише для персоналу)"""
+    return JsonResponse({'pools': get_pool_stats()})
+
+
+@csrf_exempt
+@require_POST
+def collect_events(request):
+    """Прийом подій аналітики (navigator.sendBeacon) без очікування запису в БД"""
+    try:
+        events, _rejected = parse_events(request)
+    except ValueError:
+        return HttpResponseBadRequest()
+    collector.add(events)
+    return HttpResponse(status=204)
@@ -0,0 +1,89 @@
+"""Прогрів воркера при старті: шаблони, URL resolver, каталоги перекладів"""
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+from django.utils import translation
+from django.utils.translation import trans_real
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = {'.html', '.txt', '.xml', '.js'}
+
+
+def get_project_template_names():
+    """Імена шаблонів з DIRS та templates/ застосунків проєкту (без сторонніх пакетів)"""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    template_dirs = [Path(d) for d in engines['django'].engine.dirs]
+    template_dirs += [
+        Path(d) for d in get_app_template_dirs('templates')
+        if Path(d).resolve().is_relative_to(base_dir)
+    ]
+
+    names = []
+    for template_dir in template_dirs:
+        for path in sorted(template_dir.rglob('*')):
+            if path.is_file() and path.suffix in TEMPLATE_EXTENSIONS:
+                name = path.relative_to(template_dir).as_posix()
+                if name not in names:
+                    names.append(name)
+    return names
+
+
+def warm_templates():
+    """Скомпілювати шаблони в cached loader. Повертає кількість"""
+    engine = engines['django'].engine
+    count = 0
+    for name in get_project_template_names():
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError:
+            # Фрагменти, що не є самостійними шаблонами, не зупиняють старт
+            logger.warning('Шаблон %s не скомпільовано', name, exc_info=True)
+            continue
+        count += 1
+    return count
+
+
+def warm_urls():
+    """Заповнити URL resolver (reverse_dict будується окремо для кожної мови)"""
+    resolver = get_resolver()
+    count = 0
+    for language_code, _name in settings.LANGUAGES:
+        with translation.override(language_code):
+            count += len(resolver.reverse_dict)
+    return count
+
+
+def warm_translations():
+    """Завантажити каталоги перекладів усіх мов сайту (.mo файли всіх застосунків)"""
+    for language_code, _name in settings.LANGUAGES:
+        trans_real.translation(language_code)
+    return len(settings.LANGUAGES)
+
+
+# Каталоги перекладів - до URL: translation.override() в warm_urls завантажує
+# їх мимохідь, і час етапу translations був би нульовим
+WARMUP_STAGES = [
+    ('templates', warm_templates),
+    ('translations', warm_translations),
+    ('urls', warm_urls),
+]
+
+
+def warmup():
+    """Виконати всі етапи прогріву. Повертає [(етап, кількість, мс), ...]"""
+    report = []
+    for stage, func in WARMUP_STAGES:
+        started = time.perf_counter()
+        count = func()
+        report.append((stage, count, (time.perf_counter() - started) * 1000))
+
+    logger.info('Warmup: %s', ', '.join(
+        f'{stage}={count} ({duration:.1f} ms)' for stage, count, duration in report
+    ))
+    return report
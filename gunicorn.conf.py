@@ -0,0 +1,103 @@
+"""Конфігурація gunicorn (gunicorn --config gunicorn.conf.py adiabatic.wsgi:application)
+
+Заявки відправляють нотифікації в Telegram/Viber/email синхронно, тому
+воркери gthread: поки один потік чекає на зовнішній API, інші обслуговують
+сторінки. Кількість воркерів обмежена і CPU, і пам'яттю інстансу
+(безкоштовний план Render: 512 MB).
+"""
+import multiprocessing
+import os
+from pathlib import Path
+
+# Орієнтовна пам'ять одного воркера Django з прогрітими шаблонами, MB
+WORKER_MEMORY_MB = 90
+
+
+def get_memory_limit_mb():
+    """Ліміт пам'яті контейнера (cgroup v2/v1) або фізична пам'ять, MB"""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            value = Path(path).read_text().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value) // (1024 * 1024)
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (ValueError, OSError):
+        return 512
+
+
+def get_workers():
+    """WEB_CONCURRENCY або 2 * CPU + 1, але не більше, ніж вміщує пам'ять"""
+    if os.getenv('WEB_CONCURRENCY'):
+        return int(os.getenv('WEB_CONCURRENCY'))
+    by_cpu = multiprocessing.cpu_count() * 2 + 1
+    by_memory = max(get_memory_limit_mb() // WORKER_MEMORY_MB - 1, 1)
+    return max(min(by_cpu, by_memory), 1)
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Застосунок (і core.warmup) завантажується один раз у майстер-процесі,
+# воркери отримують прогріті шаблони та URL через fork
+preload_app = True
+worker_class = 'gthread'
+workers = get_workers()
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Render проксі тримає з'єднання відкритими; keep-alive трохи довший за його
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '75'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 20
+
+# Перезапуск воркерів проти росту пам'яті; jitter, щоб вони не рестартували разом
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def pre_fork(server, worker):
+    """Пул з'єднань psycopg має фонові потоки, які не переживають fork"""
+    from core.db import close_pools
+
+    close_pools()
+
+
+def post_fork(server, worker):
+    """З'єднання з БД з майстер-процесу не можна ділити між воркерами"""
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    """Перевірити БД, заповнити кеш воркера і запустити фоновий потік
+
+    LocMem кеш (без REDIS_URL) живе в кожному процесі окремо, тому
+    налаштування сайту завантажуються в кожному воркері. З'єднання з БД
+    потоків gthread свої (thread-local) і відкриваються при першому запиті,
+    тож з'єднання головного потоку після прогріву закривається. Потік
+    аналітики стартує одразу, бо він же виконує періодичні задачі
+    (core.maintenance), навіть коли подій немає.
+    """
+    from django.db import connections
+
+    from core.analytics import collector
+    from core.cache import LAYOUT_CACHE, get_cache_version
+    from core.context_processors import get_site_settings
+
+    collector.ensure_flusher()
+    try:
+        for connection in connections.all():
+            connection.ensure_connection()
+        get_cache_version(LAYOUT_CACHE)
+        get_site_settings()
+    except Exception:
+        # Недоступна БД не повинна зупиняти воркер: запит спробує ще раз
+        worker.log.exception('Не вдалося прогріти воркер')
+    finally:
+        connections.close_all()
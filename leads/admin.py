@@ -1,10 +1,93 @@
+from datetime import datetime
+
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from core.paginator import EstimatedCountPaginator
+from .export import EXPORT_FORMATS, get_export_filename, stream_export
 from .models import Lead, LeadSource, EmailTemplate, NotificationSettings, LeadActivity
 
+# Параметр курсора в URL списку заявок: "<created_at>_<id>" останньої показаної заявки
+CURSOR_VAR = 'cursor'
+# Сортування, для якого працює курсор (Meta.ordering + pk, який додає адмінка)
+KEYSET_ORDERING = ('-created_at', '-pk')
+
+
+class LeadChangeList(ChangeList):
+    """Список заявок з навігацією за курсором (created_at, id) замість OFFSET
+
+    Сторінки з номерами покривають перші count_cap рядків, глибше список
+    гортається посиланням "Далі" за індексом (created_at, id).
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = self.parse_cursor(request.GET.get(CURSOR_VAR))
+        super().__init__(request, *args, **kwargs)
+
+    @staticmethod
+    def parse_cursor(value):
+        if not value:
+            return None
+        created_at, _sep, pk = value.rpartition('_')
+        try:
+            return datetime.fromisoformat(created_at), int(pk)
+        except ValueError:
+            raise IncorrectLookupParameters(_('Некоректний курсор'))
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Зміна фільтрів, пошуку чи сортування повертає на початок списку
+        return super().get_query_string(new_params, [*(remove or []), CURSOR_VAR])
+
+    @cached_property
+    def keyset_enabled(self):
+        return tuple(self.queryset.query.order_by) == KEYSET_ORDERING
+
+    def get_results(self, request):
+        super().get_results(request)
+        if not self.keyset_enabled:
+            # Курсор має сенс лише для сортування за датою
+            self.cursor = None
+        if self.cursor:
+            created_at, pk = self.cursor
+            # self.queryset лишається без курсора: дії з "вибрати всі" діють на весь список
+            # (created_at, id) < курсора; created_at__lte дає діапазон по індексу,
+            # тоді як OR з created_at__lt повністю сканує індекс
+            self.result_list = self.queryset.filter(created_at__lte=created_at).exclude(
+                created_at=created_at, pk__gte=pk,
+            )[:self.list_per_page]
+            self.multi_page = True
+            self.can_show_all = False
+
+    @cached_property
+    def keyset_next_url(self):
+        """Посилання на наступну сторінку за курсором або None"""
+        if not self.keyset_enabled:
+            return None
+        if self.cursor is None and not (
+            self.paginator.has_more_than_pages and self.page_num == self.paginator.num_pages
+        ):
+            return None
+        rows = list(self.result_list)
+        if len(rows) < self.list_per_page:
+            return None
+        last = rows[-1]
+        return self.get_query_string({CURSOR_VAR: f'{last.created_at.isoformat()}_{last.pk}'})
+
+    @property
+    def keyset_first_url(self):
+        return self.get_query_string()
+
 
 class LeadActivityInline(admin.TabularInline):
     """Inline для активності заявки"""
@@ -21,8 +104,8 @@ class LeadActivityInline(admin.TabularInline):
 class LeadAdmin(admin.ModelAdmin):
     """Адмінка для заявок"""
     list_display = [
-        'name', 'email', 'phone', 'company', 'product_name', 
-        'get_inquiry_type_display', 'status', 'created_at'
+        'name', 'email', 'phone', 'company', 'product_name',
+        'inquiry_type', 'status', 'created_at'
     ]
     list_filter = [
         'status', 'inquiry_type', 
@@ -30,9 +113,13 @@ class LeadAdmin(admin.ModelAdmin):
     ]
     search_fields = ['name', 'email', 'phone', 'company', 'message']
     list_editable = ['status']
+    list_per_page = 100
+    # Без COUNT(*) по всій таблиці на кожному відкритті списку
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = [
         'created_at', 'updated_at', 'ip_address', 
-        'user_agent', 'referrer', 'get_full_contact'
+        'user_agent', 'referrer', 'get_full_contact', 'spam_score'
     ]
     
     inlines = [LeadActivityInline]
@@ -48,7 +135,7 @@ class LeadAdmin(admin.ModelAdmin):
             'fields': ('status', 'internal_notes', 'contacted_at')
         }),
         (_('Технічна інформація'), {
-            'fields': ('source', 'source_page', 'referrer', 'ip_address', 'user_agent', 'language'),
+            'fields': ('source', 'source_page', 'referrer', 'ip_address', 'user_agent', 'language', 'spam_score'),
             'classes': ('collapse',)
         }),
         (_('GDPR згода'), {
@@ -62,17 +149,20 @@ class LeadAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('source')
-    
+
+    def get_changelist(self, request, **kwargs):
+        return LeadChangeList
+
     def get_full_contact(self, obj):
         """Повна контактна інформація"""
         return obj.get_full_contact()
     get_full_contact.short_description = _('Повний контакт')
     
-    actions = ['mark_as_contacted', 'mark_as_spam']
+    actions = ['mark_as_contacted', 'mark_as_spam', 'export_csv', 'export_xlsx']
     
     def mark_as_contacted(self, request, queryset):
         """Позначити як зв'язалися"""
-        updated = queryset.update(status='contacted')
+        updated = queryset.transition('contacted', user=request.user.get_username())
         self.message_user(
             request,
             f'Оновлено статус для {updated} заявок на "Зв\'язалися"'
@@ -81,13 +171,32 @@ class LeadAdmin(admin.ModelAdmin):
     
     def mark_as_spam(self, request, queryset):
         """Позначити як спам"""
-        updated = queryset.update(status='spam')
+        updated = queryset.transition('spam', user=request.user.get_username())
         self.message_user(
             request,
             f'Позначено {updated} заявок як спам'
         )
     mark_as_spam.short_description = _('Позначити як спам')
 
+    def export_leads(self, queryset, export_format):
+        """Потокова відповідь з файлом експорту вибраних (або всіх відфільтрованих) заявок"""
+        response = StreamingHttpResponse(
+            stream_export(queryset, export_format),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{get_export_filename(export_format)}"'
+        return response
+
+    def export_csv(self, request, queryset):
+        """Експорт у CSV"""
+        return self.export_leads(queryset, 'csv')
+    export_csv.short_description = _('Експортувати в CSV')
+
+    def export_xlsx(self, request, queryset):
+        """Експорт у XLSX"""
+        return self.export_leads(queryset, 'xlsx')
+    export_xlsx.short_description = _('Експортувати в XLSX')
+
 
 @admin.register(LeadSource)
 class LeadSourceAdmin(admin.ModelAdmin):
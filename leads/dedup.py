@@ -0,0 +1,128 @@
+"""Ідемпотентне збереження заявок: повтори не створюють нових рядків
+
+Повтором вважається заявка з тим самим відбитком (тип форми, email,
+телефон, тип запиту, продукт, тема, текст повідомлення) протягом LEAD_DEDUP_WINDOW секунд або з тим
+самим ключем Idempotency-Key від клієнта. Перша заявка займає ключ у
+кеші через cache.add(), тож паралельний подвійний клік чекає на її UUID.
+Якщо кеш окремий для кожного воркера або ключ витіснено, повтор
+знаходиться за індексом (fingerprint, created_at) та унікальним
+idempotency_key у БД.
+"""
+import hashlib
+import re
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Lead
+
+CACHE_PREFIX = 'leads:dedup:'
+PENDING = 'pending'
+# Скільки чекати на паралельний запит, що вже зберігає таку саму заявку
+PENDING_WAIT = 3.0
+PENDING_POLL = 0.05
+IDEMPOTENCY_KEY_RE = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
+def normalize_text(value):
+    return ' '.join(str(value or '').split()).lower()
+
+
+def get_fingerprint(form_type, lead):
+    """sha256 від типу форми, контактів, предмета заявки та нормалізованого повідомлення
+
+    Предмет (тип запиту, продукт, тема) входить у відбиток: запити ціни на
+    різні продукти з тим самим текстом - різні заявки, а не повтор.
+    """
+    message_hash = hashlib.sha256(normalize_text(lead.message).encode()).hexdigest()
+    parts = [
+        form_type, normalize_text(lead.email), re.sub(r'\D', '', lead.phone or ''),
+        lead.inquiry_type or '', normalize_text(lead.product_name), normalize_text(lead.subject), message_hash,
+    ]
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+
+def get_idempotency_key(request, data):
+    """Ключ з заголовка Idempotency-Key або поля idempotency_key; некоректний -> ''"""
+    key = request.headers.get('Idempotency-Key') or data.get('idempotency_key') or ''
+    return key if isinstance(key, str) and IDEMPOTENCY_KEY_RE.match(key) else ''
+
+
+def get_cache_keys(lead):
+    """Ключі кешу заявки; перший займається при збереженні"""
+    keys = [f'{CACHE_PREFIX}fp:{lead.fingerprint}']
+    if lead.idempotency_key:
+        keys.insert(0, f'{CACHE_PREFIX}key:{lead.idempotency_key}')
+    return keys
+
+
+def wait_for_uuid(key):
+    """UUID заявки, яку зберігає паралельний запит, або None після PENDING_WAIT"""
+    deadline = time.monotonic() + PENDING_WAIT
+    while time.monotonic() < deadline:
+        value = cache.get(key)
+        if value is None:
+            return None
+        if value != PENDING:
+            return value
+        time.sleep(PENDING_POLL)
+    return None
+
+
+def find_saved_uuid(lead):
+    """UUID збереженої раніше такої самої заявки за індексами БД"""
+    if lead.idempotency_key:
+        uuid = Lead.objects.filter(idempotency_key=lead.idempotency_key).values_list('uuid', flat=True).first()
+        if uuid:
+            return str(uuid)
+    since = timezone.now() - timedelta(seconds=settings.LEAD_DEDUP_WINDOW)
+    uuid = (
+        Lead.objects.filter(fingerprint=lead.fingerprint, created_at__gte=since)
+        .order_by('created_at').values_list('uuid', flat=True).first()
+    )
+    return str(uuid) if uuid else None
+
+
+def save_lead_once(lead, form_type, idempotency_key=''):
+    """Зберегти заявку, якщо це не повтор. Повертає True, якщо заявку створено
+
+    При повторі нічого не записується, а lead.uuid замінюється на UUID
+    першої заявки, щоб клієнт отримав ту саму відповідь.
+    """
+    lead.fingerprint = get_fingerprint(form_type, lead)
+    lead.idempotency_key = idempotency_key
+    keys = get_cache_keys(lead)
+    timeout = settings.LEAD_DEDUP_WINDOW
+
+    saved = cache.get_many(keys)
+    uuid = next((value for value in saved.values() if value != PENDING), None)
+    if uuid is None and not cache.add(keys[0], PENDING, timeout=timeout):
+        uuid = wait_for_uuid(keys[0])
+    if uuid is None:
+        uuid = find_saved_uuid(lead)
+    if uuid:
+        # Замінює і PENDING, якщо ключ щойно зайняв цей запит
+        cache.set_many({key: uuid for key in keys}, timeout=timeout)
+        lead.uuid = uuid
+        return False
+
+    try:
+        with transaction.atomic():
+            lead.save()
+    except IntegrityError:
+        # Той самий Idempotency-Key одночасно на іншому воркері
+        cache.delete(keys[0])
+        uuid = find_saved_uuid(lead)
+        if uuid is None:
+            raise
+        lead.uuid = uuid
+        return False
+    except Exception:
+        cache.delete(keys[0])
+        raise
+    cache.set_many({key: str(lead.uuid) for key in keys}, timeout=timeout)
+    return True
@@ -0,0 +1,210 @@
+"""Потоковий експорт заявок у CSV/XLSX з постійним споживанням пам'яті
+
+Рядки читаються з БД через iterator(chunk_size) (на Postgres - серверний
+курсор) і одразу віддаються генератором, тому весь результат ніколи не
+зберігається в пам'яті ні як QuerySet, ні як файл.
+"""
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from .models import Lead, LeadActivity
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = [
+    'id', 'created_at', 'status', 'inquiry_type', 'name', 'email', 'phone',
+    'company', 'position', 'product_name', 'subject', 'message',
+    'budget_range', 'project_timeline', 'source', 'source_page', 'language',
+    'consent_marketing', 'contacted_at',
+]
+
+# Символи, заборонені в XML 1.0 (трапляються в повідомленнях, скопійованих з документів)
+XML_ILLEGAL_CHARS = dict.fromkeys(
+    [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20)]
+)
+# Початок комірки, з якого Excel/LibreOffice сприймають її як формулу
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+# Числа й телефони (+380 50 123-45-67) лишаються як є: без літер формулу не записати
+PLAIN_NUMBER_RE = re.compile(r'^[+-]?[\d\s()-]+$')
+
+
+def get_export_queryset(queryset):
+    """Заявки з назвою джерела та останньою активністю одним запитом"""
+    latest_activity = LeadActivity.objects.filter(lead=OuterRef('pk')).order_by('-created_at', '-pk')
+    return queryset.select_related('source').annotate(
+        latest_activity_type=Subquery(latest_activity.values('activity_type')[:1]),
+        latest_activity_at=Subquery(latest_activity.values('created_at')[:1]),
+    ).order_by('-created_at', '-pk')
+
+
+def get_export_headers():
+    headers = [str(Lead._meta.get_field(name).verbose_name) for name in EXPORT_FIELDS]
+    return headers + [_('Остання активність'), _('Дата останньої активності')]
+
+
+def iter_export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Рядки експорту (списки рядків), починаючи із заголовків"""
+    yield get_export_headers()
+
+    # Підписи choices перекладаються один раз, а не для кожного рядка
+    choices = {
+        'status': {key: str(label) for key, label in Lead.STATUS_CHOICES},
+        'inquiry_type': {key: str(label) for key, label in Lead.INQUIRY_TYPES},
+    }
+    activity_types = {key: str(label) for key, label in LeadActivity.ACTIVITY_TYPES}
+    yes, no = _('так'), _('ні')
+
+    def format_value(value):
+        if value is None:
+            return ''
+        if isinstance(value, bool):
+            return yes if value else no
+        if hasattr(value, 'tzinfo'):
+            return timezone.localtime(value).strftime('%Y-%m-%d %H:%M')
+        return str(value)
+
+    for lead in get_export_queryset(queryset).iterator(chunk_size=chunk_size):
+        row = []
+        for name in EXPORT_FIELDS:
+            value = getattr(lead, name)
+            if name in choices:
+                value = choices[name].get(value, value)
+            elif name == 'source':
+                value = value.name if value else ''
+            row.append(format_value(value))
+        row.append(activity_types.get(lead.latest_activity_type, lead.latest_activity_type or ''))
+        row.append(format_value(lead.latest_activity_at))
+        yield row
+
+
+class _Echo:
+    """Файлоподібний об'єкт, який повертає записане замість збереження"""
+
+    def write(self, value):
+        return value
+
+
+def escape_formula(value):
+    """Комірка CSV як текст, а не формула (дані заявок вводять відвідувачі сайту)"""
+    if value.startswith(FORMULA_PREFIXES) and not PLAIN_NUMBER_RE.match(value):
+        return f"'{value}"
+    return value
+
+
+def stream_csv(rows):
+    """CSV з BOM, щоб Excel коректно відкривав кирилицю"""
+    writer = csv.writer(_Echo())
+    yield '\ufeff'.encode()
+    for row in rows:
+        yield writer.writerow([escape_formula(value) for value in row]).encode()
+
+
+class _ZipStream:
+    """Незберігаючий потік для zipfile: записані байти забираються через pop()"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Leads" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def stream_xlsx(rows):
+    """Мінімальна книга XLSX (один аркуш, inline рядки) без openpyxl
+
+    zipfile пише в потік без seek, тому кожен аркуш стискається і
+    віддається частинами по мірі надходження рядків.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        yield stream.pop()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            for row in rows:
+                cells = ''.join(
+                    f'<c t="inlineStr"><is><t xml:space="preserve">'
+                    f'{escape(value.translate(XML_ILLEGAL_CHARS))}</t></is></c>'
+                    for value in row
+                )
+                sheet.write(f'<row>{cells}</row>'.encode())
+                data = stream.pop()
+                if data:
+                    yield data
+            sheet.write(b'</sheetData></worksheet>')
+    yield stream.pop()
+
+
+def stream_export(queryset, export_format, chunk_size=CHUNK_SIZE):
+    """Генератор байтів файлу експорту у форматі csv або xlsx"""
+    rows = iter_export_rows(queryset, chunk_size=chunk_size)
+    if export_format == 'xlsx':
+        return stream_xlsx(rows)
+    return stream_csv(rows)
+
+
+def get_export_filename(export_format):
+    return f"leads-{timezone.localtime().strftime('%Y%m%d-%H%M')}.{export_format}"
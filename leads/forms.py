@@ -3,6 +3,9 @@ from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator
 from .models import Lead
 
+# Міжнародний формат E.164; спільний для валідатора та атрибута pattern
+PHONE_PATTERN = r'^\+?[1-9]\d{1,14}$'
+
 
 class LeadForm(forms.ModelForm):
     """Базова форма заявки"""
@@ -20,14 +23,14 @@ class LeadForm(forms.ModelForm):
         max_length=17,
         validators=[
             RegexValidator(
-                regex=r'^\+?[1-9]\d{1,14}$',
+                regex=PHONE_PATTERN,
                 message=_('Введіть коректний номер телефону (наприклад: +380501234567)')
             )
         ],
         widget=forms.TextInput(attrs={
             'placeholder': '+380501234567',
             'class': 'form__input',
-            'pattern': r'^\+?[1-9]\d{1,14}$',
+            'pattern': PHONE_PATTERN,
             'title': _('Формат: +380501234567')
         })
     )
@@ -225,10 +228,14 @@ class QuickQuoteForm(forms.ModelForm):
             raise forms.ValidationError(_('Спам детектовано.'))
         return website
     
-    def save(self, commit=True):
-        lead = super().save(commit=False)
+    def set_lead_defaults(self, lead):
+        """Поля, яких немає у швидкій формі (також викликається з leads.schema)"""
         lead.inquiry_type = 'price_request'
         lead.subject = f"{_('Швидкий запит ціни')} - {lead.product_name if lead.product_name else _('Загальний запит')}"
+    
+    def save(self, commit=True):
+        lead = super().save(commit=False)
+        self.set_lead_defaults(lead)
         
         if commit:
             lead.save()
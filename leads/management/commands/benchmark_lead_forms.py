@@ -0,0 +1,122 @@
+"""Management команда для бенчмарку валідації заявок: ModelForm проти leads.schema"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.forms.models import model_to_dict
+from django.http import QueryDict
+from django.utils import translation
+
+from leads.forms import ContactForm, LeadForm, QuickQuoteForm
+from leads.schema import CONTACT_SCHEMA, LEAD_SCHEMA, QUICK_QUOTE_SCHEMA
+
+VALID = {
+    'name': 'Олена Коваленко',
+    'email': 'olena@example.com',
+    'phone': '+380501234567',
+    'company': 'Теплосервіс',
+    'inquiry_type': 'tech_consultation',
+    'product_name': 'Пластинчастий теплообмінник',
+    'subject': 'Підбір обладнання',
+    'message': 'Потрібен теплообмінник для системи ГВП, 200 кВт. Прошу зв\'язатися.',
+    'consent_gdpr': True,
+}
+# Назва -> зміни відносно VALID (None - поле відсутнє)
+CASES = {
+    'valid': {},
+    'missing name': {'name': None},
+    'empty message': {'message': ''},
+    'invalid email': {'email': 'olena@'},
+    'invalid phone': {'phone': '050-123'},
+    'short phone (model)': {'phone': '+12345'},
+    'phone without plus': {'phone': '380501234567'},
+    'long name': {'name': 'x' * 150},
+    'invalid inquiry type': {'inquiry_type': 'unknown'},
+    'no consent': {'consent_gdpr': None},
+    'consent "false"': {'consent_gdpr': 'false'},
+    'honeypot': {'website': 'http://spam.example'},
+    'everything wrong': {'name': '', 'email': 'x', 'phone': 'abc', 'inquiry_type': '?', 'consent_gdpr': None},
+}
+FORMS = {
+    'lead': (LeadForm, LEAD_SCHEMA),
+    'quick_quote': (QuickQuoteForm, QUICK_QUOTE_SCHEMA),
+    'contact': (ContactForm, CONTACT_SCHEMA),
+}
+
+
+def build_payloads():
+    """[(назва, dict як з JSON, QueryDict як з POST)]"""
+    payloads = []
+    for name, changes in CASES.items():
+        data = {key: value for key, value in {**VALID, **changes}.items() if value is not None}
+        query = QueryDict(mutable=True)
+        for key, value in data.items():
+            query[key] = 'on' if value is True else str(value)
+        payloads.append((name, data, query))
+    return payloads
+
+
+def form_path(form_class, data):
+    """Поточний шлях view: ModelForm + форматування помилок"""
+    form = form_class(data)
+    if form.is_valid():
+        return form.save(commit=False), None
+    return None, {field: [str(error) for error in errors] for field, errors in form.errors.items()}
+
+
+def describe(form_class, result):
+    lead, errors = result
+    if lead is None:
+        return errors
+    fields = list(form_class._meta.fields) + ['inquiry_type', 'subject']
+    return model_to_dict(lead, fields=fields)
+
+
+def measure(function, payloads, repeat):
+    """Медіана мікросекунд на одну валідацію"""
+    timings = []
+    for _run in range(repeat):
+        started = time.perf_counter()
+        for payload in payloads:
+            function(payload)
+        timings.append((time.perf_counter() - started) / len(payloads) * 1e6)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк валідації заявок: ModelForm проти швидкої схеми (з перевіркою однакового результату)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help='Кількість проходів по всіх варіантах (медіана)')
+        parser.add_argument('--language', default='uk', help='Мова повідомлень про помилки')
+
+    def handle(self, *args, **options):
+        payloads = build_payloads()
+        mismatches = 0
+        with translation.override(options['language']):
+            for form_name, (form_class, schema) in FORMS.items():
+                for case, data, query in payloads:
+                    for source, payload in (('json', data), ('post', query)):
+                        expected = describe(form_class, form_path(form_class, payload))
+                        actual = describe(form_class, schema.validate(payload))
+                        if expected != actual:
+                            mismatches += 1
+                            self.stdout.write(self.style.ERROR(
+                                f'{form_name} / {case} / {source}: {expected!r} != {actual!r}'
+                            ))
+
+            self.stdout.write(f'{"форма":<12} {"варіант":<10} {"ModelForm":>12} {"схема":>12} {"прискорення":>12}')
+            for form_name, (form_class, schema) in FORMS.items():
+                for label, selected in (('valid', payloads[:1]), ('all', payloads)):
+                    data = [payload for _case, payload, _query in selected]
+                    form_us = measure(lambda payload: form_path(form_class, payload), data, options['repeat'])
+                    schema_us = measure(schema.validate, data, options['repeat'])
+                    self.stdout.write(
+                        f'{form_name:<12} {label:<10} {form_us:>9.1f} us {schema_us:>9.1f} us '
+                        f'{form_us / schema_us:>11.1f}x'
+                    )
+
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'Розбіжностей з ModelForm: {mismatches}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Результати схеми збігаються з ModelForm'))
@@ -0,0 +1,119 @@
+"""Management команда для бенчмарку запитів адмінки заявок на синтетичних даних"""
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from leads.models import Lead
+
+# Домен, за яким синтетичні заявки відрізняються від справжніх
+SEED_EMAIL_DOMAIN = 'bench.invalid'
+
+STATUS_WEIGHTS = {
+    'new': 20,
+    'contacted': 30,
+    'quote_sent': 20,
+    'closed_won': 10,
+    'closed_lost': 15,
+    'spam': 5,
+}
+FIRST_NAMES = ['Олександр', 'Марія', 'Іван', 'Олена', 'Петро', 'Наталія', 'Андрій', 'Ірина', 'Сергій', 'Оксана']
+COMPANIES = ['Енергобуд', 'Теплосервіс', 'Агрохім', 'Металург', 'Нафтогаз', 'Харчопром', '']
+WORDS = ['теплообмінник', 'ціна', 'пластинчастий', 'кожухотрубний', 'сервіс', 'монтаж', 'ущільнення', 'поставка']
+
+
+def build_queries(now):
+    """Запити, які виконує адмінка заявок: {назва: QuerySet}"""
+    month_ago = now - timedelta(days=30)
+    search = 'ОЛЕНА'
+    return {
+        'changelist (-created_at)': Lead.objects.order_by('-created_at')[:100],
+        'status=new': Lead.objects.filter(status='new').order_by('-created_at')[:100],
+        'status=contacted, page 50': Lead.objects.filter(status='contacted').order_by('-created_at')[4900:5000],
+        'status + inquiry_type': Lead.objects.filter(
+            status='quote_sent', inquiry_type='service',
+        ).order_by('-created_at')[:100],
+        'status=new, last 30 days': Lead.objects.filter(
+            status='new', created_at__gte=month_ago,
+        ).order_by('-created_at')[:100],
+        'count status=new': Lead.objects.filter(status='new'),
+        'search icontains': Lead.objects.filter(
+            Q(name__icontains=search) | Q(email__icontains=search) | Q(phone__icontains=search)
+            | Q(company__icontains=search) | Q(message__icontains=search)
+        ).order_by('-created_at')[:100],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк запитів адмінки заявок (з опційним наповненням синтетичними заявками)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Створити N синтетичних заявок перед вимірюванням')
+        parser.add_argument('--clear', action='store_true', help='Видалити синтетичні заявки та завершити')
+        parser.add_argument('--repeat', type=int, default=5, help='Кількість повторів кожного запиту (медіана)')
+        parser.add_argument('--explain', action='store_true', help='Показати план виконання кожного запиту')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _details = Lead.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}').delete()
+            self.stdout.write(self.style.SUCCESS(f'Видалено {deleted} записів'))
+            return
+
+        if options['seed']:
+            self.seed(options['seed'])
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE leads_lead')
+
+        total = Lead.objects.count()
+        self.stdout.write(f'Заявок у таблиці: {total}, БД: {connection.vendor}')
+        for name, queryset in build_queries(timezone.now()).items():
+            # all() - новий QuerySet, щоб повтор не брав результат з кешу попереднього
+            run = queryset.all().count if name.startswith('count') else lambda qs=queryset: list(qs.all())
+            timings = []
+            for _repeat in range(options['repeat']):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(f'{name:<28} {statistics.median(timings):>9.2f} ms')
+            if options['explain']:
+                for line in queryset.explain().splitlines():
+                    self.stdout.write(f'    {line}')
+
+    def seed(self, count, batch_size=10000):
+        """Відтворювані синтетичні заявки з розподілом статусів і дат за 3 роки"""
+        rng = random.Random(42)
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+        inquiry_types = [value for value, _label in Lead.INQUIRY_TYPES]
+        now = timezone.now()
+
+        # auto_now_add перезаписав би дату, а нам потрібен розкид за роками
+        created_at_field = Lead._meta.get_field('created_at')
+        created_at_field.auto_now_add = False
+        try:
+            for offset in range(0, count, batch_size):
+                batch = []
+                for i in range(offset, min(offset + batch_size, count)):
+                    name = rng.choice(FIRST_NAMES)
+                    batch.append(Lead(
+                        name=f'{name} {i}',
+                        email=f'lead{i}@{SEED_EMAIL_DOMAIN}',
+                        phone=f'+380{rng.randint(500000000, 999999999)}',
+                        company=rng.choice(COMPANIES),
+                        message=' '.join(rng.choices(WORDS, k=8)),
+                        inquiry_type=rng.choice(inquiry_types),
+                        status=rng.choices(statuses, weights)[0],
+                        created_at=now - timedelta(seconds=rng.randint(0, 3 * 365 * 24 * 3600)),
+                    ))
+                with transaction.atomic():
+                    Lead.objects.bulk_create(batch)
+                self.stdout.write(f'Створено {min(offset + batch_size, count)}/{count}')
+        finally:
+            created_at_field.auto_now_add = True
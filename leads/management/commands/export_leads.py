@@ -0,0 +1,74 @@
+"""Management команда для потокового експорту заявок у CSV/XLSX"""
+import sys
+from datetime import datetime, time
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from leads.export import CHUNK_SIZE, EXPORT_FORMATS, get_export_filename, stream_export
+from leads.models import Lead
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Некоректна дата "{value}", очікується РРРР-ММ-ДД')
+
+
+class Command(BaseCommand):
+    help = 'Експорт заявок у CSV/XLSX з фільтрами як в адмінці (потоково, з постійним споживанням пам\'яті)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', help='Формат файлу')
+        parser.add_argument('--output', help='Шлях до файлу ("-" - stdout). За замовчуванням leads-<дата>.<формат>')
+        parser.add_argument('--status', action='append', choices=[key for key, _label in Lead.STATUS_CHOICES],
+                            help='Статус (можна вказати кілька разів)')
+        parser.add_argument('--inquiry-type', action='append', choices=[key for key, _label in Lead.INQUIRY_TYPES],
+                            help='Тип запиту (можна вказати кілька разів)')
+        parser.add_argument('--source', type=int, help='ID джерела заявки')
+        parser.add_argument('--since', type=parse_date, help='Створені з дати (РРРР-ММ-ДД)')
+        parser.add_argument('--until', type=parse_date, help='Створені до дати включно (РРРР-ММ-ДД)')
+        parser.add_argument('--consent-marketing', action='store_true', help='Лише зі згодою на маркетинг')
+        parser.add_argument('--search', help='Пошук як у списку заявок адмінки')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Розмір пакета читання з БД')
+
+    def get_queryset(self, options):
+        queryset = Lead.objects.all()
+        if options['status']:
+            queryset = queryset.filter(status__in=options['status'])
+        if options['inquiry_type']:
+            queryset = queryset.filter(inquiry_type__in=options['inquiry_type'])
+        if options['source']:
+            queryset = queryset.filter(source_id=options['source'])
+        if options['since']:
+            queryset = queryset.filter(created_at__gte=timezone.make_aware(datetime.combine(options['since'], time.min)))
+        if options['until']:
+            queryset = queryset.filter(created_at__lte=timezone.make_aware(datetime.combine(options['until'], time.max)))
+        if options['consent_marketing']:
+            queryset = queryset.filter(consent_marketing=True)
+        if options['search']:
+            # Ті самі поля і правила пошуку, що й у LeadAdmin
+            queryset, _may_have_duplicates = admin.site._registry[Lead].get_search_results(
+                None, queryset, options['search'],
+            )
+        return queryset
+
+    def handle(self, *args, **options):
+        export_format = options['format']
+        output = options['output'] or get_export_filename(export_format)
+        chunks = stream_export(self.get_queryset(options), export_format, chunk_size=options['chunk_size'])
+
+        if output == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        size = 0
+        with open(output, 'wb') as file:
+            for chunk in chunks:
+                file.write(chunk)
+                size += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f'Експортовано у {output} ({size / 1024:.0f} KB)'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:05
+
+import uuid
+
+from django.db import migrations, models
+
+
+def populate_uuid(apps, schema_editor):
+    # default=uuid.uuid4 в AddField дав би всім наявним рядкам однакове значення
+    Lead = apps.get_model('leads', 'Lead')
+    for lead in Lead.objects.only('pk').iterator():
+        lead.uuid = uuid.uuid4()
+        lead.save(update_fields=['uuid'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='uuid',
+            field=models.UUIDField(editable=False, null=True, verbose_name='UUID'),
+        ),
+        migrations.RunPython(populate_uuid, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='lead',
+            name='uuid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='UUID'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.3 on 2026-10-19 17:35
+
+from django.db import migrations, models
+
+# Поля search_fields адмінки. icontains на PostgreSQL генерує
+# UPPER(col::text) LIKE UPPER('%...%'), тому індекс будується по тому ж виразу
+SEARCH_COLUMNS = ['name', 'email', 'phone', 'company', 'message']
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS leads_lead_{column}_trgm '
+            f'ON leads_lead USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS leads_lead_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0002_lead_uuid'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='lead',
+            name='leads_lead_status_e23abe_idx',
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['status', '-created_at'], name='leads_lead_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['inquiry_type', '-created_at'], name='leads_lead_inquiry_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(condition=models.Q(('status', 'new')), fields=['-created_at'], name='leads_lead_new_created_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
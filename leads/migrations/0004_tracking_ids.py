@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0003_lead_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='session_id',
+            field=models.CharField(blank=True, max_length=32, verbose_name='ID сесії'),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='visitor_id',
+            field=models.CharField(blank=True, max_length=32, verbose_name='ID відвідувача'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['updated_at'], name='leads_lead_updated_88249a_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0004_tracking_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Відбиток'),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Ключ ідемпотентності'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['fingerprint', 'created_at'], name='leads_lead_fingerprint_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='lead',
+            constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key', ''), _negated=True), fields=('idempotency_key',), name='leads_lead_idempotency_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0005_lead_dedup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='spam_score',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Оцінка спаму'),
+        ),
+    ]
@@ -1,4 +1,9 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator
 
@@ -23,6 +28,46 @@ class LeadSource(models.Model):
         return self.name
 
 
+# Заявок в одному UPDATE / INSERT масової зміни статусу
+TRANSITION_BATCH_SIZE = 1000
+
+
+class LeadQuerySet(models.QuerySet):
+    """QuerySet заявок з масовою зміною статусу"""
+
+    def transition(self, status, user=''):
+        """Змінити статус заявок і записати активність
+
+        Ключі заявок, які ще не мають цього статусу, вибираються з
+        блокуванням рядків (select_for_update), тож паралельна дія не змінить
+        їх між вибіркою та UPDATE. Активності створюються bulk_create саме для
+        цих ключів. Повертає кількість змінених заявок.
+        """
+        now = timezone.now()
+        changes = {'status': status, 'updated_at': now}
+        if status == 'contacted':
+            changes['contacted_at'] = Coalesce('contacted_at', Value(now))
+
+        activity_type = 'contacted' if status == 'contacted' else 'status_changed'
+        description = str(_('Статус змінено на "%(status)s" (масова дія)') % {
+            'status': dict(Lead.STATUS_CHOICES)[status],
+        })
+        leads = Lead.objects.using(self.db)
+        with transaction.atomic(using=self.db):
+            # Окремий запит без JOIN та сортування queryset адмінки: блокуються лише рядки заявок
+            pks = list(
+                leads.filter(pk__in=self.order_by().values('pk')).exclude(status=status)
+                .select_for_update().order_by('pk').values_list('pk', flat=True)
+            )
+            for offset in range(0, len(pks), TRANSITION_BATCH_SIZE):
+                leads.filter(pk__in=pks[offset:offset + TRANSITION_BATCH_SIZE]).update(**changes)
+            LeadActivity.objects.using(self.db).bulk_create([
+                LeadActivity(lead_id=pk, activity_type=activity_type, description=description, user=user)
+                for pk in pks
+            ], batch_size=TRANSITION_BATCH_SIZE)
+        return len(pks)
+
+
 class Lead(models.Model):
     """Заявки клієнтів"""
     
@@ -44,6 +89,7 @@ class Lead(models.Model):
     )
     
     # Ідентифікація
+    uuid = models.UUIDField(_('UUID'), default=uuid.uuid4, unique=True, editable=False)
     
     # Основна інформація
     name = models.CharField(_('Ім\'я'), max_length=100)
@@ -82,6 +128,14 @@ class Lead(models.Model):
     ip_address = models.GenericIPAddressField(_('IP адреса'), blank=True, null=True)
     user_agent = models.TextField(_('User Agent'), blank=True)
     language = models.CharField(_('Мова'), max_length=10, default='uk')
+    # Ідентифікатори з cookie аналітики: зв'язок заявки з подіями сесії
+    visitor_id = models.CharField(_('ID відвідувача'), max_length=32, blank=True)
+    session_id = models.CharField(_('ID сесії'), max_length=32, blank=True)
+    # Захист від повторної відправки (leads.dedup)
+    fingerprint = models.CharField(_('Відбиток'), max_length=64, blank=True, editable=False)
+    idempotency_key = models.CharField(_('Ключ ідемпотентності'), max_length=64, blank=True, editable=False)
+    # Бали leads.spam на момент прийому заявки
+    spam_score = models.PositiveSmallIntegerField(_('Оцінка спаму'), default=0, editable=False)
     
     # Статус
     status = models.CharField(_('Статус'), max_length=20, choices=STATUS_CHOICES, default='new')
@@ -98,7 +152,9 @@ class Lead(models.Model):
     # Внутрішні примітки
     internal_notes = models.TextField(_('Внутрішні примітки'), blank=True,
                                      help_text=_('Примітки для команди (не видимі клієнту)'))
-    
+
+    objects = LeadQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Заявка')
         verbose_name_plural = _('Заявки')
@@ -106,8 +162,25 @@ class Lead(models.Model):
         indexes = [
             models.Index(fields=['email']),
             models.Index(fields=['phone']),
-            models.Index(fields=['status']),
             models.Index(fields=['created_at']),
+            # Інкрементальні звіти обробляють заявки, змінені після позиції
+            models.Index(fields=['updated_at']),
+            # Пошук повтору заявки в межах LEAD_DEDUP_WINDOW
+            models.Index(fields=['fingerprint', 'created_at'], name='leads_lead_fingerprint_idx'),
+            # Фільтри адмінки зі стандартним сортуванням -created_at
+            models.Index(fields=['status', '-created_at'], name='leads_lead_status_created_idx'),
+            models.Index(fields=['inquiry_type', '-created_at'], name='leads_lead_inquiry_created_idx'),
+            # Нові заявки - найчастіший фільтр і лічильник у роботі менеджерів
+            models.Index(
+                fields=['-created_at'], name='leads_lead_new_created_idx',
+                condition=models.Q(status='new'),
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['idempotency_key'], name='leads_lead_idempotency_key_uniq',
+                condition=~models.Q(idempotency_key=''),
+            ),
         ]
     
     def __str__(self):
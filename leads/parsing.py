@@ -0,0 +1,75 @@
+"""Розбір тіла запиту заявки: ліміт розміру, JSON через orjson (якщо встановлено)
+
+Некоректне тіло піднімає RequestDataError зі статусом відповіді: 413 для
+тіла більшого за LEAD_MAX_BODY_SIZE, 400 для невалідного JSON чи форми.
+Розмір перевіряється за Content-Length ще до читання тіла. Результат і
+помилка запам'ятовуються на request, тож декоратор лімітів
+(leads.ratelimit) і view розбирають тіло один раз.
+"""
+import json
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig, TooManyFieldsSent
+from django.http.multipartparser import MultiPartParserError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class RequestDataError(ValueError):
+    """Тіло запиту не вдалося розібрати; status - HTTP код відповіді"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def loads(body):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def get_content_length(request):
+    try:
+        return int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return 0
+
+
+def read_request_data(request):
+    if get_content_length(request) > settings.LEAD_MAX_BODY_SIZE:
+        raise RequestDataError('Занадто великий запит.', status=413)
+    try:
+        if request.content_type != 'application/json':
+            return request.POST
+        body = request.body
+    except RequestDataTooBig:
+        raise RequestDataError('Занадто великий запит.', status=413)
+    except (TooManyFieldsSent, MultiPartParserError):
+        raise RequestDataError('Некоректні дані форми.')
+    # Content-Length може бути відсутнім (chunked)
+    if len(body) > settings.LEAD_MAX_BODY_SIZE:
+        raise RequestDataError('Занадто великий запит.', status=413)
+    try:
+        data = loads(body)
+    except ValueError:
+        # orjson.JSONDecodeError, json.JSONDecodeError та UnicodeDecodeError
+        raise RequestDataError('Некоректний JSON.')
+    if not isinstance(data, dict):
+        raise RequestDataError('Очікується JSON об\'єкт.')
+    return data
+
+
+def parse_request_data(request):
+    """Дані форми заявки: dict з JSON або request.POST"""
+    if not hasattr(request, 'lead_data'):
+        try:
+            request.lead_data = read_request_data(request)
+        except RequestDataError as error:
+            request.lead_data = error
+    if isinstance(request.lead_data, RequestDataError):
+        raise request.lead_data
+    return request.lead_data
@@ -0,0 +1,167 @@
+"""Обмеження частоти заявок (token bucket) за IP та контактами
+
+Кожен ключ (IP, email, телефон) має "відро" на capacity заявок, яке
+поповнюється рівномірно за period секунд. Перевірка виконується до
+валідації форми та будь-яких запитів до БД, тож флуд отримує дешеву
+відповідь 429. Сховище - пам'ять воркера (ліміт діє на кожен воркер
+окремо) або Redis (спільний для всіх воркерів, атомарно через Lua).
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from core.http import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+MAX_MEMORY_KEYS = 10000
+REDIS_KEY_PREFIX = 'leads:ratelimit:'
+
+# HMGET/HSET в одному скрипті: паралельні запити не витратять один токен двічі
+REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+def parse_rate(value):
+    """'5/300' -> (capacity=5, rate=токенів за секунду)"""
+    capacity, period = value.split('/')
+    return int(capacity), int(capacity) / float(period)
+
+
+def take_token(tokens, updated, capacity, rate, now):
+    """Крок token bucket: (дозволено, залишок токенів)"""
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1:
+        return True, tokens - 1
+    return False, tokens
+
+
+class MemoryBucketStore:
+    """Відра в пам'яті воркера; найдавніше використані ключі витісняються"""
+
+    def __init__(self, max_keys=MAX_MEMORY_KEYS):
+        self.buckets = OrderedDict()
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (capacity, now))
+            allowed, tokens = take_token(tokens, updated, capacity, rate, now)
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class RedisBucketStore:
+    """Відра в Redis, спільні для всіх воркерів"""
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(REDIS_TOKEN_BUCKET)
+
+    def consume(self, key, capacity, rate):
+        allowed, tokens = self.script(keys=[REDIS_KEY_PREFIX + key], args=[capacity, rate, time.time()])
+        return bool(allowed), float(tokens)
+
+
+def create_store():
+    if settings.LEAD_RATELIMIT_BACKEND == 'redis':
+        return RedisBucketStore(settings.REDIS_URL)
+    return MemoryBucketStore()
+
+
+store = create_store()
+
+
+def check_limit(key, rate_setting):
+    """Витратити токен ключа. Повертає None або кількість секунд до наступного токена"""
+    capacity, rate = parse_rate(rate_setting)
+    try:
+        allowed, tokens = store.consume(key, capacity, rate)
+    except Exception:
+        # Недоступний Redis не повинен блокувати заявки
+        logger.warning('Не вдалося перевірити ліміт заявок для %s', key, exc_info=True)
+        return None
+    if allowed:
+        return None
+    return max(1, int((1 - tokens) / rate + 0.999))
+
+
+def get_contact_keys(data):
+    """Ключі лімітів за email і телефоном з даних форми (без валідації)"""
+    keys = []
+    if not isinstance(data, dict):
+        return keys
+    email = data.get('email')
+    if isinstance(email, str) and email.strip():
+        keys.append('email:' + email.strip().lower()[:254])
+    phone = data.get('phone')
+    if isinstance(phone, str):
+        digits = re.sub(r'\D', '', phone)[-12:]
+        if digits:
+            keys.append('phone:' + digits)
+    return keys
+
+
+def rate_limit_response(retry_after):
+    response = JsonResponse({
+        'success': False,
+        'message': 'Забагато заявок. Спробуйте пізніше.',
+    }, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def limit_lead_submissions(get_data):
+    """Декоратор view заявки: 429 до валідації форми, якщо вичерпано ліміт IP, email або телефону
+
+    get_data(request) повертає дані форми (dict або QueryDict).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not settings.LEAD_RATELIMIT_ENABLED:
+                return view(request, *args, **kwargs)
+            ip = get_client_ip(request)
+            if ip:
+                retry_after = check_limit('ip:' + ip, settings.LEAD_RATELIMIT_IP)
+                if retry_after:
+                    return rate_limit_response(retry_after)
+            try:
+                data = get_data(request)
+            except ValueError:
+                # Некоректне тіло обробляє сам view
+                return view(request, *args, **kwargs)
+            for key in get_contact_keys(data):
+                retry_after = check_limit(key, settings.LEAD_RATELIMIT_CONTACT)
+                if retry_after:
+                    return rate_limit_response(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,147 @@
+"""Швидка валідація заявок з AJAX без побудови ModelForm
+
+Схема будується один раз при імпорті з полів форми (base_fields) та полів
+моделі Lead: обов'язковість, max_length, варіанти вибору, валідатори з уже
+скомпільованими regex, методи clean_<поле>, clean() та set_lead_defaults()
+самої форми. Правила не дублюються - зміна форми змінює і схему.
+
+ModelForm на кожен запит глибоко копіює поля з віджетами й лінивими
+підписами, створює BoundField і валідує модель повністю. Схема викликає ті
+самі field.clean() спільних (незмінних) екземплярів полів, а перекладені
+повідомлення помилок кешує для кожної мови. Результат - та сама заявка,
+що й form.save(commit=False), і ті самі помилки, що й form.errors
+(перевіряється командою benchmark_lead_forms).
+"""
+from collections import namedtuple
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.utils.translation import get_language
+
+from .forms import ContactForm, LeadForm, QuickQuoteForm
+from .models import Lead
+
+FieldRule = namedtuple('FieldRule', ['name', 'field', 'widget', 'model_field', 'clean_hook'])
+
+
+class LeadSchema:
+    """Скомпільовані правила форми заявки"""
+
+    def __init__(self, form_class):
+        self.form_class = form_class
+        model_fields = {field.name: field for field in Lead._meta.fields}
+        self.rules = [
+            FieldRule(
+                name,
+                field,
+                field.widget,
+                # Поля форми поза Meta.fields (honeypot) моделлю не валідуються
+                model_fields.get(name) if name in form_class._meta.fields else None,
+                getattr(form_class, f'clean_{name}', None),
+            )
+            for name, field in form_class.base_fields.items()
+        ]
+        self.set_lead_defaults = getattr(form_class, 'set_lead_defaults', None)
+        # {мова: {поле: {код: повідомлення}}}
+        self.messages = {}
+
+    def get_messages(self):
+        """Перекладені повідомлення полів (required, invalid, ...) для активної мови"""
+        language = get_language()
+        messages = self.messages.get(language)
+        if messages is None:
+            messages = self.messages[language] = {
+                rule.name: {code: str(message) for code, message in rule.field.error_messages.items()}
+                for rule in self.rules
+            }
+        return messages
+
+    def format_error(self, name, error):
+        """Список рядків помилки, як у form.errors[name]"""
+        messages = self.get_messages().get(name, {})
+        result = []
+        for item in error.error_list:
+            if item.code in messages and not item.params:
+                result.append(messages[item.code])
+            else:
+                result.append(str(item.message % item.params if item.params else item.message))
+        return result
+
+    def add_error(self, errors, cleaned_data, name, error):
+        if hasattr(error, 'error_dict'):
+            for field_name, field_errors in error.error_dict.items():
+                self.add_error(errors, cleaned_data, field_name, ValidationError(field_errors))
+            return
+        errors.setdefault(name or NON_FIELD_ERRORS, []).extend(self.format_error(name, error))
+        cleaned_data.pop(name, None)
+
+    def validate(self, data):
+        """(заявка без збереження, None) або (None, {поле: [помилки]})"""
+        # Екземпляр без __init__: носій cleaned_data, data та instance для методів clean форми
+        form = self.form_class.__new__(self.form_class)
+        form.cleaned_data = cleaned_data = {}
+        form.data, form.files = data, {}
+        form.instance = lead = Lead()
+        errors = {}
+
+        for rule in self.rules:
+            value = rule.widget.value_from_datadict(data, {}, rule.name)
+            try:
+                cleaned_data[rule.name] = rule.field.clean(value)
+                if rule.clean_hook:
+                    cleaned_data[rule.name] = rule.clean_hook(form)
+            except ValidationError as error:
+                self.add_error(errors, cleaned_data, rule.name, error)
+
+        try:
+            result = self.form_class.clean(form)
+            if result is not None:
+                form.cleaned_data = cleaned_data = result
+        except ValidationError as error:
+            self.add_error(errors, cleaned_data, None, error)
+
+        # construct_instance() та full_clean() моделі для полів без помилок
+        for rule in self.rules:
+            model_field = rule.model_field
+            if model_field is None or rule.name not in cleaned_data:
+                continue
+            value = cleaned_data[rule.name]
+            if (
+                model_field.has_default()
+                and rule.widget.value_omitted_from_data(data, {}, rule.name)
+                and value in rule.field.empty_values
+            ):
+                continue
+            model_field.save_form_data(lead, value)
+
+        for rule in self.rules:
+            model_field = rule.model_field
+            if model_field is None or rule.name in errors:
+                continue
+            if (
+                not model_field.blank
+                and not rule.field.required
+                and cleaned_data.get(rule.name) in rule.field.empty_values
+            ):
+                continue
+            raw_value = getattr(lead, model_field.attname)
+            if model_field.blank and raw_value in model_field.empty_values:
+                continue
+            try:
+                setattr(lead, model_field.attname, model_field.clean(raw_value, lead))
+            except ValidationError as error:
+                # Як ModelForm._update_errors: повідомлення поля форми замість повідомлення моделі
+                for item in error.error_list:
+                    if item.code in rule.field.error_messages:
+                        item.message = rule.field.error_messages[item.code]
+                self.add_error(errors, cleaned_data, rule.name, error)
+
+        if errors:
+            return None, errors
+        if self.set_lead_defaults:
+            self.set_lead_defaults(form, lead)
+        return lead, None
+
+
+LEAD_SCHEMA = LeadSchema(LeadForm)
+QUICK_QUOTE_SCHEMA = LeadSchema(QuickQuoteForm)
+CONTACT_SCHEMA = LeadSchema(ContactForm)
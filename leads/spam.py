@@ -0,0 +1,179 @@
+"""Оцінка заявки на спам до збереження та нотифікацій
+
+Перевірки з LEAD_SPAM_CHECKS виконуються від найдешевших: honeypot,
+час заповнення форми (підписана мітка form_token для форм, які її видають), посилання та стоп-слова
+в тексті, кількість збережених заявок з IP за останні хвилини (лічильник
+у пам'яті воркера). Кожна перевірка повертає (бали, причина) або None; бали
+сумуються, і після LEAD_SPAM_DROP_SCORE решта перевірок не виконується.
+
+Заявка з LEAD_SPAM_DROP_SCORE балів не зберігається, з
+LEAD_SPAM_QUARANTINE_SCORE - зберігається зі статусом spam без нотифікацій.
+Власна перевірка - функція check(request, data), додана до LEAD_SPAM_CHECKS.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.core import signing
+from django.utils.module_loading import import_string
+
+from core.http import get_client_ip
+
+FORM_TOKEN_SALT = 'leads.spam.form_token'
+# Мітка часу старша за добу не свідчить про бота, але й не підтверджує людину
+FORM_TOKEN_MAX_AGE = 24 * 60 * 60
+# Маршрути, форми яких видають form_token (lead_form.html); quick_quote та
+# contact приймають заявки з форм без мітки, тож її відсутність там не підозріла
+FORM_TOKEN_VIEWS = {'leads:submit_ajax'}
+TEXT_FIELDS = ('name', 'company', 'subject', 'message')
+LINK_RE = re.compile(r'https?://|www\.|\[url[=\]]|<a\s', re.IGNORECASE)
+SPAM_WORDS_RE = re.compile(
+    r'\b(casino|viagra|cialis|porn|bitcoin|crypto|forex|loan|backlinks?|seo services|'
+    r'казино|ставки|кредит без|заробіток в інтернеті)\b',
+    re.IGNORECASE,
+)
+MAX_VELOCITY_KEYS = 10000
+
+SpamVerdict = namedtuple('SpamVerdict', ['score', 'reasons', 'action'])
+
+
+def make_form_token():
+    """Підписана мітка часу відображення форми (приховане поле form_token)"""
+    return signing.dumps(time.time(), salt=FORM_TOKEN_SALT)
+
+
+def get_text(data, name):
+    value = data.get(name)
+    return value if isinstance(value, str) else ''
+
+
+def check_honeypot(request, data):
+    if get_text(data, 'website').strip():
+        return settings.LEAD_SPAM_DROP_SCORE, 'honeypot'
+    return None
+
+
+def check_timing(request, data):
+    """Форма, відправлена швидше за LEAD_SPAM_MIN_SECONDS, з підробленою міткою або без неї"""
+    token = get_text(data, 'form_token')
+    if not token:
+        match = request.resolver_match
+        if match is None or match.view_name not in FORM_TOKEN_VIEWS:
+            return None
+        # Запит без відображення форми (прямий POST, старі сторінки в кеші)
+        return 15, 'no form token'
+    try:
+        rendered_at = signing.loads(token, salt=FORM_TOKEN_SALT, max_age=FORM_TOKEN_MAX_AGE)
+    except signing.SignatureExpired:
+        return None
+    except signing.BadSignature:
+        return 40, 'forged form token'
+    if time.time() - rendered_at < settings.LEAD_SPAM_MIN_SECONDS:
+        return 60, 'submitted too fast'
+    return None
+
+
+def check_content(request, data):
+    """Посилання та стоп-слова в текстових полях"""
+    score, reasons = 0, []
+    name_links = len(LINK_RE.findall(get_text(data, 'name')))
+    if name_links:
+        score += 60
+        reasons.append('link in name')
+    links = sum(len(LINK_RE.findall(get_text(data, field))) for field in TEXT_FIELDS) - name_links
+    if links:
+        score += 40 if links >= 3 else 15 * links
+        reasons.append(f'{links} links')
+    words = {match.lower() for field in TEXT_FIELDS for match in SPAM_WORDS_RE.findall(get_text(data, field))}
+    if words:
+        score += 30 * len(words)
+        reasons.append('keywords: ' + ', '.join(sorted(words)))
+    return (score, '; '.join(reasons)) if score else None
+
+
+class VelocityCounter:
+    """Кількість подій за ключем у ковзному вікні (пам'ять воркера)"""
+
+    def __init__(self, window, max_keys=MAX_VELOCITY_KEYS):
+        self.window = window
+        self.max_keys = max_keys
+        self.hits = OrderedDict()
+        self.lock = threading.Lock()
+
+    def hit(self, key):
+        """Врахувати подію і повернути кількість подій у вікні"""
+        now = time.monotonic()
+        with self.lock:
+            hits = self.hits.pop(key, None) or deque()
+            self.expire(hits, now)
+            hits.append(now)
+            self.hits[key] = hits
+            if len(self.hits) > self.max_keys:
+                self.hits.popitem(last=False)
+            return len(hits)
+
+    def count(self, key):
+        """Кількість подій у вікні без врахування нової"""
+        with self.lock:
+            hits = self.hits.get(key)
+            if not hits:
+                return 0
+            self.expire(hits, time.monotonic())
+            return len(hits)
+
+    def expire(self, hits, now):
+        while hits and hits[0] <= now - self.window:
+            hits.popleft()
+
+
+velocity = VelocityCounter(settings.LEAD_SPAM_VELOCITY_WINDOW)
+
+
+def check_ip_velocity(request, data):
+    """Збережені заявки з IP за вікно (лічильник поповнює record_submission)"""
+    ip = get_client_ip(request)
+    if not ip:
+        return None
+    # Поточна заявка теж рахується
+    extra = velocity.count(ip) + 1 - settings.LEAD_SPAM_VELOCITY_LIMIT
+    if extra > 0:
+        return 20 * extra, f'{extra} extra submissions from IP'
+    return None
+
+
+def record_submission(request):
+    """Врахувати збережену заявку в лічильнику IP
+
+    Викликається лише після створення заявки: виправлення помилок форми
+    та повтори (leads.dedup) не додають балів справжньому користувачу.
+    """
+    ip = get_client_ip(request)
+    if ip:
+        velocity.hit(ip)
+
+
+@lru_cache(maxsize=None)
+def get_checks(paths):
+    return [import_string(path) for path in paths]
+
+
+def score_submission(request, data):
+    """Оцінити дані форми. Повертає SpamVerdict з action 'accept', 'quarantine' або 'drop'"""
+    score, reasons = 0, []
+    for check in get_checks(tuple(settings.LEAD_SPAM_CHECKS)):
+        result = check(request, data)
+        if result:
+            score += result[0]
+            reasons.append(result[1])
+            if score >= settings.LEAD_SPAM_DROP_SCORE:
+                break
+    if score >= settings.LEAD_SPAM_DROP_SCORE:
+        action = 'drop'
+    elif score >= settings.LEAD_SPAM_QUARANTINE_SCORE:
+        action = 'quarantine'
+    else:
+        action = 'accept'
+    return SpamVerdict(score, reasons, action)
@@ -1,3 +1,623 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.forms.models import model_to_dict
+from django.http import QueryDict
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone, translation
+
+from core.paginator import EstimatedCountPaginator
+
+from .admin import LeadAdmin
+from .dedup import find_saved_uuid, save_lead_once
+from .export import stream_csv
+from .forms import ContactForm, LeadForm, QuickQuoteForm
+from .models import Lead, LeadActivity
+from .parsing import RequestDataError, loads, parse_request_data
+from .ratelimit import MemoryBucketStore, check_limit, take_token
+from .schema import CONTACT_SCHEMA, LEAD_SCHEMA, QUICK_QUOTE_SCHEMA, LeadSchema
+from .spam import FORM_TOKEN_SALT, score_submission, velocity
+
+
+def make_lead(**fields):
+    values = {
+        'name': 'Олена',
+        'email': 'olena@example.com',
+        'phone': '+380501234567',
+        'inquiry_type': 'price_request',
+        'product_name': 'Продукт A',
+        'subject': 'Швидкий запит ціни - Продукт A',
+        'message': 'Потрібна ціна',
+    }
+    values.update(fields)
+    return Lead(**values)
+
+
+class SaveLeadOnceTests(TestCase):
+    """Ідемпотентне збереження заявок (leads.dedup)"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_repeat_returns_first_lead_from_cache(self):
+        first = make_lead()
+        self.assertTrue(save_lead_once(first, 'quick_quote'))
+
+        repeat = make_lead(message='  потрібна   ЦІНА ')
+        with self.assertNumQueries(0):
+            self.assertFalse(save_lead_once(repeat, 'quick_quote'))
+        self.assertEqual(str(repeat.uuid), str(first.uuid))
+        self.assertEqual(Lead.objects.count(), 1)
+
+    def test_repeat_found_in_db_when_cache_is_empty(self):
+        first = make_lead()
+        self.assertTrue(save_lead_once(first, 'quick_quote'))
+        cache.clear()
+
+        repeat = make_lead()
+        self.assertFalse(save_lead_once(repeat, 'quick_quote'))
+        self.assertEqual(str(repeat.uuid), str(first.uuid))
+        self.assertEqual(Lead.objects.count(), 1)
+
+    def test_repeat_by_idempotency_key_found_in_db(self):
+        first = make_lead()
+        self.assertTrue(save_lead_once(first, 'lead', 'key-12345678'))
+        cache.clear()
+
+        # Інший текст, але той самий ключ клієнта
+        repeat = make_lead(message='Змінене повідомлення')
+        self.assertFalse(save_lead_once(repeat, 'lead', 'key-12345678'))
+        self.assertEqual(str(repeat.uuid), str(first.uuid))
+
+    def test_concurrent_insert_with_same_key_resolves_to_saved_lead(self):
+        first = make_lead()
+        self.assertTrue(save_lead_once(first, 'lead', 'key-12345678'))
+        cache.clear()
+
+        # Паралельний воркер ще не закомітив рядок, коли цей запит перевіряв БД
+        lookups = []
+
+        def find_after_commit(lead):
+            lookups.append(lead)
+            return find_saved_uuid(lead) if len(lookups) > 1 else None
+
+        with mock.patch('leads.dedup.find_saved_uuid', side_effect=find_after_commit):
+            repeat = make_lead(message='Інше повідомлення')
+            self.assertFalse(save_lead_once(repeat, 'lead', 'key-12345678'))
+        # Друга перевірка - після IntegrityError
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(str(repeat.uuid), str(first.uuid))
+        self.assertEqual(Lead.objects.count(), 1)
+        # Ключ кешу звільнено: наступна заявка не чекає на PENDING
+        self.assertIsNone(cache.get('leads:dedup:key:key-12345678'))
+
+    def test_different_products_are_different_leads(self):
+        first = make_lead()
+        second = make_lead(product_name='Продукт B', subject='Швидкий запит ціни - Продукт B')
+        self.assertTrue(save_lead_once(first, 'quick_quote'))
+        self.assertTrue(save_lead_once(second, 'quick_quote'))
+        self.assertNotEqual(first.uuid, second.uuid)
+        self.assertEqual(Lead.objects.count(), 2)
+
+    def test_same_contact_in_different_forms_is_not_a_repeat(self):
+        self.assertTrue(save_lead_once(make_lead(), 'quick_quote'))
+        self.assertTrue(save_lead_once(make_lead(), 'contact'))
+        self.assertEqual(Lead.objects.count(), 2)
+
+
+class StreamCsvTests(TestCase):
+    """Експорт CSV не віддає в Excel формули з даних заявки"""
+
+    def test_formula_cells_are_escaped(self):
+        rows = [['=HYPERLINK("http://x")', '+cmd|x', '-2+A1', '@SUM(A1)', '\tx', 'Олена', '']]
+        content = b''.join(stream_csv(rows)).decode()
+        self.assertEqual(
+            content,
+            '\ufeff"\'=HYPERLINK(""http://x"")",\'+cmd|x,\'-2+A1,\'@SUM(A1),\'\tx,Олена,\r\n',
+        )
+
+    def test_phones_and_numbers_are_unchanged(self):
+        rows = [['+380501234567', '+38 (050) 123-45-67', '-15', '- 1']]
+        content = b''.join(stream_csv(rows)).decode()
+        self.assertEqual(content, '\ufeff+380501234567,+38 (050) 123-45-67,-15,- 1\r\n')
+
+
+def make_token(age):
+    """form_token форми, показаної age секунд тому"""
+    return signing.dumps(time.time() - age, salt=FORM_TOKEN_SALT)
+
+
+def spam_request(url_name, ip='203.0.113.10'):
+    path = reverse(url_name)
+    request = RequestFactory().post(path, REMOTE_ADDR=ip)
+    request.resolver_match = resolve(path)
+    return request
+
+
+@override_settings(LEAD_SPAM_MIN_SECONDS=3, LEAD_SPAM_QUARANTINE_SCORE=50, LEAD_SPAM_DROP_SCORE=100,
+                   LEAD_SPAM_VELOCITY_LIMIT=3)
+class ScoreSubmissionTests(TestCase):
+    """Бали спаму окремих перевірок (leads.spam)"""
+
+    def setUp(self):
+        velocity.hits.clear()
+
+    def score(self, data, url_name='leads:submit_ajax', **kwargs):
+        return score_submission(spam_request(url_name, **kwargs), {'name': 'Олена', 'message': 'Потрібна ціна', **data})
+
+    def test_clean_submission_is_accepted(self):
+        verdict = self.score({'form_token': make_token(60)})
+        self.assertEqual((verdict.score, verdict.action), (0, 'accept'))
+
+    def test_honeypot_is_dropped(self):
+        verdict = self.score({'form_token': make_token(60), 'website': 'http://spam.example'})
+        self.assertEqual(verdict.action, 'drop')
+        self.assertEqual(verdict.reasons, ['honeypot'])
+
+    def test_fresh_token_is_too_fast(self):
+        verdict = self.score({'form_token': make_token(1)})
+        self.assertEqual((verdict.score, verdict.reasons), (60, ['submitted too fast']))
+
+    def test_expired_token_is_not_scored(self):
+        verdict = self.score({'form_token': make_token(2 * 24 * 60 * 60)})
+        self.assertEqual(verdict.score, 0)
+
+    def test_forged_token_is_scored(self):
+        verdict = self.score({'form_token': 'forged:token'})
+        self.assertEqual((verdict.score, verdict.reasons), (40, ['forged form token']))
+
+    def test_missing_token_scored_only_where_form_issues_it(self):
+        self.assertEqual(self.score({}).reasons, ['no form token'])
+        for url_name in ('leads:quick_quote', 'leads:contact'):
+            with self.subTest(url_name=url_name):
+                self.assertEqual(self.score({}, url_name).score, 0)
+
+    def test_real_enquiry_without_token_is_not_quarantined(self):
+        verdict = self.score({'message': 'Потрібен кредит без застави? Наш сайт https://example.com'}, 'leads:contact')
+        self.assertEqual(verdict.action, 'accept')
+
+    def test_link_in_name(self):
+        verdict = self.score({'form_token': make_token(60), 'name': 'www.spam.example'})
+        self.assertEqual((verdict.score, verdict.action), (60, 'quarantine'))
+
+    def test_velocity_counts_only_recorded_submissions(self):
+        for _attempt in range(5):
+            self.assertEqual(self.score({}, 'leads:contact').score, 0)
+        for _saved in range(3):
+            velocity.hit('203.0.113.10')
+        verdict = self.score({}, 'leads:contact')
+        self.assertEqual((verdict.score, verdict.reasons), (20, ['1 extra submissions from IP']))
+        self.assertEqual(self.score({}, 'leads:contact', ip='203.0.113.11').score, 0)
+
+
+@override_settings(LEAD_RATELIMIT_ENABLED=False, LEAD_SPAM_QUARANTINE_SCORE=50, LEAD_SPAM_DROP_SCORE=100)
+@mock.patch('leads.notifications.send_all_notifications')
+class SpamVerdictViewTests(TestCase):
+    """Відкинуті, карантинні та прийняті заявки у view"""
+
+    VIEWS = {
+        'leads:submit_ajax': {'inquiry_type': 'other'},
+        'leads:quick_quote': {},
+        'leads:contact': {'inquiry_type': 'other', 'subject': 'Питання'},
+    }
+
+    def setUp(self):
+        cache.clear()
+        velocity.hits.clear()
+
+    def post(self, url_name, **fields):
+        data = {
+            'name': 'Олена', 'email': 'olena@example.com', 'phone': '+380501234567',
+            'message': 'Потрібна ціна', 'consent_gdpr': True, 'form_token': make_token(60),
+            **self.VIEWS[url_name], **fields,
+        }
+        return self.client.post(reverse(url_name), data, content_type='application/json')
+
+    def test_honeypot_is_not_saved(self, notify):
+        for url_name in self.VIEWS:
+            with self.subTest(url_name=url_name):
+                response = self.post(url_name, website='http://spam.example')
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.json()['success'])
+        self.assertFalse(Lead.objects.exists())
+        notify.assert_not_called()
+
+    def test_suspicious_lead_is_quarantined(self, notify):
+        for url_name in self.VIEWS:
+            with self.subTest(url_name=url_name):
+                response = self.post(url_name, email=f'{url_name[6:]}@example.com', message='casino bitcoin')
+                self.assertTrue(response.json()['success'])
+                lead = Lead.objects.get(uuid=response.json()['lead_uuid'])
+                self.assertEqual((lead.status, lead.spam_score), ('spam', 60))
+                self.assertIn('Заявка позначена як спам', lead.activities.get().description)
+        notify.assert_not_called()
+
+    def test_clean_lead_is_accepted(self, notify):
+        for url_name in self.VIEWS:
+            with self.subTest(url_name=url_name):
+                response = self.post(url_name, email=f'{url_name[6:]}@example.com', form_token='')
+                lead = Lead.objects.get(uuid=response.json()['lead_uuid'])
+                expected = 15 if url_name == 'leads:submit_ajax' else 0
+                self.assertEqual((lead.status, lead.spam_score), ('new', expected))
+        notify.assert_called_once()
+
+
+class TransitionTests(TestCase):
+    """Масова зміна статусу з активностями (LeadQuerySet.transition)"""
+
+    def test_changes_status_and_logs_activity_once(self):
+        new = [make_lead(email=f'lead{index}@example.com') for index in range(3)]
+        for lead in new:
+            lead.save()
+        already = make_lead(email='done@example.com', status='contacted')
+        already.save()
+
+        updated = Lead.objects.all().transition('contacted', user='manager')
+
+        self.assertEqual(updated, 3)
+        self.assertEqual(Lead.objects.filter(status='contacted').count(), 4)
+        self.assertFalse(Lead.objects.filter(status='contacted', contacted_at__isnull=True).exclude(
+            pk=already.pk).exists())
+        activities = LeadActivity.objects.filter(activity_type='contacted')
+        self.assertEqual(sorted(activities.values_list('lead_id', flat=True)), sorted(lead.pk for lead in new))
+        self.assertEqual(set(activities.values_list('user', flat=True)), {'manager'})
+        self.assertFalse(already.activities.exists())
+
+    def test_only_selected_leads_change(self):
+        selected, other = make_lead(), make_lead(email='other@example.com')
+        selected.save()
+        other.save()
+        # Queryset адмінки з сортуванням і JOIN
+        queryset = Lead.objects.filter(pk=selected.pk).select_related('source').order_by('-created_at')
+
+        self.assertEqual(queryset.transition('spam'), 1)
+        self.assertEqual(queryset.transition('spam'), 0)
+        self.assertEqual(Lead.objects.get(pk=other.pk).status, 'new')
+        self.assertEqual(LeadActivity.objects.get().lead_id, selected.pk)
+        self.assertEqual(LeadActivity.objects.get().activity_type, 'status_changed')
+
+
+class LeadSchemaTests(TestCase):
+    """Швидка схема дає ту саму заявку і ті самі помилки, що й ModelForm"""
+
+    FORMS = [(LeadForm, LEAD_SCHEMA), (QuickQuoteForm, QUICK_QUOTE_SCHEMA), (ContactForm, CONTACT_SCHEMA)]
+    VALID = {
+        'name': 'Олена Коваленко',
+        'email': 'olena@example.com',
+        'phone': '+380501234567',
+        'company': 'Теплосервіс',
+        'inquiry_type': 'tech_consultation',
+        'product_name': 'Пластинчастий теплообмінник',
+        'subject': 'Підбір обладнання',
+        'message': 'Потрібен теплообмінник для системи ГВП',
+        'consent_gdpr': True,
+    }
+    # None - поле відсутнє
+    CASES = {
+        'valid': {},
+        'missing required': {'name': None, 'message': ''},
+        'bad phone': {'phone': '050-123'},
+        'bad email': {'email': 'olena@'},
+        'honeypot': {'website': 'http://spam.example'},
+        'bad choice': {'inquiry_type': 'unknown'},
+        'too long': {'name': 'x' * 150, 'company': 'x' * 300},
+        'no consent': {'consent_gdpr': None},
+        'everything wrong': {'name': '', 'email': 'x', 'phone': 'abc', 'inquiry_type': '?', 'consent_gdpr': None},
+    }
+
+    def payloads(self, changes):
+        data = {key: value for key, value in {**self.VALID, **changes}.items() if value is not None}
+        query = QueryDict(mutable=True)
+        for key, value in data.items():
+            query[key] = 'on' if value is True else str(value)
+        return {'json': data, 'post': query}
+
+    def describe(self, form_class, lead, errors):
+        if lead is None:
+            return errors
+        return model_to_dict(lead, fields=list(form_class._meta.fields) + ['inquiry_type', 'subject'])
+
+    def test_schema_matches_model_form(self):
+        for language in ('uk', 'en'):
+            for form_class, schema in self.FORMS:
+                for case, changes in self.CASES.items():
+                    for source, data in self.payloads(changes).items():
+                        with self.subTest(language=language, form=form_class.__name__, case=case, source=source), \
+                                translation.override(language):
+                            form = form_class(data)
+                            if form.is_valid():
+                                expected = self.describe(form_class, form.save(commit=False), None)
+                            else:
+                                errors = {name: [str(error) for error in items] for name, items in form.errors.items()}
+                                expected = self.describe(form_class, None, errors)
+                            self.assertEqual(self.describe(form_class, *schema.validate(data)), expected)
+
+    def test_cases_cover_valid_and_invalid_results(self):
+        for form_class, schema in self.FORMS:
+            with self.subTest(form=form_class.__name__):
+                self.assertIsNotNone(schema.validate(self.payloads({})['json'])[0])
+                lead, errors = schema.validate(self.payloads(self.CASES['everything wrong'])['json'])
+                self.assertIsNone(lead)
+                self.assertIn('phone', errors)
+
+    def test_clean_hooks_can_read_data_and_instance(self):
+        class HookForm(ContactForm):
+            def clean_subject(self):
+                # Хуки форми читають сирі дані та екземпляр, як у ModelForm
+                return f"{self.data['subject']} ({type(self.instance).__name__})"
+
+        lead, errors = LeadSchema(HookForm).validate(self.payloads({})['json'])
+        self.assertIsNone(errors)
+        self.assertEqual(lead.subject, 'Підбір обладнання (Lead)')
+
+
+@override_settings(LEAD_MAX_BODY_SIZE=1024)
+class ParseRequestDataTests(TestCase):
+    """Розбір тіла заявки (leads.parsing)"""
+
+    def json_request(self, body, **extra):
+        return RequestFactory().post('/', body, content_type='application/json', **extra)
+
+    def assert_error(self, request, status):
+        with self.assertRaises(RequestDataError) as context:
+            parse_request_data(request)
+        self.assertEqual(context.exception.status, status)
+        return context.exception
+
+    def test_json_object(self):
+        data = parse_request_data(self.json_request('{"name": "Олена", "consent_gdpr": true}'))
+        self.assertEqual(data, {'name': 'Олена', 'consent_gdpr': True})
+
+    def test_form_encoded_fallback(self):
+        request = RequestFactory().post('/', {'name': 'Олена', 'phone': '+380501234567'})
+        data = parse_request_data(request)
+        self.assertIs(data, request.POST)
+        self.assertEqual(data['phone'], '+380501234567')
+
+    def test_content_length_over_limit_is_rejected_before_reading(self):
+        request = self.json_request('{}', CONTENT_LENGTH='2048')
+        self.assert_error(request, 413)
+        self.assertFalse(hasattr(request, '_body'))
+
+    def test_body_over_limit_without_content_length(self):
+        # Chunked тіло: Content-Length відсутній
+        request = self.json_request('{}')
+        del request.META['CONTENT_LENGTH']
+        request._body = b'{"message": "' + b'x' * 2048 + b'"}'
+        self.assert_error(request, 413)
+
+    @override_settings(LEAD_MAX_BODY_SIZE=1024 * 1024, DATA_UPLOAD_MAX_MEMORY_SIZE=1024)
+    def test_body_over_django_limit(self):
+        self.assert_error(self.json_request('{"message": "' + 'x' * 2048 + '"}'), 413)
+
+    def test_invalid_json(self):
+        for body in ('{"name": ', b'\xff\xfe', '{"name": "Олена",}'):
+            with self.subTest(body=body):
+                self.assert_error(self.json_request(body), 400)
+
+    def test_non_object_json(self):
+        for body in ('[1, 2]', '"text"', 'null'):
+            with self.subTest(body=body):
+                self.assert_error(self.json_request(body), 400)
+
+    def test_result_and_error_are_cached_on_request(self):
+        request = self.json_request('{"name": "Олена"}')
+        with mock.patch('leads.parsing.loads', wraps=loads) as parse:
+            first = parse_request_data(request)
+            self.assertIs(parse_request_data(request), first)
+        parse.assert_called_once()
+
+        request = self.json_request('[1]')
+        error = self.assert_error(request, 400)
+        self.assertIs(self.assert_error(request, 400), error)
+
+    @override_settings(LEAD_RATELIMIT_ENABLED=False)
+    def test_view_returns_error_status(self):
+        response = self.client.post(
+            reverse('leads:contact'), '{"message": "' + 'x' * 2048 + '"}', content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(response.json()['success'])
+        response = self.client.post(reverse('leads:contact'), '[1]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TokenBucketTests(TestCase):
+    """Token bucket лімітів заявок у пам'яті воркера (leads.ratelimit)"""
+
+    def test_take_token_refills_with_time(self):
+        self.assertEqual(take_token(5, 0, 5, 1 / 60, 0), (True, 4))
+        self.assertEqual(take_token(0.5, 0, 5, 1 / 60, 15), (False, 0.75))
+        allowed, tokens = take_token(0.5, 0, 5, 1 / 60, 30)
+        self.assertTrue(allowed)
+        self.assertAlmostEqual(tokens, 0)
+        # Відро не наповнюється понад capacity
+        self.assertEqual(take_token(0, 0, 5, 1 / 60, 10 ** 6), (True, 4))
+
+    @mock.patch('leads.ratelimit.time.monotonic')
+    def test_memory_store_refill_and_eviction(self, monotonic):
+        monotonic.return_value = 1000.0
+        store = MemoryBucketStore(max_keys=2)
+        results = [store.consume('ip:a', 3, 3 / 3600)[0] for _attempt in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+        self.assertTrue(store.consume('ip:b', 3, 3 / 3600)[0])
+
+        # Один токен повертається за period / capacity
+        monotonic.return_value += 1199
+        self.assertFalse(store.consume('ip:a', 3, 3 / 3600)[0])
+        monotonic.return_value += 2
+        self.assertTrue(store.consume('ip:a', 3, 3 / 3600)[0])
+
+        store.consume('ip:c', 3, 3 / 3600)
+        self.assertEqual(list(store.buckets), ['ip:a', 'ip:c'])
+
+    def test_check_limit_retry_after(self):
+        with mock.patch('leads.ratelimit.store', MemoryBucketStore()):
+            for _attempt in range(5):
+                self.assertIsNone(check_limit('ip:a', '5/300'))
+            self.assertEqual(check_limit('ip:a', '5/300'), 60)
+
+    def test_store_error_does_not_block(self):
+        broken = mock.Mock(**{'consume.side_effect': ConnectionError})
+        with mock.patch('leads.ratelimit.store', broken), self.assertLogs('leads.ratelimit', 'WARNING'):
+            self.assertIsNone(check_limit('ip:a', '1/300'))
+
+
+@override_settings(LEAD_RATELIMIT_ENABLED=True, LEAD_RATELIMIT_IP='5/300', LEAD_RATELIMIT_CONTACT='3/3600')
+class RateLimitViewTests(TestCase):
+    """429 з Retry-After до валідації форми"""
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('leads.ratelimit.store', MemoryBucketStore())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, url_name, data, ip):
+        return self.client.post(reverse(url_name), data, content_type='application/json', REMOTE_ADDR=ip)
+
+    def test_ip_limit(self):
+        for index in range(5):
+            response = self.post('leads:contact', {'email': f'lead{index}@example.com'}, '203.0.113.20')
+            self.assertEqual(response.status_code, 200)
+        response = self.post('leads:contact', {'email': 'other@example.com'}, '203.0.113.20')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertFalse(response.json()['success'])
+        # Ліміт окремий для кожного IP
+        self.assertEqual(self.post('leads:contact', {}, '203.0.113.21').status_code, 200)
+
+    def test_contact_limit_across_ips_and_endpoints(self):
+        urls = ['leads:contact', 'leads:quick_quote', 'leads:submit_ajax']
+        for index, url_name in enumerate(urls):
+            data = {'email': ' Olena@Example.com ', 'phone': f'+38 050 123 45 6{index}'}
+            self.assertEqual(self.post(url_name, data, f'203.0.113.{30 + index}').status_code, 200)
+        response = self.post('leads:contact', {'email': 'olena@example.com'}, '203.0.113.40')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1200')
+        # Телефон рахується за цифрами незалежно від форматування
+        for index in range(3):
+            self.post('leads:contact', {'phone': '+380501234567'}, f'203.0.113.{50 + index}')
+        response = self.post('leads:contact', {'phone': '+38 (050) 123-45-67'}, '203.0.113.60')
+        self.assertEqual(response.status_code, 429)
+
+    @mock.patch('leads.ratelimit.time.monotonic')
+    def test_ip_limit_refills(self, monotonic):
+        monotonic.return_value = 1000.0
+        for index in range(5):
+            self.post('leads:contact', {}, '203.0.113.70')
+        self.assertEqual(self.post('leads:contact', {}, '203.0.113.70').status_code, 429)
+        monotonic.return_value += 60
+        self.assertEqual(self.post('leads:contact', {}, '203.0.113.70').status_code, 200)
+        self.assertEqual(self.post('leads:contact', {}, '203.0.113.70').status_code, 429)
+
+
+def create_leads(count, **fields):
+    leads = [make_lead(email=f'lead{index}@example.com', **fields) for index in range(count)]
+    Lead.objects.bulk_create(leads)
+    return leads
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """Кількість заявок без повного COUNT(*) (core.paginator)"""
+
+    def paginator(self, queryset, per_page=2):
+        paginator = EstimatedCountPaginator(queryset, per_page)
+        paginator.count_cap = 5
+        return paginator
+
+    def test_small_table_is_counted_exactly(self):
+        create_leads(3)
+        paginator = self.paginator(Lead.objects.order_by('pk'))
+        self.assertEqual((paginator.count, paginator.num_pages), (3, 2))
+        self.assertFalse(paginator.is_capped or paginator.is_estimated or paginator.has_more_than_pages)
+
+    def test_count_is_capped(self):
+        create_leads(8)
+        paginator = self.paginator(Lead.objects.filter(status='new').order_by('pk'))
+        self.assertEqual((paginator.count, paginator.num_pages), (5, 3))
+        self.assertTrue(paginator.is_capped)
+        self.assertTrue(paginator.has_more_than_pages)
+
+    @mock.patch('core.paginator.get_estimated_count', return_value=250000)
+    def test_estimate_for_unfiltered_list(self, estimate):
+        create_leads(2)
+        paginator = self.paginator(Lead.objects.order_by('pk'))
+        self.assertEqual(paginator.count, 250000)
+        self.assertTrue(paginator.is_estimated)
+        # Сторінки з номерами - лише в межах count_cap
+        self.assertEqual(paginator.num_pages, 3)
+        self.assertTrue(paginator.has_more_than_pages)
+
+        # Фільтрований список оцінку не використовує
+        filtered = self.paginator(Lead.objects.filter(status='new').order_by('pk'))
+        self.assertEqual(filtered.count, 2)
+        estimate.assert_called_once()
+
+    def test_estimate_fallback_to_count(self):
+        create_leads(2)
+        for estimate in (None, 1000):
+            with self.subTest(estimate=estimate), mock.patch('core.paginator.get_estimated_count', return_value=estimate):
+                paginator = self.paginator(Lead.objects.order_by('pk'))
+                self.assertEqual(paginator.count, 2)
+                self.assertFalse(paginator.is_estimated)
+
+
+@mock.patch.object(LeadAdmin, 'list_per_page', 2)
+@mock.patch.object(EstimatedCountPaginator, 'count_cap', 4)
+class LeadChangeListCursorTests(TestCase):
+    """Список заявок в адмінці: сторінки з номерами, далі курсор (created_at, id)"""
+
+    url = '/admin/leads/lead/'
+
+    def setUp(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        create_leads(9)
+        # Однаковий created_at у кількох заявок: курсор розрізняє їх за id
+        now = timezone.now()
+        pks = list(Lead.objects.order_by('pk').values_list('pk', flat=True))
+        for index, pk in enumerate(pks):
+            Lead.objects.filter(pk=pk).update(created_at=now - timedelta(minutes=index // 3))
+        self.expected = list(Lead.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def get_changelist(self, query=''):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_walk_all_pages(self):
+        seen = []
+        changelist = self.get_changelist()
+        self.assertIsNone(changelist.keyset_next_url)
+        seen += [lead.pk for lead in changelist.result_list]
+        changelist = self.get_changelist('?p=2')
+        seen += [lead.pk for lead in changelist.result_list]
+        # Остання сторінка з номером веде далі за курсором
+        while changelist.keyset_next_url:
+            changelist = self.get_changelist(changelist.keyset_next_url)
+            self.assertIsNotNone(changelist.cursor)
+            seen += [lead.pk for lead in changelist.result_list]
+        self.assertEqual(seen, self.expected)
+
+    def test_cursor_skips_ties_already_shown(self):
+        # Друга з трьох заявок з однаковим created_at: третя має потрапити на сторінку
+        second = Lead.objects.get(pk=self.expected[1])
+        changelist = self.get_changelist(f'?cursor={second.created_at.isoformat()}_{second.pk}'.replace('+', '%2B'))
+        self.assertEqual([lead.pk for lead in changelist.result_list], self.expected[2:4])
+
+    def test_malformed_cursor(self):
+        for cursor in ('abc', '2026-10-19T10:00:00_x', '_5'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {'cursor': cursor})
+                self.assertRedirects(response, self.url + '?e=1', fetch_redirect_response=False)
+
+    def test_cursor_is_dropped_when_sorting_changes(self):
+        changelist = self.get_changelist('?o=2&cursor=2026-10-19T10:00:00%2B00:00_5')
+        self.assertIsNone(changelist.cursor)
+        self.assertIsNone(changelist.keyset_next_url)
@@ -7,22 +7,48 @@ from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.conf import settings
-import json
 import logging
 
-# Product model removed with catalog app
+from core.analytics import get_tracking_ids
+from core.http import get_client_ip
+from pages.cache import get_product_index
+
 from .models import Lead, LeadSource, LeadActivity
-from .forms import LeadForm, QuickQuoteForm, ContactForm
+from .dedup import get_idempotency_key, save_lead_once
+from .parsing import RequestDataError, parse_request_data
+from .schema import CONTACT_SCHEMA, LEAD_SCHEMA, QUICK_QUOTE_SCHEMA
+from .ratelimit import limit_lead_submissions
+from .spam import make_form_token, record_submission, score_submission
 
 logger = logging.getLogger(__name__)
 
 
-def parse_request_data(request):
-    """Допоміжна функція для парсингу JSON/POST даних"""
-    if request.content_type == 'application/json':
-        return json.loads(request.body)
-    else:
-        return request.POST
+def request_error_response(error):
+    """400/413 для тіла запиту, яке не вдалося розібрати"""
+    return JsonResponse({'success': False, 'message': str(error)}, status=error.status)
+
+
+def get_product_name(data, field):
+    """Назва опублікованого товару за product_slug / product_id з кешованого індексу"""
+    value = data.get(field)
+    if not value or isinstance(value, bool):
+        return None
+    index = get_product_index()
+    if field == 'product_slug':
+        return index['slug'].get(value) if isinstance(value, str) else None
+    try:
+        return index['id'].get(int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def with_product_name(data, product_name):
+    """Дані форми з назвою товару, якщо клієнт її не передав"""
+    if not product_name or data.get('product_name'):
+        return data
+    data = data.copy()
+    data['product_name'] = product_name
+    return data
 
 
 def add_lead_metadata(lead, request):
@@ -30,6 +56,7 @@ def add_lead_metadata(lead, request):
     lead.ip_address = get_client_ip(request)
     lead.user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]
     lead.language = get_language()
+    lead.visitor_id, lead.session_id = get_tracking_ids(request)
     lead.source = get_or_create_source(request)
     lead.source_page = request.META.get('HTTP_REFERER', '')[:500]
     if hasattr(lead, 'referrer'):
@@ -46,22 +73,17 @@ def create_lead_activity(lead, description):
     )
 
 
-def format_form_errors(form):
-    """Форматувати помилки валідації форми"""
-    errors = {}
-    for field, field_errors in form.errors.items():
-        errors[field] = [str(error) for error in field_errors]
-    return errors
+def apply_spam_verdict(lead, verdict):
+    """Записати оцінку спаму; заявка в карантині зберігається зі статусом spam"""
+    lead.spam_score = min(verdict.score, 32767)
+    if verdict.action == 'quarantine':
+        lead.status = 'spam'
 
 
-def get_client_ip(request):
-    """Отримати IP адресу клієнта"""
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
+def spam_dropped_response(verdict, message):
+    """Відповідь як при успіху, щоб бот не підбирав обхід перевірок"""
+    logger.info('Заявку відкинуто як спам (%s): %s', verdict.score, '; '.join(verdict.reasons))
+    return JsonResponse({'success': True, 'message': message})
 
 
 def get_or_create_source(request):
@@ -102,39 +124,44 @@ def get_or_create_source(request):
 
 
 @require_http_methods(["POST"])
+@limit_lead_submissions(parse_request_data)
 def submit_lead(request):
     """Основна функція відправки заявки (AJAX)"""
     try:
         # Парсимо JSON дані
         data = parse_request_data(request)
         
+        # Явний спам відкидається до запитів до БД
+        verdict = score_submission(request, data)
+        if verdict.action == 'drop':
+            return spam_dropped_response(verdict, 'Дякуємо! Ваша заявка успішно відправлена.')
+        
         # Отримуємо продукт якщо передано slug
-        product = None
-        product_slug = data.get('product_slug')
-        if product_slug:
-            try:
-                product = Product.objects.get(slug=product_slug, is_published=True)
-            except Product.DoesNotExist:
-                pass
+        product_name = get_product_name(data, 'product_slug')
         
-        # Створюємо форму
-        form = LeadForm(data, product_slug=product_slug)
+        # Валідуємо за правилами LeadForm без побудови форми
+        lead, errors = LEAD_SCHEMA.validate(with_product_name(data, product_name))
         
-        if form.is_valid():
-            # Зберігаємо заявку
-            lead = form.save(commit=False)
-            
+        if lead is not None:
             # Додаємо мета-дані
             add_lead_metadata(lead, request)
-            lead.save()
-            
-            # Створюємо активність
-            create_lead_activity(lead, 'Заявка створена через форму на сайті')
-            
-            # Відправляємо нотифікації
-            send_all_notifications(lead)
-            
-            logger.info(f'Нова заявка створена: {lead.uuid} - {lead.email}')
+            apply_spam_verdict(lead, verdict)
+            # Повтор (подвійний клік, ретрай) отримує UUID першої заявки без нотифікацій
+            if save_lead_once(lead, 'lead', get_idempotency_key(request, data)):
+                record_submission(request)
+                if verdict.action == 'quarantine':
+                    # Заявка в карантині: без нотифікацій, менеджер перевіряє в адмінці
+                    create_lead_activity(lead, 'Заявка позначена як спам: ' + '; '.join(verdict.reasons))
+                    logger.info(f'Заявка в карантині: {lead.uuid} - {verdict.score}')
+                else:
+                    # Створюємо активність
+                    create_lead_activity(lead, 'Заявка створена через форму на сайті')
+                    
+                    # Відправляємо нотифікації (модуль з HTTP клієнтами імпортується лише тут)
+                    from .notifications import send_all_notifications
+                    send_all_notifications(lead)
+                    
+                    logger.info(f'Нова заявка створена: {lead.uuid} - {lead.email}')
             
             return JsonResponse({
                 'success': True,
@@ -146,47 +173,51 @@ def submit_lead(request):
             # Повертаємо помилки валідації
             return JsonResponse({
                 'success': False,
-                'errors': format_form_errors(form),
+                'errors': errors,
                 'message': 'Будь ласка, виправте помилки у формі.'
             })
     
+    except RequestDataError as e:
+        return request_error_response(e)
+    
     except Exception as e:
         logger.error(f'Помилка при створенні заявки: {str(e)}')
         return JsonResponse({
             'success': False,
             'message': 'Виникла помилка при відправці заявки. Спробуйте пізніше.',
             'error': str(e) if settings.DEBUG else None
-        })
+        }, status=500)
 
 
 @require_http_methods(["POST"])
+@limit_lead_submissions(parse_request_data)
 def quick_quote(request):
     """Швидкий запит ціни (спрощена форма)"""
     try:
         data = parse_request_data(request)
         
+        verdict = score_submission(request, data)
+        if verdict.action == 'drop':
+            return spam_dropped_response(verdict, 'Дякуємо! Ми зв\'яжемося з вами найближчим часом.')
+        
         # Отримуємо продукт
-        product = None
-        product_id = data.get('product_id')
-        if product_id:
-            try:
-                product = Product.objects.get(id=product_id, is_published=True)
-            except Product.DoesNotExist:
-                pass
+        product_name = get_product_name(data, 'product_id')
         
-        form = QuickQuoteForm(data, product=product)
+        lead, errors = QUICK_QUOTE_SCHEMA.validate(with_product_name(data, product_name))
         
-        if form.is_valid():
-            lead = form.save(commit=False)
-            
+        if lead is not None:
             # Додаємо мета-дані
             add_lead_metadata(lead, request)
-            lead.save()
-            
-            # Створюємо активність
-            create_lead_activity(lead, f'Швидкий запит ціни для продукту: {product.get_name() if product else "Загальний"}')
-            
-            logger.info(f'Швидкий запит ціни: {lead.uuid} - {lead.email}')
+            apply_spam_verdict(lead, verdict)
+            if save_lead_once(lead, 'quick_quote', get_idempotency_key(request, data)):
+                record_submission(request)
+                # Створюємо активність
+                if verdict.action == 'quarantine':
+                    create_lead_activity(lead, 'Заявка позначена як спам: ' + '; '.join(verdict.reasons))
+                else:
+                    create_lead_activity(lead, f'Швидкий запит ціни для продукту: {lead.product_name or "Загальний"}')
+                
+                logger.info(f'Швидкий запит ціни: {lead.uuid} - {lead.email}')
             
             return JsonResponse({
                 'success': True,
@@ -196,37 +227,47 @@ def quick_quote(request):
         else:
             return JsonResponse({
                 'success': False,
-                'errors': format_form_errors(form),
+                'errors': errors,
                 'message': 'Будь ласка, заповніть всі обов\'язкові поля.'
             })
     
+    except RequestDataError as e:
+        return request_error_response(e)
+    
     except Exception as e:
         logger.error(f'Помилка при швидкому запиті: {str(e)}')
         return JsonResponse({
             'success': False,
             'message': 'Виникла помилка. Спробуйте пізніше.'
-        })
+        }, status=500)
 
 
 @require_http_methods(["POST"])
+@limit_lead_submissions(parse_request_data)
 def contact(request):
     """Загальна контактна форма"""
     try:
         data = parse_request_data(request)
         
-        form = ContactForm(data)
+        verdict = score_submission(request, data)
+        if verdict.action == 'drop':
+            return spam_dropped_response(verdict, 'Дякуємо за звернення! Ми відповімо вам найближчим часом.')
         
-        if form.is_valid():
-            lead = form.save(commit=False)
-            
+        lead, errors = CONTACT_SCHEMA.validate(data)
+        
+        if lead is not None:
             # Додаємо мета-дані
             add_lead_metadata(lead, request)
-            lead.save()
-            
-            # Створюємо активність
-            create_lead_activity(lead, 'Заявка через контактну форму')
-            
-            logger.info(f'Контактна заявка: {lead.uuid} - {lead.email}')
+            apply_spam_verdict(lead, verdict)
+            if save_lead_once(lead, 'contact', get_idempotency_key(request, data)):
+                record_submission(request)
+                # Створюємо активність
+                if verdict.action == 'quarantine':
+                    create_lead_activity(lead, 'Заявка позначена як спам: ' + '; '.join(verdict.reasons))
+                else:
+                    create_lead_activity(lead, 'Заявка через контактну форму')
+                
+                logger.info(f'Контактна заявка: {lead.uuid} - {lead.email}')
             
             return JsonResponse({
                 'success': True,
@@ -236,16 +277,19 @@ def contact(request):
         else:
             return JsonResponse({
                 'success': False,
-                'errors': format_form_errors(form),
+                'errors': errors,
                 'message': 'Будь ласка, виправте помилки у формі.'
             })
     
+    except RequestDataError as e:
+        return request_error_response(e)
+    
     except Exception as e:
         logger.error(f'Помилка в контактній формі: {str(e)}')
         return JsonResponse({
             'success': False,
             'message': 'Виникла помилка. Спробуйте пізніше.'
-        })
+        }, status=500)
 
 
 def thank_you(request):
@@ -260,6 +304,8 @@ def lead_form(request):
     """Сторінка з формою заявки"""
     context = {
         'page_title': 'Залишити заявку',
+        # Мітка часу відображення для leads.spam.check_timing
+        'form_token': make_form_token(),
     }
     return render(request, 'leads/lead_form.html', context)
 
@@ -273,198 +319,3 @@ def thank_you_detail(request, lead_uuid):
         'lead': lead,
     }
     return render(request, 'leads/thank_you_detail.html', context)
-
-
-# Додано інтеграції (використовуючи наявні імпорти та стиль коду)
-def send_telegram_notification(lead):
-    """Відправка нотифікації в Telegram"""
-    try:
-        from .models import NotificationSettings
-        import requests
-        
-        settings_obj = NotificationSettings.get_settings()
-        
-        if not settings_obj.telegram_enabled or not settings_obj.telegram_bot_token:
-            return False
-        
-        message = f"""
-🔔 *Нова заявка на сайті!*
-
-👤 *Клієнт:* {lead.name}
-📧 *Email:* {lead.email}
-📱 *Телефон:* {lead.phone}
-
-💼 *Компанія:* {lead.company or 'Не вказано'}
-🎯 *Тип запиту:* {lead.get_inquiry_type_display()}
-
-📝 *Повідомлення:*
-{lead.message}
-
-🌐 *Мова:* {lead.language}
-📍 *IP:* {lead.ip_address}
-🔗 *Джерело:* {lead.source.name if lead.source else 'Невідоме'}
-
-⏰ *Час:* {lead.created_at.strftime('%d.%m.%Y %H:%M')}
-        """
-        
-        url = f"https://api.telegram.org/bot{settings_obj.telegram_bot_token}/sendMessage"
-        payload = {
-            'chat_id': settings_obj.telegram_chat_id,
-            'text': message,
-            'parse_mode': 'Markdown'
-        }
-        
-        response = requests.post(url, json=payload, timeout=10)
-        
-        if response.status_code == 200:
-            # Створюємо активність
-            LeadActivity.objects.create(
-                lead=lead,
-                activity_type='telegram_sent',
-                description='Нотифікацію відправлено в Telegram',
-                user='System'
-            )
-            logger.info(f'Telegram нотифікація відправлена для заявки {lead.uuid}')
-            return True
-        else:
-            logger.error(f'Помилка Telegram API: {response.text}')
-            return False
-            
-    except Exception as e:
-        logger.error(f'Помилка відправки Telegram: {str(e)}')
-        return False
-
-
-def send_viber_notification(lead):
-    """Відправка нотифікації в Viber"""
-    try:
-        from .models import NotificationSettings
-        import requests
-        
-        settings_obj = NotificationSettings.get_settings()
-        
-        if not settings_obj.viber_enabled or not settings_obj.viber_bot_token:
-            return False
-        
-        message = f"""
-🔔 Нова заявка на сайті!
-
-👤 Клієнт: {lead.name}
-📧 Email: {lead.email}
-📱 Телефон: {lead.phone}
-
-💼 Компанія: {lead.company or 'Не вказано'}
-🎯 Тип запиту: {lead.get_inquiry_type_display()}
-
-📝 Повідомлення:
-{lead.message}
-
-🌐 Мова: {lead.language}
-📍 IP: {lead.ip_address}
-🔗 Джерело: {lead.source.name if lead.source else 'Невідоме'}
-
-⏰ Час: {lead.created_at.strftime('%d.%m.%Y %H:%M')}
-        """
-        
-        url = f"https://chatapi.viber.com/pa/send_message"
-        headers = {
-            'X-Viber-Auth-Token': settings_obj.viber_bot_token
-        }
-        payload = {
-            'receiver': settings_obj.viber_admin_id,
-            'type': 'text',
-            'text': message
-        }
-        
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-        
-        if response.status_code == 200:
-            # Створюємо активність
-            LeadActivity.objects.create(
-                lead=lead,
-                activity_type='viber_sent',
-                description='Нотифікацію відправлено в Viber',
-                user='System'
-            )
-            logger.info(f'Viber нотифікація відправлена для заявки {lead.uuid}')
-            return True
-        else:
-            logger.error(f'Помилка Viber API: {response.text}')
-            return False
-            
-    except Exception as e:
-        logger.error(f'Помилка відправки Viber: {str(e)}')
-        return False
-
-
-def send_email_notification(lead):
-    """Відправка email нотифікації"""
-    try:
-        from django.core.mail import send_mail
-        from .models import NotificationSettings
-        
-        settings_obj = NotificationSettings.get_settings()
-        
-        if not settings_obj.email_enabled:
-            return False
-        
-        subject = settings_obj.email_subject_template.format(name=lead.name)
-        
-        message = f"""
-Нова заявка на сайті Adiabatic
-
-Клієнт: {lead.name}
-Email: {lead.email}
-Телефон: {lead.phone}
-Компанія: {lead.company or 'Не вказано'}
-
-Тип запиту: {lead.get_inquiry_type_display()}
-
-Повідомлення:
-{lead.message}
-
-Додаткова інформація:
-- Мова: {lead.language}
-- IP адреса: {lead.ip_address}
-- Джерело: {lead.source.name if lead.source else 'Невідоме'}
-- Дата створення: {lead.created_at.strftime('%d.%m.%Y %H:%M')}
-
-Переглянути в адмінці: {settings.SITE_URL}/admin/leads/lead/{lead.id}/
-        """
-        
-        recipients = [email.strip() for email in settings_obj.email_recipients.split(',')]
-        
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=recipients,
-            fail_silently=False
-        )
-        
-        # Створюємо активність
-        LeadActivity.objects.create(
-            lead=lead,
-            activity_type='email_sent',
-            description=f'Email відправлено на {", ".join(recipients)}',
-            user='System'
-        )
-        
-        logger.info(f'Email нотифікацію відправлено для заявки {lead.uuid}')
-        return True
-        
-    except Exception as e:
-        logger.error(f'Помилка відправки email: {str(e)}')
-        return False
-
-
-def send_all_notifications(lead):
-    """Відправка всіх налаштованих нотифікацій"""
-    results = {
-        'email': send_email_notification(lead),
-        'telegram': send_telegram_notification(lead),
-        'viber': send_viber_notification(lead)
-    }
-    
-    logger.info(f'Нотифікації для заявки {lead.uuid}: {results}')
-    return results
@@ -0,0 +1,63 @@
+"""Кеші публічних сторінок (інвалідуються сигналами з pages.signals)"""
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+
+from core.cache import versioned_key
+from core.db import use_primary
+from .models import Product
+
+SITEMAP_CACHE = 'sitemap'
+CATALOG_CACHE = 'catalog'
+
+# Ключ фрагмента містить updated_at, тому застарілі версії просто витісняються
+PRODUCT_DETAILS_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Версію групи сигнал скидає лише в кеші свого процесу: з LocMem інші воркери
+# бачать зміни товарів після закінчення цього строку
+CATALOG_CACHE_TIMEOUT = 5 * 60
+
+
+def get_catalog_spec_keys():
+    """Ключі технічних характеристик для фільтра каталогу"""
+    key = versioned_key(CATALOG_CACHE, 'spec_keys')
+    spec_keys = cache.get(key)
+    if spec_keys is None:
+        keys = set()
+        # Версію щойно скинув запис; репліка могла ще не отримати зміни
+        with use_primary():
+            for specifications in Product.objects.published().order_by().values_list('specifications', flat=True):
+                keys.update(specifications or {})
+        spec_keys = sorted(keys)
+        cache.set(key, spec_keys, CATALOG_CACHE_TIMEOUT)
+    return spec_keys
+
+
+def get_product_index():
+    """Опубліковані товари для заявок: {'slug': {slug: назва}, 'id': {id: назва}}"""
+    key = versioned_key(CATALOG_CACHE, 'product_index')
+    index = cache.get(key)
+    if index is None:
+        index = {'slug': {}, 'id': {}}
+        with use_primary():
+            for pk, slug, title in Product.objects.published().order_by().values_list('pk', 'slug', 'title_uk'):
+                index['slug'][slug] = title
+                index['id'][pk] = title
+        cache.set(key, index, CATALOG_CACHE_TIMEOUT)
+    return index
+
+
+def get_product_details_html(slug):
+    """HTML деталей товару для активної мови (None, якщо товар не опубліковано)"""
+    updated_at = Product.objects.published().filter(slug=slug).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    
+    key = f'product_details:{slug}:{get_language()}:{updated_at.timestamp()}'
+    html = cache.get(key)
+    if html is None:
+        product = Product.objects.localized(
+            'title', 'full_description_html', 'advantages_html', 'applications_html',
+        ).defer('search_document').get(slug=slug)
+        html = render_to_string('pages/partials/product_details.html', {'product': product})
+        cache.set(key, html, PRODUCT_DETAILS_CACHE_TIMEOUT)
+    return html
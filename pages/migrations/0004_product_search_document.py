@@ -0,0 +1,51 @@
+# Generated by Django 5.1.3 on 2026-10-19 17:21
+
+from django.db import migrations, models
+
+SEARCH_FIELDS = [
+    'title_uk', 'title_ru', 'title_en',
+    'short_description_uk', 'short_description_ru', 'short_description_en',
+    'full_description_uk', 'full_description_ru', 'full_description_en',
+]
+
+
+def populate_search_document(apps, schema_editor):
+    Product = apps.get_model('pages', 'Product')
+    for product in Product.objects.all():
+        text = ' '.join(getattr(product, field) for field in SEARCH_FIELDS)
+        product.search_document = ' '.join(text.lower().split())
+        product.save(update_fields=['search_document'])
+
+
+def create_trigram_index(apps, schema_editor):
+    # Trigram GIN індекс є лише на PostgreSQL; SQLite робить звичайний LIKE
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS pages_product_search_trgm '
+        'ON pages_product USING gin (search_document gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS pages_product_search_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0003_alter_product_image1_alter_product_image2_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False, verbose_name='Пошуковий документ'),
+        ),
+        migrations.RunPython(populate_search_document, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
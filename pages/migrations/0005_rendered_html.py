@@ -0,0 +1,159 @@
+# Generated by Django 5.1.3 on 2026-10-19 17:26
+
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.db import migrations, models
+from django.utils.html import escape, linebreaks
+
+# Копія core.rendering на момент міграції: зміни модуля не повинні впливати
+# на вже застосовану міграцію
+
+# Дозволена розмітка в контенті з адмінки; все інше відкидається
+ALLOWED_TAGS = {
+    'p', 'br', 'strong', 'b', 'em', 'i', 'u', 'span',
+    'h2', 'h3', 'h4', 'ul', 'ol', 'li', 'blockquote', 'a',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+ALLOWED_URL_SCHEMES = {'', 'http', 'https', 'mailto', 'tel'}
+VOID_TAGS = {'br'}
+# Теги, вміст яких видаляється разом із ними
+DROP_CONTENT_TAGS = {'script', 'style', 'iframe', 'object', 'template'}
+
+HTML_TAG_RE = re.compile(r'<[a-zA-Z/!]')
+LIST_MARKER_RE = re.compile(r'^\s*(?:[-*•✓✔]|\d+[.)])\s+')
+
+
+class _Sanitizer(HTMLParser):
+    """Білий список тегів/атрибутів; незакриті теги закриваються в кінці"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        rendered_attrs = ''
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name == 'href' and urlsplit(value.strip()).scheme.lower() not in ALLOWED_URL_SCHEMES:
+                continue
+            rendered_attrs += f' {name}="{escape(value)}"'
+        if tag == 'a' and 'href' in rendered_attrs:
+            rendered_attrs += ' rel="noopener nofollow"'
+        self.parts.append(f'<{tag}{rendered_attrs}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        # Закрити всі вкладені теги, які автор забув закрити
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.parts.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.parts.append(escape(data))
+
+    def get_html(self):
+        self.close()
+        return ''.join(self.parts) + ''.join(f'</{tag}>' for tag in reversed(self.open_tags))
+
+
+def sanitize_html(value):
+    """Очистити HTML від небезпечних тегів, атрибутів та посилань"""
+    sanitizer = _Sanitizer()
+    sanitizer.feed(value)
+    return sanitizer.get_html()
+
+
+def render_rich_text(value):
+    """Текст з абзацами або HTML з адмінки -> безпечний HTML"""
+    value = (value or '').strip()
+    if not value:
+        return ''
+    if HTML_TAG_RE.search(value):
+        return sanitize_html(value)
+    return linebreaks(value, autoescape=True)
+
+
+def render_list(value):
+    """Список, розділений переносами рядків -> <ul><li>...</li></ul>"""
+    items = [LIST_MARKER_RE.sub('', line).strip() for line in (value or '').splitlines()]
+    items = [item for item in items if item]
+    if not items:
+        return ''
+    return '<ul>' + ''.join(f'<li>{escape(item)}</li>' for item in items) + '</ul>'
+
+
+LANGUAGES = ['uk', 'ru', 'en']
+DEFAULT_LANGUAGE = 'uk'
+
+RENDERED_FIELDS = {
+    'Page': {'content': render_rich_text},
+    'Product': {
+        'full_description': render_rich_text,
+        'advantages': render_list,
+        'applications': render_rich_text,
+    },
+}
+
+
+def populate_rendered_html(apps, schema_editor):
+    for model_name, fields in RENDERED_FIELDS.items():
+        model = apps.get_model('pages', model_name)
+        for obj in model.objects.all():
+            rendered = {}
+            for code in LANGUAGES:
+                rendered[code] = {}
+                for field, renderer in fields.items():
+                    html = renderer(getattr(obj, f'{field}_{code}'))
+                    rendered[code][field] = html or rendered.get(DEFAULT_LANGUAGE, {}).get(field, '')
+            obj.rendered_html = rendered
+            obj.save(update_fields=['rendered_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0004_product_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='rendered_html',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='HTML контенту'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rendered_html',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='HTML описів'),
+        ),
+        migrations.RunPython(populate_rendered_html, migrations.RunPython.noop),
+    ]
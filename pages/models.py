@@ -2,6 +2,10 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 from django.utils.text import slugify
+from core.i18n import RenderedField, TranslatedField, TranslatedQuerySet
+from core.rendering import (
+    build_rendered_html, get_rendered_source_fields, render_list, render_rich_text,
+)
 
 
 class Page(models.Model):
@@ -36,9 +40,22 @@ class Page(models.Model):
     meta_description_en = models.TextField(_('Meta description (англ)'), max_length=160, blank=True)
     
     is_published = models.BooleanField(_('Опубліковано'), default=True)
+    
+    # Готовий HTML контенту всіма мовами (будується при збереженні)
+    rendered_html = models.JSONField(_('HTML контенту'), default=dict, blank=True, editable=False)
+    
     created_at = models.DateTimeField(_('Створено'), auto_now_add=True)
     updated_at = models.DateTimeField(_('Оновлено'), auto_now=True)
     
+    # Значення для активної мови
+    title = TranslatedField()
+    content = TranslatedField()
+    meta_title = TranslatedField()
+    meta_description = TranslatedField()
+    content_html = RenderedField('content', render_rich_text)
+    
+    objects = TranslatedQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Сторінка')
         verbose_name_plural = _('Сторінки')
@@ -50,6 +67,10 @@ class Page(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title_uk)
+        self.rendered_html = build_rendered_html(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(get_rendered_source_fields(type(self))):
+            kwargs['update_fields'] = {*update_fields, 'rendered_html'}
         super().save(*args, **kwargs)
     
     def get_absolute_url(self):
@@ -134,6 +155,14 @@ class Hero(models.Model):
     is_active = models.BooleanField(_('Активна'), default=True)
     order = models.PositiveIntegerField(_('Порядок'), default=0)
     
+    # Значення для активної мови
+    title = TranslatedField()
+    subtitle = TranslatedField()
+    description = TranslatedField()
+    cta_text = TranslatedField()
+    
+    objects = TranslatedQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Hero секція')
         verbose_name_plural = _('Hero секції')
@@ -173,9 +202,36 @@ class Partner(models.Model):
         return self.name
 
 
+def normalize_search_text(text):
+    """Нормалізація тексту для пошуку: нижній регістр, один пробіл між словами"""
+    return ' '.join(text.lower().split())
+
+
+class ProductQuerySet(TranslatedQuerySet):
+    """QuerySet товарів з пошуком по індексованому search_document"""
+    
+    def published(self):
+        return self.filter(is_published=True)
+    
+    def search(self, query):
+        """Пошук по назві та описах (усі мови); кожне слово має зустрітися в документі"""
+        queryset = self
+        for term in normalize_search_text(query).split():
+            # На PostgreSQL LIKE '%term%' використовує trigram GIN індекс
+            queryset = queryset.filter(search_document__contains=term)
+        return queryset
+
+
 class Product(models.Model):
     """Продукція компанії (каталог обладнання)"""
     
+    # Поля, з яких будується search_document
+    SEARCH_FIELDS = [
+        'title_uk', 'title_ru', 'title_en',
+        'short_description_uk', 'short_description_ru', 'short_description_en',
+        'full_description_uk', 'full_description_ru', 'full_description_en',
+    ]
+    
     # Основна інформація
     title_uk = models.CharField(_('Назва (укр)'), max_length=200)
     title_ru = models.CharField(_('Назва (рус)'), max_length=200, blank=True)
@@ -227,10 +283,30 @@ class Product(models.Model):
     meta_description_ru = models.TextField(_('Meta description (рус)'), max_length=160, blank=True)
     meta_description_en = models.TextField(_('Meta description (англ)'), max_length=160, blank=True)
     
+    # Пошуковий документ (денормалізований текст для індексу)
+    search_document = models.TextField(_('Пошуковий документ'), blank=True, editable=False)
+    
+    # Готовий HTML описів всіма мовами (будується при збереженні)
+    rendered_html = models.JSONField(_('HTML описів'), default=dict, blank=True, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(_('Створено'), auto_now_add=True)
     updated_at = models.DateTimeField(_('Оновлено'), auto_now=True)
     
+    # Значення для активної мови
+    title = TranslatedField()
+    short_description = TranslatedField()
+    full_description = TranslatedField()
+    advantages = TranslatedField()
+    applications = TranslatedField()
+    meta_title = TranslatedField()
+    meta_description = TranslatedField()
+    full_description_html = RenderedField('full_description', render_rich_text)
+    advantages_html = RenderedField('advantages', render_list)
+    applications_html = RenderedField('applications', render_rich_text)
+    
+    objects = ProductQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Товар')
         verbose_name_plural = _('Товари')
@@ -242,8 +318,22 @@ class Product(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title_uk)
+        self.search_document = self.build_search_document()
+        self.rendered_html = build_rendered_html(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if update_fields & set(self.SEARCH_FIELDS):
+                update_fields.add('search_document')
+            if update_fields & set(get_rendered_source_fields(type(self))):
+                update_fields.add('rendered_html')
+            kwargs['update_fields'] = update_fields
         super().save(*args, **kwargs)
     
+    def build_search_document(self):
+        """Зібрати текст для пошуку з назв та описів усіма мовами"""
+        return normalize_search_text(' '.join(getattr(self, field) for field in self.SEARCH_FIELDS))
+    
     def get_absolute_url(self):
         return reverse('pages:catalog') + f'#{self.slug}'
     
@@ -0,0 +1,20 @@
+"""Інвалідація кешів сторінок при зміні контенту"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_cache_version
+from .models import Page, Product
+from .cache import CATALOG_CACHE, SITEMAP_CACHE
+
+
+@receiver([post_save, post_delete], sender=Page)
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_sitemap(sender, **kwargs):
+    """Sitemap перегенерується лише після зміни сторінок або товарів"""
+    bump_cache_version(SITEMAP_CACHE)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_catalog(sender, **kwargs):
+    """Скинути кеш каталогу (фільтри по характеристиках)"""
+    bump_cache_version(CATALOG_CACHE)
@@ -0,0 +1,84 @@
+"""Sitemap для публічних сторінок з hreflang альтернативами (uk/ru/en)"""
+from django.contrib.sitemaps import Sitemap
+from django.db.models import Max
+from django.urls import reverse
+
+from .models import Page, Product
+
+# Маршрути pages.urls, що відповідають типу сторінки Page
+PAGE_TYPE_ROUTES = {
+    'home': 'home',
+    'about': 'about',
+    'contacts': 'contacts',
+    'products': 'products',
+}
+
+
+class I18nSitemap(Sitemap):
+    """Базовий sitemap: URL для кожної мови + xhtml:link alternates"""
+    i18n = True
+    alternates = True
+    x_default = True
+    # Ліміт URL на один файл; більші секції автоматично діляться на сторінки індексу
+    limit = 5000
+
+
+class StaticViewSitemap(I18nSitemap):
+    """Статичні маршрути з pages.urls (без параметрів)"""
+    changefreq = 'weekly'
+
+    def items(self):
+        from . import urls as pages_urls
+
+        return [
+            pattern.name for pattern in pages_urls.urlpatterns
+            if pattern.name and not pattern.pattern.converters
+        ]
+
+    def location(self, item):
+        return reverse(f'pages:{item}')
+
+    def priority(self, item):
+        return 1.0 if item == 'home' else 0.8
+
+    def lastmod(self, item):
+        return self._lastmods.get(item)
+
+    @property
+    def _lastmods(self):
+        # Один запит на всі сторінки і один на каталог замість запиту на кожен URL
+        if not hasattr(self, '_lastmods_cache'):
+            lastmods = {}
+            pages = Page.objects.filter(
+                is_published=True, page_type__in=PAGE_TYPE_ROUTES,
+            ).values_list('page_type', 'updated_at')
+            for page_type, updated_at in pages:
+                lastmods[PAGE_TYPE_ROUTES[page_type]] = updated_at
+            lastmods['catalog'] = Product.objects.filter(
+                is_published=True,
+            ).aggregate(latest=Max('updated_at'))['latest']
+            self._lastmods_cache = lastmods
+        return self._lastmods_cache
+
+
+class PageSitemap(I18nSitemap):
+    """Кастомні сторінки (page_detail)"""
+    changefreq = 'monthly'
+    priority = 0.6
+
+    def items(self):
+        return Page.objects.filter(
+            is_published=True, page_type='custom',
+        ).only('slug', 'page_type', 'updated_at').order_by('pk')
+
+    def location(self, item):
+        return item.get_absolute_url()
+
+    def lastmod(self, item):
+        return item.updated_at
+
+
+sitemaps = {
+    'static': StaticViewSitemap,
+    'pages': PageSitemap,
+}
@@ -9,6 +9,7 @@ urlpatterns = [
     path('contacts/', views.contacts, name='contacts'),
     path('products/', views.products, name='products'),
     path('catalog/', views.catalog, name='catalog'),
+    path('catalog/<slug:slug>/details/', views.product_details, name='product_details'),
     path('partners/', views.partners, name='partners'),
     path('blog/', views.blog, name='blog'),
     path('<slug:slug>/', views.page_detail, name='page_detail'),
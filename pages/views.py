@@ -1,14 +1,32 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponseRedirect, HttpResponse
+from django.http import HttpResponseRedirect, HttpResponse, Http404
 from django.utils.translation import get_language
 from django.urls import reverse
+from django.contrib.sitemaps import views as sitemap_views
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.cache import patch_vary_headers
+from core.cache import get_timeout, versioned_key
+from core.db import use_primary
 from .models import Page, Hero, Partner, Product
+from .cache import SITEMAP_CACHE, get_catalog_spec_keys, get_product_details_html
+from .sitemaps import sitemaps
+
+# Sitemap інвалідується сигналами, тому таймаут лише страхує від завислих ключів
+SITEMAP_CACHE_TIMEOUT = get_timeout(60 * 60 * 24)
+
+# Каталог
+CATALOG_PAGE_SIZE = 12
+CATALOG_QUERY_MAX_LENGTH = 100
+# Поля, потрібні для картки товару (деталі завантажуються окремим запитом)
+CATALOG_CARD_FIELDS = ['slug', 'image1', 'icon_emoji', 'order']
+CATALOG_CARD_TRANSLATED_FIELDS = ['title', 'short_description']
 
 
 def get_page_or_none(page_type):
     """Допоміжна функція для отримання сторінки або None"""
     try:
-        return Page.objects.get(page_type=page_type, is_published=True)
+        return Page.objects.localized().get(page_type=page_type, is_published=True)
     except Page.DoesNotExist:
         return None
 
@@ -32,7 +50,7 @@ def home(request):
     
     try:
         # Отримуємо тільки активні hero секції з зображеннями
-        heroes = Hero.objects.filter(is_active=True).exclude(background_image='').order_by('order')
+        heroes = Hero.objects.localized().filter(is_active=True).exclude(background_image='').order_by('order')
     except Exception:
         heroes = []
     
@@ -87,21 +105,94 @@ def blog(request):
 
 
 def catalog(request):
-    """Сторінка каталогу продукції"""
-    products = Product.objects.filter(is_published=True).order_by('order')
+    """Сторінка каталогу продукції (пошук, фільтр по характеристиках, пагінація)"""
+    products = (
+        Product.objects.published()
+        .only(*CATALOG_CARD_FIELDS)
+        .localized(*CATALOG_CARD_TRANSLATED_FIELDS)
+        .order_by('order', 'pk')
+    )
+    
+    query = request.GET.get('q', '').strip()[:CATALOG_QUERY_MAX_LENGTH]
+    if query:
+        products = products.search(query)
+    
+    spec_keys = get_catalog_spec_keys()
+    selected_specs = [key for key in request.GET.getlist('spec') if key in spec_keys]
+    for spec_key in selected_specs:
+        products = products.filter(specifications__has_key=spec_key)
+    
+    page_obj = Paginator(products, CATALOG_PAGE_SIZE).get_page(request.GET.get('page'))
     
     context = {
         'page': get_page_or_none('catalog'),
-        'products': products,
+        'products': page_obj.object_list,
+        'page_obj': page_obj,
+        'query': query,
+        'spec_keys': spec_keys,
+        'selected_specs': selected_specs,
+        'is_filtered': bool(query or selected_specs),
     }
-    return render(request, 'pages/catalog.html', context)
+    
+    # HTMX запит фільтра/пагінації отримує лише сітку результатів;
+    # відновлення історії (промах кешу htmx) потребує повної сторінки
+    if request.headers.get('HX-Request') and not request.headers.get('HX-History-Restore-Request'):
+        response = render(request, 'pages/partials/catalog_results.html', context)
+    else:
+        response = render(request, 'pages/catalog.html', context)
+    patch_vary_headers(response, ['HX-Request', 'HX-History-Restore-Request'])
+    return response
+
+
+def product_details(request, slug):
+    """HTMX фрагмент з деталями товару (опис, характеристики, переваги)"""
+    html = get_product_details_html(slug)
+    if html is None:
+        raise Http404
+    return HttpResponse(html)
 
 
 def page_detail(request, slug):
     """Детальна сторінка за slug"""
-    page = get_object_or_404(Page, slug=slug, is_published=True)
+    page = get_object_or_404(Page.objects.localized(), slug=slug, is_published=True)
     
     context = {
         'page': page,
     }
     return render(request, 'pages/page_detail.html', context)
+
+
+def _cached_sitemap(request, view, **kwargs):
+    """Віддати sitemap з кешу; ключ залежить від версії, яку скидають сигнали"""
+    # Лише те, від чого залежить вміст: домен у посиланнях, шлях і номер сторінки.
+    # Інші параметри запиту не створюють нових ключів
+    page = request.GET.get('p', '1')
+    page = str(int(page)) if page.isdigit() else 'invalid'
+    key = versioned_key(SITEMAP_CACHE, request.scheme, request.get_host(), request.path, page)
+    response = cache.get(key)
+    if response is None:
+        # Не кешувати під новою версією дані з репліки, що відстає
+        with use_primary():
+            response = view(request, sitemaps=sitemaps, **kwargs)
+            response.render()
+        if response.status_code == 200:
+            cache.set(key, response, SITEMAP_CACHE_TIMEOUT)
+    return response
+
+
+def sitemap_index(request):
+    """Індекс sitemap (секції діляться на файли по Sitemap.limit URL)"""
+    return _cached_sitemap(request, sitemap_views.index, sitemap_url_name='sitemap_section')
+
+
+def sitemap_section(request, section):
+    """Окрема секція sitemap"""
+    return _cached_sitemap(request, sitemap_views.sitemap, section=section)
+
+
+def robots_txt(request):
+    """robots.txt з абсолютним посиланням на sitemap поточного домену"""
+    context = {
+        'sitemap_url': request.build_absolute_uri(reverse('sitemap')),
+    }
+    return render(request, 'robots.txt', context, content_type='text/plain')
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.contrib import admin, messages
+from django.db.models import Sum
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import require_POST
+
+from core.models import AnalyticsEvent
+from leads.models import Lead
+
+from . import rollups
+from .models import EventRollup, FunnelRollup, LeadRollup
+from .tasks import update_reports
+
+DASHBOARD_PERIODS = (7, 30, 90, 365)
+DEFAULT_PERIOD = 30
+TOP_PAGES = 20
+
+
+def get_funnel(queryset, dimension, limit):
+    """Воронка по виміру: [(значення, сесій, заявок, конверсія %)], від найбільшої кількості заявок"""
+    rows = (
+        queryset.filter(dimension=dimension).values('value')
+        .annotate(total_sessions=Sum('sessions'), total_leads=Sum('leads'))
+        .order_by('-total_leads', '-total_sessions')[:limit]
+    )
+    return [
+        (row['value'], row['total_sessions'], row['total_leads'],
+         round(100 * row['total_leads'] / row['total_sessions'], 1) if row['total_sessions'] else 0)
+        for row in rows
+    ]
+
+
+def get_totals(queryset, field, labels=None, limit=None):
+    """Суми агрегатів по виміру: [(назва, кількість)], від найбільших"""
+    rows = queryset.values(field).annotate(total=Sum('count')).order_by('-total')[:limit]
+    return [(labels.get(row[field], row[field]) if labels else row[field], row['total']) for row in rows]
+
+
+@admin.register(LeadRollup)
+class LeadRollupAdmin(admin.ModelAdmin):
+    """Панель звітів: читає лише таблиці агрегатів, а не заявки та події"""
+    change_list_template = 'admin/reports/dashboard.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        refresh_view = self.admin_site.admin_view(require_POST(self.refresh_view))
+        return [
+            path('refresh/', refresh_view, name='reports_leadrollup_refresh'),
+        ] + super().get_urls()
+
+    def refresh_view(self, request):
+        """Оновити агрегати з адмінки, не чекаючи періодичної задачі"""
+        if not self.has_view_permission(request):
+            return redirect('admin:index')
+        result = update_reports()
+        if result is None:
+            self.message_user(request, _('Агрегати вже оновлюються, спробуйте за хвилину'), messages.WARNING)
+            return redirect('admin:reports_leadrollup_changelist')
+        self.message_user(
+            request,
+            _('Агрегати оновлено: нових подій %(events)s, перераховано днів заявок %(leads)s, '
+              'днів воронки %(sessions)s') % result,
+            messages.SUCCESS,
+        )
+        return redirect('admin:reports_leadrollup_changelist')
+
+    def changelist_view(self, request, extra_context=None):
+        try:
+            days = int(request.GET.get('days', DEFAULT_PERIOD))
+        except ValueError:
+            days = DEFAULT_PERIOD
+        if days not in DASHBOARD_PERIODS:
+            days = DEFAULT_PERIOD
+        since = rollups.local_day(timezone.now() - timedelta(days=days - 1))
+
+        leads = LeadRollup.objects.filter(period='day', bucket__gte=since)
+        events = EventRollup.objects.filter(period='day', bucket__gte=since)
+        funnel = FunnelRollup.objects.filter(bucket__gte=since)
+        leads_by_day = [
+            (timezone.localtime(bucket).date(), total)
+            for bucket, total in leads.values_list('bucket').annotate(total=Sum('count')).order_by('bucket')
+        ]
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': _('Звіти'),
+            'opts': self.model._meta,
+            'periods': DASHBOARD_PERIODS,
+            'days': days,
+            'last_updated': rollups.get_last_updated(),
+            'leads_total': sum(total for _day, total in leads_by_day),
+            'leads_max': max((total for _day, total in leads_by_day), default=0),
+            'leads_by_day': leads_by_day,
+            'leads_by_source': get_totals(leads, 'source__name'),
+            'leads_by_inquiry_type': get_totals(leads, 'inquiry_type', dict(Lead.INQUIRY_TYPES)),
+            'leads_by_language': get_totals(leads, 'language'),
+            'leads_by_status': get_totals(leads, 'status', dict(Lead.STATUS_CHOICES)),
+            'events_by_type': get_totals(events, 'event_type', dict(AnalyticsEvent.EVENT_TYPES)),
+            'top_pages': get_totals(events, 'page_path', limit=TOP_PAGES),
+            'funnel_landing': get_funnel(funnel, 'landing', TOP_PAGES),
+            'funnel_campaign': get_funnel(funnel, 'campaign', TOP_PAGES),
+            'funnel_page': get_funnel(funnel, 'page', TOP_PAGES),
+            **(extra_context or {}),
+        }
+        request.current_app = self.admin_site.name
+        return TemplateResponse(request, self.change_list_template, context)
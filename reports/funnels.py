@@ -0,0 +1,232 @@
+"""Воронка конверсій: сесії відвідувачів -> заявки
+
+Події та заявки мають session_id з cookie аналітики (static/js/analytics.js).
+Кожен запуск обробляє лише нові події та змінені заявки (позиції як у
+rollups) і оновлює компактну таблицю сесій FunnelSession: сторінка входу,
+кампанія, переглянуті сторінки та перша заявка сесії. Після цього денні
+агрегати FunnelRollup перераховуються лише для днів змінених сесій, тож
+звіт не сканує ні події, ні заявки.
+
+Заявки без session_id (JS вимкнено, старі заявки) стають окремими сесіями
+з ключем lead:<id>, сторінкою входу з source_page та кампанією з LeadSource.
+"""
+from collections import defaultdict
+from urllib.parse import parse_qs, urlsplit
+
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import AnalyticsEvent
+
+from .models import FunnelRollup, FunnelSession, RollupWatermark
+from .rollups import (
+    DAY_RANGES_PER_QUERY, advance_id_watermark, day_ranges, get_lead_changes, get_page_path, get_watermark,
+    local_day, reset_id_watermark,
+)
+
+FUNNEL_EVENTS = 'funnel_events'
+FUNNEL_LEADS = 'funnel_leads'
+MAX_SESSION_PAGES = 50
+SESSION_BATCH_SIZE = 1000
+SESSION_FIELDS = [
+    'visitor_id', 'started_at', 'last_seen_at', 'landing_path', 'campaign', 'page_views', 'pages',
+    'lead', 'converted_at',
+]
+
+
+def get_campaign(url, referrer=''):
+    """utm_source / utm_campaign сторінки входу або домен зовнішнього реферера"""
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    utm = [query.get(name, [''])[0] for name in ('utm_source', 'utm_campaign')]
+    if any(utm):
+        return ' / '.join(filter(None, utm))[:200]
+    host = urlsplit(referrer).hostname or ''
+    if host and host != parts.hostname:
+        return host[:200]
+    return ''
+
+
+def get_lead_campaign(lead):
+    source = lead.source
+    if not source or source.utm_source in ('', 'direct'):
+        return ''
+    return ' / '.join(filter(None, (source.utm_source, source.utm_campaign)))[:200]
+
+
+def get_lead_session_key(lead):
+    return lead.session_id or f'lead:{lead.pk}'
+
+
+def load_sessions(keys):
+    """Наявні сесії {session_id: FunnelSession} пакетами по SESSION_BATCH_SIZE"""
+    keys = list(keys)
+    sessions = {}
+    for offset in range(0, len(keys), SESSION_BATCH_SIZE):
+        for session in FunnelSession.objects.filter(session_id__in=keys[offset:offset + SESSION_BATCH_SIZE]):
+            sessions[session.session_id] = session
+    return sessions
+
+
+def save_sessions(sessions):
+    sessions = list(sessions)
+    FunnelSession.objects.bulk_update([s for s in sessions if s.pk], SESSION_FIELDS, batch_size=SESSION_BATCH_SIZE)
+    FunnelSession.objects.bulk_create([s for s in sessions if not s.pk], batch_size=SESSION_BATCH_SIZE)
+
+
+def add_event(session, event_type, url, data, created_at):
+    """Врахувати подію в сесії (події сесії передаються від найраніших)"""
+    if event_type == 'page_view':
+        session.page_views += 1
+        path = get_page_path(url)
+        if path in session.pages or len(session.pages) < MAX_SESSION_PAGES:
+            session.pages[path] = session.pages.get(path, 0) + 1
+        # Сторінка входу - найраніший перегляд сесії
+        if not session.landing_path or created_at < session.started_at:
+            referrer = data.get('referrer', '') if isinstance(data, dict) else ''
+            session.landing_path = path
+            session.campaign = get_campaign(url, referrer if isinstance(referrer, str) else '')
+    session.started_at = min(session.started_at, created_at)
+    session.last_seen_at = max(session.last_seen_at, created_at)
+
+
+def process_events(touched_days):
+    """Нові події з session_id -> сесії. Повертає кількість подій"""
+    watermark = get_watermark(FUNNEL_EVENTS)
+    processed = 0
+    if watermark.pending_id > watermark.last_id:
+        rows = (
+            AnalyticsEvent.objects.filter(pk__gt=watermark.last_id, pk__lte=watermark.pending_id)
+            .exclude(session_id='')
+            .order_by()
+            .values_list('session_id', 'visitor_id', 'event_type', 'page_url', 'extra_data', 'created_at')
+        )
+        events = defaultdict(list)
+        for session_id, *event in rows.iterator(chunk_size=5000):
+            events[session_id].append(event)
+            processed += 1
+
+        sessions = load_sessions(events)
+        for session_id, session_events in events.items():
+            session = sessions.get(session_id)
+            # Від найраніших подій, щоб сторінкою входу став перший перегляд
+            session_events.sort(key=lambda event: event[-1])
+            if session:
+                touched_days.add(local_day(session.started_at))
+            else:
+                started_at = session_events[0][-1]
+                session = sessions[session_id] = FunnelSession(
+                    session_id=session_id, started_at=started_at, last_seen_at=started_at, pages={},
+                )
+            for visitor_id, event_type, url, data, created_at in session_events:
+                session.visitor_id = session.visitor_id or visitor_id
+                add_event(session, event_type, url, data, created_at)
+            touched_days.add(local_day(session.started_at))
+        save_sessions(sessions.values())
+
+    advance_id_watermark(watermark, AnalyticsEvent)
+    return processed
+
+
+def process_leads(touched_days):
+    """Змінені заявки -> конверсії сесій. Повертає кількість заявок"""
+    watermark = get_watermark(FUNNEL_LEADS)
+    changed, upper = get_lead_changes(watermark)
+    leads = list(changed.select_related('source').only(
+        'pk', 'session_id', 'visitor_id', 'source_page', 'status', 'created_at',
+        'source__utm_source', 'source__utm_campaign',
+    ))
+    sessions = load_sessions(get_lead_session_key(lead) for lead in leads)
+    changed_sessions, removed = {}, []
+    for lead in leads:
+        key = get_lead_session_key(lead)
+        session = sessions.get(key)
+        if lead.status == 'spam':
+            # Спам не є конверсією; окрема сесія заявки без подій не потрібна
+            if session and session.lead_id == lead.pk:
+                touched_days.add(local_day(session.started_at))
+                if not lead.session_id:
+                    removed.append(sessions.pop(key))
+                else:
+                    session.lead, session.converted_at = None, None
+                    changed_sessions[key] = session
+            continue
+
+        if session is None:
+            session = sessions[key] = FunnelSession(
+                session_id=key,
+                visitor_id=lead.visitor_id,
+                started_at=lead.created_at,
+                last_seen_at=lead.created_at,
+                landing_path=get_page_path(lead.source_page) if lead.source_page else '',
+                campaign=get_lead_campaign(lead),
+                pages={},
+            )
+        elif session.lead_id == lead.pk:
+            # Зміна статусу вже зарахованої заявки воронку не змінює
+            continue
+        # Сесія зараховує лише першу заявку
+        if session.lead_id is None or session.converted_at > lead.created_at:
+            session.lead, session.converted_at = lead, lead.created_at
+            changed_sessions[key] = session
+            touched_days.add(local_day(session.started_at))
+
+    FunnelSession.objects.filter(pk__in=[session.pk for session in removed if session.pk]).delete()
+    save_sessions(session for key, session in changed_sessions.items() if key in sessions)
+    watermark.last_time = upper
+    watermark.save()
+    return len(leads)
+
+
+def rebuild_funnel_days(days):
+    """Перерахувати денні агрегати воронки з таблиці сесій"""
+    ranges = day_ranges(days)
+    for offset in range(0, len(ranges), DAY_RANGES_PER_QUERY):
+        chunk = ranges[offset:offset + DAY_RANGES_PER_QUERY]
+        bucket_filter = Q()
+        started_filter = Q()
+        for start, end in chunk:
+            bucket_filter |= Q(bucket__gte=start, bucket__lt=end)
+            started_filter |= Q(started_at__gte=start, started_at__lt=end)
+
+        FunnelRollup.objects.filter(bucket_filter).delete()
+        # [сесій, переглядів, заявок]
+        totals = defaultdict(lambda: [0, 0, 0])
+        rows = FunnelSession.objects.filter(started_filter).values_list(
+            'started_at', 'landing_path', 'campaign', 'page_views', 'pages', 'lead_id',
+        )
+        for started_at, landing_path, campaign, page_views, pages, lead_id in rows.iterator(chunk_size=5000):
+            day = local_day(started_at)
+            converted = lead_id is not None
+            dimensions = [('landing', landing_path, page_views), ('campaign', campaign, page_views)]
+            dimensions += [('page', path, views) for path, views in pages.items()]
+            for dimension, value, views in dimensions:
+                total = totals[(day, dimension, value)]
+                total[0] += 1
+                total[1] += views
+                total[2] += converted
+        FunnelRollup.objects.bulk_create([
+            FunnelRollup(bucket=day, dimension=dimension, value=value[:300],
+                         sessions=sessions, page_views=page_views, leads=leads)
+            for (day, dimension, value), (sessions, page_views, leads) in totals.items()
+        ], batch_size=1000)
+
+
+def update_funnels():
+    """Оновити сесії та агрегати воронки. Повертає {'sessions': змінених днів}"""
+    touched_days = set()
+    with transaction.atomic():
+        process_events(touched_days)
+        process_leads(touched_days)
+        rebuild_funnel_days(touched_days)
+    return {'sessions': len(touched_days)}
+
+
+def rebuild_funnels():
+    """Видалити сесії та агрегати воронки і порахувати все заново"""
+    with transaction.atomic():
+        FunnelRollup.objects.all().delete()
+        FunnelSession.objects.all().delete()
+        RollupWatermark.objects.filter(name__in=[FUNNEL_EVENTS, FUNNEL_LEADS]).delete()
+        reset_id_watermark(FUNNEL_EVENTS, AnalyticsEvent)
+        return update_funnels()
@@ -0,0 +1,26 @@
+"""Management команда для інкрементального оновлення агрегатів звітів"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from reports.tasks import update_reports
+
+
+class Command(BaseCommand):
+    help = ('Оновити погодинні та денні агрегати подій і заявок та воронку конверсій, обробивши лише нові рядки. '
+            'Автоматично виконується кожні 5 хвилин (MAINTENANCE_TASKS); вручну - для --rebuild або перевірки')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Видалити агрегати і порахувати все заново (після видалення даних)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = update_reports(rebuild=options['rebuild'])
+        if result is None:
+            self.stdout.write(self.style.WARNING('Агрегати вже оновлює інший процес, спробуйте пізніше'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Подій оброблено: {result['events']}, днів заявок перераховано: {result['leads']}, "
+            f"днів воронки: {result['sessions']} ({time.perf_counter() - started:.2f} с)"
+        ))
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('leads', '0003_lead_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Назва')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Останній ID')),
+                ('pending_id', models.BigIntegerField(default=0, verbose_name='Очікуваний ID')),
+                ('last_time', models.DateTimeField(blank=True, null=True, verbose_name='Останній час')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Оновлено')),
+            ],
+            options={
+                'verbose_name': 'Позиція агрегації',
+                'verbose_name_plural': 'Позиції агрегації',
+            },
+        ),
+        migrations.CreateModel(
+            name='EventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Година'), ('day', 'День')], max_length=4, verbose_name='Період')),
+                ('bucket', models.DateTimeField(verbose_name='Початок періоду')),
+                ('event_type', models.CharField(choices=[('page_view', 'Перегляд сторінки'), ('form_submit', 'Відправка форми'), ('download', 'Завантаження'), ('contact', 'Контакт'), ('product_view', 'Перегляд продукту')], max_length=20, verbose_name='Тип події')),
+                ('page_path', models.CharField(max_length=300, verbose_name='Сторінка')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Кількість')),
+            ],
+            options={
+                'verbose_name': 'Агрегат подій',
+                'verbose_name_plural': 'Агрегати подій',
+                'ordering': ['-bucket'],
+                'constraints': [models.UniqueConstraint(fields=('period', 'bucket', 'event_type', 'page_path'), name='reports_eventrollup_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeadRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Година'), ('day', 'День')], max_length=4, verbose_name='Період')),
+                ('bucket', models.DateTimeField(verbose_name='Початок періоду')),
+                ('inquiry_type', models.CharField(choices=[('price_request', 'Запит ціни'), ('tech_consultation', 'Технічна консультація'), ('partnership', 'Партнерство'), ('service', 'Сервіс'), ('other', 'Інше')], max_length=20, verbose_name='Тип запиту')),
+                ('language', models.CharField(max_length=10, verbose_name='Мова')),
+                ('status', models.CharField(choices=[('new', 'Нова'), ('contacted', "Зв'язалися"), ('quote_sent', 'Відправили пропозицію'), ('closed_won', 'Закрито (продано)'), ('closed_lost', 'Закрито (втрачено)'), ('spam', 'Спам')], max_length=20, verbose_name='Статус')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Кількість')),
+                ('source', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='leads.leadsource', verbose_name='Джерело')),
+            ],
+            options={
+                'verbose_name': 'Агрегат заявок',
+                'verbose_name_plural': 'Агрегати заявок',
+                'ordering': ['-bucket'],
+                'indexes': [models.Index(fields=['period', 'bucket'], name='reports_lea_period_f99adc_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.3 on 2026-10-19 18:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0004_tracking_ids'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FunnelRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(verbose_name='День')),
+                ('dimension', models.CharField(choices=[('landing', 'Сторінка входу'), ('campaign', 'Кампанія'), ('page', 'Переглянута сторінка')], max_length=10, verbose_name='Вимір')),
+                ('value', models.CharField(max_length=300, verbose_name='Значення')),
+                ('sessions', models.PositiveIntegerField(default=0, verbose_name='Сесій')),
+                ('page_views', models.PositiveIntegerField(default=0, verbose_name='Переглядів')),
+                ('leads', models.PositiveIntegerField(default=0, verbose_name='Заявок')),
+            ],
+            options={
+                'verbose_name': 'Агрегат воронки',
+                'verbose_name_plural': 'Агрегати воронки',
+                'ordering': ['-bucket'],
+                'indexes': [models.Index(fields=['bucket', 'dimension'], name='reports_fun_bucket_a1a551_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FunnelSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.CharField(max_length=40, unique=True, verbose_name='ID сесії')),
+                ('visitor_id', models.CharField(blank=True, max_length=32, verbose_name='ID відвідувача')),
+                ('started_at', models.DateTimeField(verbose_name='Початок')),
+                ('last_seen_at', models.DateTimeField(verbose_name='Остання активність')),
+                ('landing_path', models.CharField(blank=True, max_length=300, verbose_name='Сторінка входу')),
+                ('campaign', models.CharField(blank=True, max_length=200, verbose_name='Кампанія')),
+                ('page_views', models.PositiveIntegerField(default=0, verbose_name='Переглядів')),
+                ('pages', models.JSONField(blank=True, default=dict, verbose_name='Сторінки')),
+                ('converted_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата заявки')),
+                ('lead', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='leads.lead', verbose_name='Заявка')),
+            ],
+            options={
+                'verbose_name': 'Сесія воронки',
+                'verbose_name_plural': 'Сесії воронки',
+                'indexes': [models.Index(fields=['started_at'], name='reports_fun_started_042641_idx')],
+            },
+        ),
+    ]
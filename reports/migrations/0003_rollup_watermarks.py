@@ -0,0 +1,22 @@
+from django.db import migrations
+
+# reports.rollups.EVENTS/LEADS та reports.funnels.FUNNEL_EVENTS/FUNNEL_LEADS
+WATERMARKS = ['events', 'leads', 'funnel_events', 'funnel_leads']
+
+
+def create_watermarks(apps, schema_editor):
+    """Позиції створюються заздалегідь: перший запуск у кількох воркерах не вставляє їх одночасно"""
+    RollupWatermark = apps.get_model('reports', 'RollupWatermark')
+    for name in WATERMARKS:
+        RollupWatermark.objects.get_or_create(name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_funnel'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_watermarks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,132 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from core.models import AnalyticsEvent
+from leads.models import Lead, LeadSource
+
+PERIOD_CHOICES = (
+    ('hour', _('Година')),
+    ('day', _('День')),
+)
+
+
+class RollupWatermark(models.Model):
+    """Позиція інкрементального оновлення агрегатів"""
+
+    name = models.CharField(_('Назва'), max_length=50, unique=True)
+    # Події лише додаються, тому для них достатньо останнього обробленого id;
+    # заявки змінюють статус, тому для них береться останній updated_at
+    last_id = models.BigIntegerField(_('Останній ID'), default=0)
+    # Найбільший id на момент попереднього запуску, обробляється наступним
+    pending_id = models.BigIntegerField(_('Очікуваний ID'), default=0)
+    last_time = models.DateTimeField(_('Останній час'), null=True, blank=True)
+    updated_at = models.DateTimeField(_('Оновлено'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Позиція агрегації')
+        verbose_name_plural = _('Позиції агрегації')
+
+    def __str__(self):
+        return self.name
+
+
+class EventRollup(models.Model):
+    """Кількість подій аналітики за годину/день по типу та сторінці"""
+
+    period = models.CharField(_('Період'), max_length=4, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField(_('Початок періоду'))
+    event_type = models.CharField(_('Тип події'), max_length=20, choices=AnalyticsEvent.EVENT_TYPES)
+    page_path = models.CharField(_('Сторінка'), max_length=300)
+    count = models.PositiveIntegerField(_('Кількість'), default=0)
+
+    class Meta:
+        verbose_name = _('Агрегат подій')
+        verbose_name_plural = _('Агрегати подій')
+        ordering = ['-bucket']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'bucket', 'event_type', 'page_path'], name='reports_eventrollup_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d %H:%M} {self.event_type} {self.page_path}: {self.count}"
+
+
+class LeadRollup(models.Model):
+    """Кількість заявок за годину/день у розрізі джерела, типу, мови та статусу"""
+
+    period = models.CharField(_('Період'), max_length=4, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField(_('Початок періоду'))
+    source = models.ForeignKey(LeadSource, on_delete=models.SET_NULL, null=True, blank=True,
+                               verbose_name=_('Джерело'))
+    inquiry_type = models.CharField(_('Тип запиту'), max_length=20, choices=Lead.INQUIRY_TYPES)
+    language = models.CharField(_('Мова'), max_length=10)
+    status = models.CharField(_('Статус'), max_length=20, choices=Lead.STATUS_CHOICES)
+    count = models.PositiveIntegerField(_('Кількість'), default=0)
+
+    class Meta:
+        verbose_name = _('Агрегат заявок')
+        verbose_name_plural = _('Агрегати заявок')
+        ordering = ['-bucket']
+        indexes = [
+            models.Index(fields=['period', 'bucket']),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d %H:%M}: {self.count}"
+
+
+class FunnelSession(models.Model):
+    """Сесія відвідувача для воронки: сторінка входу, переглянуті сторінки та заявка"""
+
+    session_id = models.CharField(_('ID сесії'), max_length=40, unique=True)
+    visitor_id = models.CharField(_('ID відвідувача'), max_length=32, blank=True)
+    started_at = models.DateTimeField(_('Початок'))
+    last_seen_at = models.DateTimeField(_('Остання активність'))
+    landing_path = models.CharField(_('Сторінка входу'), max_length=300, blank=True)
+    campaign = models.CharField(_('Кампанія'), max_length=200, blank=True)
+    page_views = models.PositiveIntegerField(_('Переглядів'), default=0)
+    # {шлях: переглядів} для не більше ніж MAX_SESSION_PAGES сторінок
+    pages = models.JSONField(_('Сторінки'), default=dict, blank=True)
+    lead = models.ForeignKey(Lead, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+                             verbose_name=_('Заявка'))
+    converted_at = models.DateTimeField(_('Дата заявки'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Сесія воронки')
+        verbose_name_plural = _('Сесії воронки')
+        indexes = [
+            models.Index(fields=['started_at']),
+        ]
+
+    def __str__(self):
+        return self.session_id
+
+
+class FunnelRollup(models.Model):
+    """Денна воронка сесія -> заявка в розрізі сторінки входу, кампанії або переглянутої сторінки"""
+
+    DIMENSIONS = (
+        ('landing', _('Сторінка входу')),
+        ('campaign', _('Кампанія')),
+        ('page', _('Переглянута сторінка')),
+    )
+
+    bucket = models.DateTimeField(_('День'))
+    dimension = models.CharField(_('Вимір'), max_length=10, choices=DIMENSIONS)
+    value = models.CharField(_('Значення'), max_length=300)
+    sessions = models.PositiveIntegerField(_('Сесій'), default=0)
+    page_views = models.PositiveIntegerField(_('Переглядів'), default=0)
+    leads = models.PositiveIntegerField(_('Заявок'), default=0)
+
+    class Meta:
+        verbose_name = _('Агрегат воронки')
+        verbose_name_plural = _('Агрегати воронки')
+        ordering = ['-bucket']
+        indexes = [
+            models.Index(fields=['bucket', 'dimension']),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d} {self.dimension} {self.value}: {self.leads}/{self.sessions}"
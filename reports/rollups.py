@@ -0,0 +1,220 @@
+"""Інкрементальні погодинні та денні агрегати подій аналітики і заявок
+
+Кожен запуск обробляє лише рядки після позиції (RollupWatermark):
+
+* події лише додаються, тому нові рядки (id після позиції) групуються в БД
+  і їх кількості додаються до наявних агрегатів. id береться з попереднього
+  запуску: транзакції, що отримали менші id, на той час уже завершені, тож
+  рядки, які ще не були видимі, не пропускаються;
+* заявки змінюють статус, тому за updated_at знаходяться змінені дні, а
+  агрегати цих днів перераховуються повністю.
+
+Денні агрегати рахуються за місцевим часом (TIME_ZONE), погодинні - в UTC.
+Видалені заявки та події, що випали через ретеншн, враховуються лише після
+повного перерахунку (update_rollups --rebuild).
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from core.models import AnalyticsEvent
+from leads.models import Lead
+
+from .models import EventRollup, LeadRollup, RollupWatermark
+
+EVENTS = 'events'
+LEADS = 'leads'
+# Запис заявки (updated_at) може бути закомічений трохи пізніше за свій час
+LEAD_LAG = timedelta(seconds=60)
+# Скільки діапазонів днів об'єднується через OR в одному запиті
+DAY_RANGES_PER_QUERY = 50
+EVENT_DIMENSIONS = ('event_type', 'page_path')
+LEAD_DIMENSIONS = ('source_id', 'inquiry_type', 'language', 'status')
+
+
+def get_watermark(name):
+    """Позиція з блокуванням рядка: паралельні запуски виконуються по черзі
+
+    Рядки позицій створює міграція reports.0003; get_or_create лишається
+    для повного перерахунку, який видаляє позиції.
+    """
+    RollupWatermark.objects.get_or_create(name=name)
+    return RollupWatermark.objects.select_for_update().get(name=name)
+
+
+def advance_id_watermark(watermark, model):
+    """Оброблено до pending_id; наступний запуск обробить до поточного найбільшого id"""
+    watermark.last_id = max(watermark.last_id, watermark.pending_id)
+    watermark.pending_id = max(watermark.last_id, model.objects.aggregate(max_id=Max('pk'))['max_id'] or 0)
+    watermark.last_time = timezone.now()
+    watermark.save()
+
+
+def reset_id_watermark(name, model):
+    """Нова позиція для повного перерахунку: одразу до найбільшого id"""
+    RollupWatermark.objects.create(name=name, pending_id=model.objects.aggregate(max_id=Max('pk'))['max_id'] or 0)
+
+
+def get_lead_changes(watermark):
+    """Заявки, змінені після позиції, та нова позиція (з запасом на незакомічені записи)"""
+    upper = timezone.now() - LEAD_LAG
+    changed = Lead.objects.filter(updated_at__lte=upper)
+    if watermark.last_time:
+        changed = changed.filter(updated_at__gt=watermark.last_time)
+    return changed, upper
+
+
+@lru_cache(maxsize=4096)
+def local_day(value):
+    """Початок дня за TIME_ZONE, до якого належить момент value"""
+    tz = timezone.get_default_timezone()
+    day = timezone.localtime(value, tz).date()
+    return timezone.make_aware(datetime.combine(day, time.min), tz)
+
+
+def day_range(day):
+    """Межі дня [початок, початок наступного) з урахуванням переходу на літній час"""
+    tz = timezone.get_default_timezone()
+    next_day = timezone.localtime(day, tz).date() + timedelta(days=1)
+    return day, timezone.make_aware(datetime.combine(next_day, time.min), tz)
+
+
+def get_page_path(url):
+    return (urlsplit(url).path or '/')[:300]
+
+
+def merge_counts(model, period, counts, dimensions):
+    """Додати кількості {(bucket, *виміри): n} до наявних рядків агрегату"""
+    if not counts:
+        return 0
+    buckets = {key[0] for key in counts}
+    existing = {
+        (row.bucket, *(getattr(row, name) for name in dimensions)): row
+        for row in model.objects.filter(period=period, bucket__in=buckets)
+    }
+    to_update, to_create = [], []
+    for key, count in counts.items():
+        row = existing.get(key)
+        if row:
+            row.count += count
+            to_update.append(row)
+        else:
+            to_create.append(model(period=period, bucket=key[0], count=count, **dict(zip(dimensions, key[1:]))))
+    model.objects.bulk_update(to_update, ['count'], batch_size=1000)
+    model.objects.bulk_create(to_create, batch_size=1000)
+    return len(to_update) + len(to_create)
+
+
+def update_event_rollups():
+    """Додати до агрегатів події, що з'явилися після позиції. Повертає кількість подій"""
+    with transaction.atomic():
+        watermark = get_watermark(EVENTS)
+        last_id, upper_id = watermark.last_id, watermark.pending_id
+
+        hours = defaultdict(int)
+        processed = 0
+        if upper_id > last_id:
+            rows = (
+                AnalyticsEvent.objects.filter(pk__gt=last_id, pk__lte=upper_id)
+                .annotate(hour=TruncHour('created_at', tzinfo=dt_timezone.utc))
+                .values('hour', 'event_type', 'page_url')
+                .annotate(count=Count('pk'))
+                .order_by()
+            )
+            for row in rows.iterator(chunk_size=5000):
+                # Групування по повному URL, а в агрегат потрапляє лише шлях
+                hours[(row['hour'], row['event_type'], get_page_path(row['page_url']))] += row['count']
+                processed += row['count']
+
+        days = defaultdict(int)
+        for (hour, *dimensions), count in hours.items():
+            days[(local_day(hour), *dimensions)] += count
+        merge_counts(EventRollup, 'hour', hours, EVENT_DIMENSIONS)
+        merge_counts(EventRollup, 'day', days, EVENT_DIMENSIONS)
+
+        advance_id_watermark(watermark, AnalyticsEvent)
+    return processed
+
+
+def day_ranges(days):
+    """Відсортовані дні -> суцільні діапазони [(початок, кінець)]"""
+    ranges = []
+    for day in sorted(days):
+        start, end = day_range(day)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def rebuild_lead_days(days):
+    """Повністю перерахувати погодинні та денні агрегати заявок для днів"""
+    ranges = day_ranges(days)
+    for offset in range(0, len(ranges), DAY_RANGES_PER_QUERY):
+        chunk = ranges[offset:offset + DAY_RANGES_PER_QUERY]
+        bucket_filter = Q()
+        created_filter = Q()
+        for start, end in chunk:
+            bucket_filter |= Q(bucket__gte=start, bucket__lt=end)
+            created_filter |= Q(created_at__gte=start, created_at__lt=end)
+
+        LeadRollup.objects.filter(bucket_filter).delete()
+        rows = (
+            Lead.objects.filter(created_filter)
+            .annotate(hour=TruncHour('created_at', tzinfo=dt_timezone.utc))
+            .values('hour', *LEAD_DIMENSIONS)
+            .annotate(count=Count('pk'))
+            .order_by()
+        )
+        hour_rows, day_counts = [], defaultdict(int)
+        for row in rows.iterator(chunk_size=5000):
+            dimensions = {name: row[name] for name in LEAD_DIMENSIONS}
+            hour_rows.append(LeadRollup(period='hour', bucket=row['hour'], count=row['count'], **dimensions))
+            day_counts[(local_day(row['hour']), *dimensions.values())] += row['count']
+        day_rows = [
+            LeadRollup(period='day', bucket=day, count=count, **dict(zip(LEAD_DIMENSIONS, dimensions)))
+            for (day, *dimensions), count in day_counts.items()
+        ]
+        LeadRollup.objects.bulk_create(hour_rows + day_rows, batch_size=1000)
+
+
+def update_lead_rollups():
+    """Перерахувати агрегати днів, у яких заявки створювались або змінювались. Повертає кількість днів"""
+    with transaction.atomic():
+        watermark = get_watermark(LEADS)
+        changed, upper = get_lead_changes(watermark)
+        hours = changed.annotate(
+            hour=TruncHour('created_at', tzinfo=dt_timezone.utc),
+        ).values_list('hour', flat=True).distinct().order_by()
+        days = {local_day(hour) for hour in hours}
+        rebuild_lead_days(days)
+
+        watermark.last_time = upper
+        watermark.save()
+    return len(days)
+
+
+def update_rollups():
+    """Оновити всі агрегати. Повертає {'events': подій, 'leads': днів заявок}"""
+    return {EVENTS: update_event_rollups(), LEADS: update_lead_rollups()}
+
+
+def rebuild_rollups():
+    """Видалити агрегати та позиції і порахувати все заново"""
+    with transaction.atomic():
+        EventRollup.objects.all().delete()
+        LeadRollup.objects.all().delete()
+        RollupWatermark.objects.filter(name__in=[EVENTS, LEADS]).delete()
+        reset_id_watermark(EVENTS, AnalyticsEvent)
+        return update_rollups()
+
+
+def get_last_updated():
+    return RollupWatermark.objects.aggregate(last=Max('last_time'))['last']
@@ -0,0 +1,20 @@
+"""Оновлення звітів: викликається core.maintenance, командою update_rollups та кнопкою в адмінці"""
+from core.db import advisory_lock
+
+from . import funnels, rollups
+
+LOCK_NAME = 'reports.update_reports'
+
+
+def update_reports(rebuild=False):
+    """Оновити агрегати та воронку. Повертає {'events', 'leads', 'sessions'}
+
+    Без Redis кожен воркер gunicorn запускає задачу сам, тому оновлення
+    виконує лише той, хто отримав блокування; решта отримують None.
+    """
+    with advisory_lock(LOCK_NAME) as acquired:
+        if not acquired:
+            return None
+        if rebuild:
+            return {**rollups.rebuild_rollups(), **funnels.rebuild_funnels()}
+        return {**rollups.update_rollups(), **funnels.update_funnels()}
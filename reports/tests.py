@@ -0,0 +1,141 @@
+from collections import Counter
+from contextlib import nullcontext
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import AnalyticsEvent
+from leads.models import Lead
+
+from .models import EventRollup, FunnelRollup, LeadRollup, RollupWatermark
+from .rollups import local_day
+from .tasks import update_reports
+
+
+def add_events(*pages, event_type='page_view', session_id='', created_at=None):
+    AnalyticsEvent.objects.bulk_create([
+        AnalyticsEvent(
+            event_type=event_type, event_name=event_type, page_url=f'https://example.com{page}?utm_source=ads',
+            session_id=session_id, created_at=created_at or timezone.now(),
+        )
+        for page in pages
+    ])
+
+
+def add_lead(age=timedelta(hours=1), **fields):
+    """Заявка, змінена раніше за LEAD_LAG (інакше її обробить лише наступний запуск)"""
+    lead = Lead.objects.create(
+        name='Олена', email='olena@example.com', phone='+380501234567', inquiry_type='other', **fields,
+    )
+    moment = timezone.now() - age
+    Lead.objects.filter(pk=lead.pk).update(created_at=moment, updated_at=moment)
+    return lead
+
+
+def run_updates():
+    """Нові події потрапляють в агрегати з другого запуску (позиція id з попереднього)"""
+    update_reports()
+    return update_reports()
+
+
+def change_lead(lead, **fields):
+    """Зміна заявки між двома запусками, що були 10 хвилин тому і зараз"""
+    RollupWatermark.objects.update(last_time=timezone.now() - timedelta(minutes=10))
+    Lead.objects.filter(pk=lead.pk).update(updated_at=timezone.now() - timedelta(minutes=5), **fields)
+
+
+def rollup_counts(period):
+    return {
+        (row.bucket, row.event_type, row.page_path): row.count
+        for row in EventRollup.objects.filter(period=period)
+    }
+
+
+class RollupTests(TestCase):
+    """Інкрементальні агрегати збігаються з прямим підрахунком"""
+
+    def expected_event_counts(self, period):
+        counts = Counter()
+        for event in AnalyticsEvent.objects.all():
+            bucket = event.created_at.replace(minute=0, second=0, microsecond=0)
+            if period == 'day':
+                bucket = local_day(event.created_at)
+            counts[(bucket, event.event_type, event.page_url.split('?')[0][len('https://example.com'):])] += 1
+        return dict(counts)
+
+    def test_incremental_event_rollups_match_direct_counts(self):
+        yesterday = timezone.now() - timedelta(days=1)
+        add_events('/', '/uk/catalog/', '/', created_at=yesterday)
+        add_events('/uk/about/', event_type='download')
+        run_updates()
+        for period in ('hour', 'day'):
+            self.assertEqual(rollup_counts(period), self.expected_event_counts(period))
+
+        # Нові події додаються до наявних рядків, а не дублюють їх
+        add_events('/', '/uk/about/', created_at=yesterday)
+        add_events('/uk/about/', event_type='download')
+        result = run_updates()
+        self.assertEqual(result['events'], 3)
+        for period in ('hour', 'day'):
+            self.assertEqual(rollup_counts(period), self.expected_event_counts(period))
+        self.assertEqual(sum(rollup_counts('day').values()), AnalyticsEvent.objects.count())
+
+    def test_lead_status_change_recounts_day(self):
+        lead = add_lead()
+        add_lead()
+        update_reports()
+        self.assertEqual(
+            dict(LeadRollup.objects.filter(period='day').values_list('status', 'count')),
+            {'new': 2},
+        )
+
+        change_lead(lead, status='contacted')
+        update_reports()
+        self.assertEqual(
+            dict(LeadRollup.objects.filter(period='day').values_list('status', 'count')),
+            {'new': 1, 'contacted': 1},
+        )
+
+    def test_recent_lead_waits_for_lag(self):
+        add_lead(age=timedelta(seconds=0))
+        update_reports()
+        self.assertFalse(LeadRollup.objects.exists())
+
+    def test_update_skipped_while_another_process_holds_lock(self):
+        add_events('/')
+        with mock.patch('reports.tasks.advisory_lock', return_value=nullcontext(False)):
+            self.assertIsNone(update_reports())
+            self.assertIsNone(update_reports())
+        self.assertFalse(EventRollup.objects.exists())
+        self.assertEqual(set(RollupWatermark.objects.values_list('pending_id', flat=True)), {0})
+
+
+class FunnelTests(TestCase):
+    """Воронка сесія -> заявка"""
+
+    def test_session_with_lead_is_converted(self):
+        started = timezone.now() - timedelta(hours=2)
+        add_events('/uk/catalog/', session_id='converted', created_at=started)
+        add_events('/uk/contacts/', session_id='converted', created_at=started + timedelta(minutes=1))
+        add_events('/uk/catalog/', session_id='visitor', created_at=started)
+        add_lead(session_id='converted')
+        run_updates()
+
+        landing = FunnelRollup.objects.get(dimension='landing', value='/uk/catalog/')
+        self.assertEqual((landing.sessions, landing.page_views, landing.leads), (2, 3, 1))
+        campaign = FunnelRollup.objects.get(dimension='campaign', value='ads')
+        self.assertEqual((campaign.sessions, campaign.leads), (2, 1))
+        contacts = FunnelRollup.objects.get(dimension='page', value='/uk/contacts/')
+        self.assertEqual((contacts.sessions, contacts.leads), (1, 1))
+
+    def test_spam_lead_is_not_a_conversion(self):
+        add_events('/uk/', session_id='spam', created_at=timezone.now() - timedelta(hours=2))
+        lead = add_lead(session_id='spam')
+        run_updates()
+        self.assertEqual(FunnelRollup.objects.get(dimension='landing', value='/uk/').leads, 1)
+
+        change_lead(lead, status='spam')
+        update_reports()
+        self.assertEqual(FunnelRollup.objects.get(dimension='landing', value='/uk/').leads, 0)
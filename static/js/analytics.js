@@ -0,0 +1,105 @@
+'use strict';
+
+/**
+ * Власна аналітика Adiabatic
+ * Події збираються в чергу і відправляються пакетом через navigator.sendBeacon
+ * (не блокує сторінку і доходить навіть при закритті вкладки)
+ */
+(function () {
+  const endpoint = document.currentScript && document.currentScript.dataset.endpoint;
+  if (!endpoint) return;
+
+  const MAX_BATCH = 20;
+  const FLUSH_DELAY = 5000;
+  const VISITOR_COOKIE = 'adb_vid';
+  const SESSION_COOKIE = 'adb_sid';
+  const VISITOR_MAX_AGE = 365 * 24 * 3600;
+  const SESSION_MAX_AGE = 30 * 60;
+  const queue = [];
+  let timer = null;
+
+  function randomId() {
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, (byte) => byte.toString(16).padStart(2, '0')).join('');
+  }
+
+  function getCookie(name) {
+    const match = document.cookie.match(new RegExp('(?:^|; )' + name + '=([0-9a-f]{32})(?:;|$)'));
+    return match ? match[1] : null;
+  }
+
+  function setCookie(name, value, maxAge) {
+    const secure = window.location.protocol === 'https:' ? '; Secure' : '';
+    document.cookie = name + '=' + value + '; Max-Age=' + maxAge + '; Path=/; SameSite=Lax' + secure;
+  }
+
+  /**
+   * Ідентифікатори відвідувача та сесії для воронки конверсій.
+   * Сесія закінчується після 30 хв без подій; cookie надсилаються разом
+   * з подіями та формою заявки, тож сервер пов'язує їх між собою
+   */
+  function touchSession() {
+    setCookie(VISITOR_COOKIE, getCookie(VISITOR_COOKIE) || randomId(), VISITOR_MAX_AGE);
+    setCookie(SESSION_COOKIE, getCookie(SESSION_COOKIE) || randomId(), SESSION_MAX_AGE);
+  }
+
+  function flush() {
+    clearTimeout(timer);
+    timer = null;
+    if (!queue.length) return;
+
+    const body = JSON.stringify({ events: queue.splice(0, queue.length) });
+    // text/plain не потребує CORS preflight; сервер читає тіло як JSON
+    const blob = new Blob([body], { type: 'text/plain' });
+    if (!(navigator.sendBeacon && navigator.sendBeacon(endpoint, blob))) {
+      fetch(endpoint, { method: 'POST', body: blob, keepalive: true, credentials: 'same-origin' })
+        .catch(() => {});
+    }
+  }
+
+  function track(type, name, data) {
+    touchSession();
+    queue.push({ type: type, name: name, url: window.location.href, data: data || {} });
+    if (queue.length >= MAX_BATCH) {
+      flush();
+    } else if (!timer) {
+      timer = setTimeout(flush, FLUSH_DELAY);
+    }
+  }
+
+  window.adiabaticTrack = track;
+
+  track('page_view', document.title, { referrer: document.referrer });
+
+  document.addEventListener('click', (event) => {
+    const link = event.target.closest('a');
+    if (!link) return;
+    const href = link.getAttribute('href') || '';
+    if (link.hasAttribute('download')) {
+      track('download', link.textContent.trim().slice(0, 100) || href, { href: link.href });
+    } else if (href.startsWith('tel:') || href.startsWith('mailto:')) {
+      track('contact', href.split(':')[0], { href: href });
+    }
+  });
+
+  document.addEventListener('submit', (event) => {
+    const form = event.target;
+    track('form_submit', form.getAttribute('name') || form.id || 'form', {
+      action: form.getAttribute('action') || window.location.pathname,
+    });
+  });
+
+  // Деталі товару в каталозі завантажуються через HTMX
+  document.body.addEventListener('htmx:afterRequest', (event) => {
+    const match = /\/catalog\/([^/]+)\/details\//.exec(event.detail.pathInfo.requestPath || '');
+    if (match && event.detail.successful) {
+      track('product_view', match[1]);
+    }
+  });
+
+  // Остання можливість відправити чергу перед закриттям або переходом
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flush();
+  });
+  window.addEventListener('pagehide', flush);
+})();
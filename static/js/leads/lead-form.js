@@ -26,6 +26,12 @@ function submitLeadForm(form) {
     const formData = new FormData(form);
     const submitButton = form.querySelector('button[type="submit"]');
 
+    // Один ключ на заявку: повторна відправка після збою мережі не створить дубль
+    if (!form.dataset.idempotencyKey) {
+        form.dataset.idempotencyKey = Array.from(crypto.getRandomValues(new Uint8Array(16)),
+            (byte) => byte.toString(16).padStart(2, '0')).join('');
+    }
+
     // Show loading state
     setLoadingState(submitButton, true);
     hideMessages();
@@ -36,6 +42,7 @@ function submitLeadForm(form) {
         body: formData,
         headers: {
             'X-Requested-With': 'XMLHttpRequest',
+            'Idempotency-Key': form.dataset.idempotencyKey,
         }
     })
         .then(response => response.json())
@@ -45,6 +52,7 @@ function submitLeadForm(form) {
             if (data.success) {
                 showSuccessMessage('Дякуємо! Ваша заявка успішно відправлена. Ми зв\'яжемося з вами найближчим часом.');
                 form.reset();
+                delete form.dataset.idempotencyKey;
 
                 // Track successful form submission
                 if (typeof gtag !== 'undefined') {
@@ -1,102 +1,84 @@
 /**
  * Adiabatic Catalog Page JavaScript
- * Accordion functionality for product cards
+ * Accordion functionality for product cards (search/pagination via HTMX)
  */
 /* global gtag */
 
 document.addEventListener('DOMContentLoaded', () => {
-    // Ініціалізація accordion для кожної картки товару
-    const toggleButtons = document.querySelectorAll('.product-toggle');
-
-    toggleButtons.forEach(btn => {
-        btn.addEventListener('click', function () {
-            const card = this.closest('.product-card');
-            const details = card.querySelector('.product-details');
-            const icon = this.querySelector('.toggle-icon');
-
-            const isExpanded = details.dataset.expanded === 'true';
-
-            // Опціонально: закрити всі інші картки (коментар знято = акордеон, один відкритий)
-            // toggleButtons.forEach(otherBtn => {
-            //     if (otherBtn !== this) {
-            //         const otherCard = otherBtn.closest('.product-card');
-            //         const otherDetails = otherCard.querySelector('.product-details');
-            //         const otherIcon = otherBtn.querySelector('.toggle-icon');
-            //         
-            //         if (otherDetails.dataset.expanded === 'true') {
-            //             otherDetails.dataset.expanded = 'false';
-            //             otherBtn.setAttribute('aria-expanded', 'false');
-            //             if (otherIcon) {
-            //                 otherIcon.style.transform = 'rotate(0deg)';
-            //             }
-            //             otherBtn.innerHTML = 'Детальніше <span class="toggle-icon">▼</span>';
-            //         }
-            //     }
-            // });
-
-            // Toggle поточний стан
-            details.dataset.expanded = (!isExpanded).toString();
-            this.setAttribute('aria-expanded', (!isExpanded).toString());
-
-            // Animate іконка
-            if (icon) {
-                icon.style.transform = isExpanded ? 'rotate(0deg)' : 'rotate(180deg)';
-            }
+    // Accordion для карток товару. Делегування подій: картки замінюються
+    // HTMX-ом при пошуку/пагінації, тому обробник висить на document
+    document.addEventListener('click', (event) => {
+        const btn = event.target.closest('.product-toggle');
+        if (!btn) {
+            return;
+        }
 
-            // Змінити текст кнопки
-            if (isExpanded) {
-                this.innerHTML = 'Детальніше <span class="toggle-icon" style="transform: rotate(0deg);">▼</span>';
-            } else {
-                this.innerHTML = 'Згорнути <span class="toggle-icon" style="transform: rotate(180deg);">▲</span>';
+        const card = btn.closest('.product-card');
+        const details = card.querySelector('.product-details');
+        const icon = btn.querySelector('.toggle-icon');
 
-                // Плавний скрол до картки
-                setTimeout(() => {
-                    card.scrollIntoView({ behavior: 'smooth', block: 'start' });
-                }, 100);
-            }
+        const isExpanded = details.dataset.expanded === 'true';
 
-            // Analytics tracking
-            const productId = this.dataset.productId;
-            if (typeof gtag !== 'undefined' && !isExpanded) {
-                gtag('event', 'product_expand', {
-                    'event_category': 'catalog',
-                    'event_label': productId
-                });
-            }
-        });
-    });
+        // Toggle поточний стан
+        details.dataset.expanded = (!isExpanded).toString();
+        btn.setAttribute('aria-expanded', (!isExpanded).toString());
 
-    // Галерея: клік на зображення = відкрити в новій вкладці
-    const galleryImages = document.querySelectorAll('.gallery-image');
+        // Animate іконка
+        if (icon) {
+            icon.style.transform = isExpanded ? 'rotate(0deg)' : 'rotate(180deg)';
+        }
 
-    galleryImages.forEach(img => {
-        img.addEventListener('click', function () {
-            window.open(this.src, '_blank');
+        // Змінити текст кнопки
+        if (isExpanded) {
+            btn.innerHTML = 'Детальніше <span class="toggle-icon" style="transform: rotate(0deg);">▼</span>';
+        } else {
+            btn.innerHTML = 'Згорнути <span class="toggle-icon" style="transform: rotate(180deg);">▲</span>';
 
-            // Analytics tracking
-            if (typeof gtag !== 'undefined') {
-                gtag('event', 'gallery_image_click', {
-                    'event_category': 'catalog',
-                    'event_label': this.alt
-                });
-            }
-        });
+            // Плавний скрол до картки
+            setTimeout(() => {
+                card.scrollIntoView({ behavior: 'smooth', block: 'start' });
+            }, 100);
+        }
 
-        // Додати cursor pointer
-        img.style.cursor = 'pointer';
-        img.setAttribute('title', 'Клікніть для перегляду у повному розмірі');
+        // Analytics tracking
+        const productId = btn.dataset.productId;
+        if (typeof gtag !== 'undefined' && !isExpanded) {
+            gtag('event', 'product_expand', {
+                'event_category': 'catalog',
+                'event_label': productId
+            });
+        }
     });
 
-    // Головне фото: клік = відкрити в новій вкладці
-    const mainImages = document.querySelectorAll('.product-main-image');
+    // Галерея та головне фото: клік = відкрити в новій вкладці
+    document.addEventListener('click', (event) => {
+        const img = event.target.closest('.gallery-image, .product-main-image');
+        if (!img) {
+            return;
+        }
+
+        window.open(img.src, '_blank');
+
+        // Analytics tracking
+        if (img.classList.contains('gallery-image') && typeof gtag !== 'undefined') {
+            gtag('event', 'gallery_image_click', {
+                'event_category': 'catalog',
+                'event_label': img.alt
+            });
+        }
+    });
 
-    mainImages.forEach(img => {
-        img.addEventListener('click', function () {
-            window.open(this.src, '_blank');
+    // Підказка для зображень (і після кожної HTMX заміни результатів)
+    const initImages = (root) => {
+        root.querySelectorAll('.gallery-image, .product-main-image').forEach(img => {
+            img.style.cursor = 'pointer';
+            img.setAttribute('title', 'Клікніть для перегляду у повному розмірі');
         });
+    };
 
-        img.style.cursor = 'pointer';
-        img.setAttribute('title', 'Клікніть для перегляду у повному розмірі');
+    initImages(document);
+    document.body.addEventListener('htmx:afterSwap', (event) => {
+        initImages(event.detail.target);
     });
 
     // Якщо є якір (#product-slug) в URL, автоматично відкрити цю картку
@@ -120,20 +102,21 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // Tracking для кнопок CTA
-    const ctaButtons = document.querySelectorAll('.product-actions .btn');
-
-    ctaButtons.forEach(btn => {
-        btn.addEventListener('click', function () {
-            const card = this.closest('.product-card');
-            const productTitle = card ? card.querySelector('.card-title').textContent : 'Unknown';
-
-            if (typeof gtag !== 'undefined') {
-                gtag('event', 'cta_click', {
-                    'event_category': 'catalog',
-                    'event_label': productTitle
-                });
-            }
-        });
+    document.addEventListener('click', (event) => {
+        const btn = event.target.closest('.product-actions .btn');
+        if (!btn) {
+            return;
+        }
+
+        const card = btn.closest('.product-card');
+        const productTitle = card ? card.querySelector('.card-title').textContent : 'Unknown';
+
+        if (typeof gtag !== 'undefined') {
+            gtag('event', 'cta_click', {
+                'event_category': 'catalog',
+                'event_label': productTitle
+            });
+        }
     });
 
     console.log('✅ Catalog page initialized');
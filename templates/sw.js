@@ -0,0 +1,107 @@
+{% autoescape off %}// Service Worker for Adiabatic PWA
+// Згенеровано командою: python manage.py build_service_worker
+const CACHE_VERSION = '{{ cache_version }}';
+const CACHE_PREFIX = 'adiabatic-';
+const STATIC_CACHE = `${CACHE_PREFIX}static-${CACHE_VERSION}`;
+const PAGES_CACHE = `${CACHE_PREFIX}pages-${CACHE_VERSION}`;
+
+const STATIC_URL = {{ static_url }};
+const PRECACHE_STATIC = {{ static_urls }};
+const PRECACHE_PAGES = {{ page_urls }};
+const BYPASS_PREFIXES = {{ bypass_prefixes }};
+
+// Install event - precache static files and i18n pages
+self.addEventListener('install', (event) => {
+    event.waitUntil(
+        Promise.all([
+            caches.open(STATIC_CACHE).then((cache) => cache.addAll(PRECACHE_STATIC)),
+            caches.open(PAGES_CACHE).then((cache) => cache.addAll(PRECACHE_PAGES)),
+        ]).then(() => self.skipWaiting())
+    );
+});
+
+// Activate event - clean up caches from previous versions
+self.addEventListener('activate', (event) => {
+    const currentCaches = [STATIC_CACHE, PAGES_CACHE];
+    event.waitUntil(
+        caches.keys()
+            .then((cacheNames) => Promise.all(
+                cacheNames
+                    .filter((cacheName) => !currentCaches.includes(cacheName))
+                    .map((cacheName) => caches.delete(cacheName))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+function isCacheable(response) {
+    return response && response.status === 200 && response.type === 'basic';
+}
+
+// Static files - cache first (hashed URLs never change)
+function cacheFirst(request) {
+    return caches.open(STATIC_CACHE).then((cache) =>
+        cache.match(request).then((cached) => {
+            if (cached) {
+                return cached;
+            }
+            return fetch(request).then((response) => {
+                if (isCacheable(response)) {
+                    cache.put(request, response.clone());
+                }
+                return response;
+            });
+        })
+    );
+}
+
+// HTML pages - stale-while-revalidate
+function staleWhileRevalidate(event) {
+    const request = event.request;
+    return caches.open(PAGES_CACHE).then((cache) =>
+        cache.match(request).then((cached) => {
+            const network = fetch(request)
+                .then((response) => {
+                    if (isCacheable(response) && !response.redirected) {
+                        cache.put(request, response.clone());
+                    }
+                    return response;
+                });
+
+            if (cached) {
+                event.waitUntil(network.catch(() => undefined));
+                return cached;
+            }
+            return network;
+        })
+    );
+}
+
+// Fetch event
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') {
+        return;
+    }
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        return;
+    }
+    // Шлях без мовного префікса (/uk/leads/ -> /leads/)
+    const unprefixedPath = url.pathname.replace(/^\/[a-z]{2}\//, '/');
+    if (BYPASS_PREFIXES.some((prefix) => url.pathname.startsWith(prefix) || unprefixedPath.startsWith(prefix))) {
+        return;
+    }
+    // HTMX фрагменти мають ті самі URL, що й повні сторінки
+    if (request.headers.get('HX-Request')) {
+        return;
+    }
+
+    if (url.pathname.startsWith(STATIC_URL)) {
+        event.respondWith(cacheFirst(request));
+    } else if (request.mode === 'navigate' || (request.headers.get('accept') || '').includes('text/html')) {
+        event.respondWith(staleWhileRevalidate(event));
+    }
+});
+{% endautoescape %}